@@ -0,0 +1,6 @@
+"""
+Pacote `pipeline` — código compartilhado da pipeline regulatória.
+
+Reúne a leitura/gravação da camada Gold e utilitários usados tanto pelos
+notebooks quanto pelo app Streamlit.
+"""
@@ -0,0 +1,327 @@
+# pipeline/accumulators.py
+"""
+Acumuladores de métricas em uma passada, combináveis entre pedaços.
+
+Cada acumulador é atualizado bloco a bloco (`update`) e dois acumuladores de
+recortes diferentes (blocos de leitura, partições por ano) se somam com
+`merge` — o resultado é o mesmo de calcular sobre a união. Assim o
+`resumo_metricas.csv` sai de uma única passada (tabela inteira ou blocos
+dela) e o manifesto das partições guarda um acumulador por ano para KPIs de
+qualquer recorte de anos.
+
+- `NumericAccumulator`: contagem, nulos, soma, min/max e variância por
+  Welford (combinação de Chan et al.), mais um `QuantileSketch` opcional;
+- `QuantileSketch`: histograma (valor, frequência). Enquanto couber em
+  `max_bins` valores distintos é exato — caso dos tempos em dias inteiros
+  da maioria das células do `cubo_tempo`. Acima disso os valores são arredondados a menos bits
+  de mantissa (erro relativo <= 2^-bits), o que mantém o tamanho limitado e
+  continua combinável. `compact_histograms` aplica a mesma compactação a
+  muitos histogramas de uma vez (ex.: um por célula do cubo);
+- `ResumoAccumulator`: os campos do `resumo_metricas.csv`.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BINS = 4096
+MIN_BITS = 4
+
+
+def _as_float(values) -> np.ndarray:
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _round_bits(x: np.ndarray, bits: int) -> np.ndarray:
+    """Arredonda a mantissa para `bits` bits (erro relativo <= 2^-bits)."""
+    m, e = np.frexp(x)
+    return np.ldexp(np.round(m * 2.0 ** bits) / 2.0 ** bits, e)
+
+
+def _json_number(v: float):
+    return int(v) if float(v).is_integer() else float(v)
+
+
+# =====================================================
+# Quantis
+# =====================================================
+class QuantileSketch:
+    """Histograma combinável (valor, frequência) com tamanho limitado."""
+
+    def __init__(self, max_bins: int = DEFAULT_MAX_BINS):
+        self.max_bins = max_bins
+        self.bits: int | None = None  # None = valores exatos
+        self.values = np.empty(0, dtype="float64")
+        self.counts = np.empty(0, dtype="int64")
+
+    @property
+    def n(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def exact(self) -> bool:
+        return self.bits is None
+
+    def _absorb(self, values: np.ndarray, counts: np.ndarray) -> None:
+        values = np.concatenate([self.values, values])
+        counts = np.concatenate([self.counts, counts])
+        if self.bits is not None:
+            values = _round_bits(values, self.bits)
+        uniq, inverse = np.unique(values, return_inverse=True)
+        self.values, self.counts = uniq, np.bincount(inverse, weights=counts).astype("int64")
+
+        # compacta: menos bits de mantissa até caber em max_bins
+        while len(self.values) > self.max_bins and (self.bits is None or self.bits > MIN_BITS):
+            self.bits = 52 if self.bits is None else self.bits - 1
+            uniq, inverse = np.unique(_round_bits(self.values, self.bits), return_inverse=True)
+            self.values, self.counts = uniq, np.bincount(inverse, weights=self.counts).astype("int64")
+
+    def update(self, values) -> "QuantileSketch":
+        x = _as_float(values)
+        x = x[~np.isnan(x)]
+        if len(x):
+            uniq, counts = np.unique(x, return_counts=True)
+            self._absorb(uniq, counts.astype("int64"))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.bits is not None and (self.bits is None or other.bits < self.bits):
+            self.bits = other.bits
+        self._absorb(other.values, other.counts)
+        return self
+
+    def quantile(self, q: float) -> float | None:
+        """Quantil com interpolação linear (mesma regra de `Series.quantile`)."""
+        n = self.n
+        if n == 0:
+            return None
+        cum = np.cumsum(self.counts)
+        h = (n - 1) * q
+        lo = self.values[np.searchsorted(cum, int(np.floor(h)), side="right")]
+        hi = self.values[np.searchsorted(cum, int(np.ceil(h)), side="right")]
+        return float(lo + (h - np.floor(h)) * (hi - lo))
+
+    def median(self) -> float | None:
+        return self.quantile(0.5)
+
+    def to_dict(self) -> dict:
+        return {
+            "bits": self.bits,
+            "valores": [_json_number(v) for v in self.values],
+            "contagens": [int(c) for c in self.counts],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict, max_bins: int = DEFAULT_MAX_BINS) -> "QuantileSketch":
+        sk = cls(max_bins)
+        sk.bits = d.get("bits")
+        sk.values = np.asarray(d.get("valores", []), dtype="float64")
+        sk.counts = np.asarray(d.get("contagens", []), dtype="int64")
+        return sk
+
+    @classmethod
+    def from_histogram(
+        cls, values, counts, bits: int | None = None, max_bins: int = DEFAULT_MAX_BINS
+    ) -> "QuantileSketch":
+        """
+        Sketch a partir de pares (valor, frequência), com repetições — ex.: as
+        linhas de vários sketches gravados numa tabela, somados de uma vez.
+        `bits` = o menor `bits` entre eles (None = todos exatos).
+        """
+        sk = cls(max_bins)
+        sk.bits = bits
+        sk._absorb(_as_float(values), np.asarray(counts, dtype="int64"))
+        return sk
+
+
+def compact_histograms(
+    groups, values, counts, max_bins: int = DEFAULT_MAX_BINS
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vários histogramas exatos de uma vez (linhas grupo, valor, qtd; sem pares
+    repetidos), cada grupo compactado como `QuantileSketch(max_bins)` faria:
+    grupos com mais de `max_bins` valores perdem bits de mantissa (52, 51,
+    ...) até caber. Retorna (grupo, valor, qtd) ordenados por grupo e valor e
+    os bits de cada grupo (-1 = exato).
+    """
+    groups = np.asarray(groups, dtype="int64")
+    values = _as_float(values)
+    counts = np.asarray(counts, dtype="int64")
+    n_groups = int(groups.max()) + 1 if len(groups) else 0
+    bits = np.full(n_groups, -1, dtype="int64")
+
+    while True:
+        over = (np.bincount(groups, minlength=n_groups) > max_bins) & ((bits < 0) | (bits > MIN_BITS))
+        if not over.any():
+            break
+        bits[over] = np.where(bits[over] < 0, 52, bits[over] - 1)
+
+        # só as linhas dos grupos que não cabem são arredondadas e somadas de novo
+        rows = over[groups]
+        g = groups[rows]
+        rounded = _round_bits(values[rows], bits[g])
+        if np.array_equal(rounded, values[rows]):
+            continue  # bits ainda sobrando (ex.: dias inteiros com 52..15 bits)
+        hist = (
+            pd.DataFrame({"g": g, "v": rounded, "c": counts[rows]})
+            .groupby(["g", "v"], sort=False)["c"].sum()
+        )
+        groups = np.concatenate([groups[~rows], hist.index.get_level_values("g").to_numpy()])
+        values = np.concatenate([values[~rows], hist.index.get_level_values("v").to_numpy()])
+        counts = np.concatenate([counts[~rows], hist.to_numpy(dtype="int64")])
+
+    order = np.lexsort((values, groups))
+    return groups[order], values[order], counts[order], bits
+
+
+# =====================================================
+# Contagem / soma / média / variância
+# =====================================================
+class NumericAccumulator:
+    """Contagem, nulos, soma, min/max, média e variância (Welford) + quantis opcionais."""
+
+    def __init__(self, quantiles: bool = False, max_bins: int = DEFAULT_MAX_BINS):
+        self.n = 0
+        self.nulos = 0
+        self.soma = 0.0
+        self.m2 = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+        self.sketch = QuantileSketch(max_bins) if quantiles else None
+
+    @property
+    def mean(self) -> float | None:
+        return self.soma / self.n if self.n else None
+
+    def var(self, ddof: int = 0) -> float | None:
+        return self.m2 / (self.n - ddof) if self.n > ddof else None
+
+    def std(self, ddof: int = 0) -> float | None:
+        v = self.var(ddof)
+        return None if v is None else float(np.sqrt(v))
+
+    def quantile(self, q: float) -> float | None:
+        return None if self.sketch is None else self.sketch.quantile(q)
+
+    def median(self) -> float | None:
+        return self.quantile(0.5)
+
+    def _combine(self, n: int, soma: float, m2: float, lo: float | None, hi: float | None) -> None:
+        # média/variância de dois grupos (Chan et al.)
+        if n == 0:
+            return
+        if self.n:
+            delta = soma / n - self.soma / self.n
+            self.m2 += m2 + delta * delta * self.n * n / (self.n + n)
+        else:
+            self.m2 = m2
+        self.n += n
+        self.soma += soma
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+
+    def update(self, values) -> "NumericAccumulator":
+        x = _as_float(values)
+        valid = x[~np.isnan(x)]
+        self.nulos += len(x) - len(valid)
+        if len(valid):
+            soma = float(valid.sum())
+            m2 = float(((valid - soma / len(valid)) ** 2).sum())
+            self._combine(len(valid), soma, m2, float(valid.min()), float(valid.max()))
+            if self.sketch is not None:
+                self.sketch.update(valid)
+        return self
+
+    def merge(self, other: "NumericAccumulator") -> "NumericAccumulator":
+        self.nulos += other.nulos
+        self._combine(other.n, other.soma, other.m2, other.min, other.max)
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        return self
+
+    def to_dict(self) -> dict:
+        d = {"n": self.n, "nulos": self.nulos, "soma": self.soma, "m2": self.m2,
+             "min": self.min, "max": self.max}
+        if self.sketch is not None:
+            d["quantis"] = self.sketch.to_dict()
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict, max_bins: int = DEFAULT_MAX_BINS) -> "NumericAccumulator":
+        acc = cls(quantiles="quantis" in d, max_bins=max_bins)
+        acc.n, acc.nulos = int(d["n"]), int(d["nulos"])
+        acc.soma, acc.m2 = float(d["soma"]), float(d["m2"])
+        acc.min, acc.max = d.get("min"), d.get("max")
+        if "quantis" in d:
+            acc.sketch = QuantileSketch.from_dict(d["quantis"], max_bins)
+        return acc
+
+
+def merge_all(accs: Iterable[NumericAccumulator], quantiles: bool = False) -> NumericAccumulator:
+    """Soma de vários acumuladores (ex.: um por partição)."""
+    out = NumericAccumulator(quantiles=quantiles)
+    for acc in accs:
+        out.merge(acc)
+    return out
+
+
+# =====================================================
+# resumo_metricas.csv
+# =====================================================
+class ResumoAccumulator:
+    """Campos do `resumo_metricas.csv`, acumulados bloco a bloco."""
+
+    def __init__(self):
+        self.linhas = 0
+        self.encerrado = NumericAccumulator()
+        self.risco_alto = NumericAccumulator()
+        self.tempo = NumericAccumulator(quantiles=True)
+        self.cine_linhas = 0
+        self.cine_nao_informado = 0
+        self.risco_versao: str | None = None
+
+    def update(self, chunk: pd.DataFrame) -> "ResumoAccumulator":
+        # colunas ausentes (layout antigo, bloco lido com `usecols`) ficam de
+        # fora: o campo correspondente sai NaN em vez de derrubar o resumo
+        self.linhas += len(chunk)
+        if "processo_encerrado" in chunk.columns:
+            self.encerrado.update(chunk["processo_encerrado"])
+        if "flag_risco_alto" in chunk.columns:
+            self.risco_alto.update(chunk["flag_risco_alto"])
+        if "tempo_tramitacao_dias" in chunk.columns:
+            self.tempo.update(chunk["tempo_tramitacao_dias"])
+        if "cine_area_geral" in chunk.columns:
+            self.cine_linhas += len(chunk)
+            self.cine_nao_informado += int((chunk["cine_area_geral"] == "Não informado").sum())
+        if self.risco_versao is None and "risco_versao" in chunk.columns:
+            versoes = chunk["risco_versao"].dropna()
+            if len(versoes):
+                self.risco_versao = versoes.iloc[0]
+        return self
+
+    def merge(self, other: "ResumoAccumulator") -> "ResumoAccumulator":
+        self.linhas += other.linhas
+        self.encerrado.merge(other.encerrado)
+        self.risco_alto.merge(other.risco_alto)
+        self.tempo.merge(other.tempo)
+        self.cine_linhas += other.cine_linhas
+        self.cine_nao_informado += other.cine_nao_informado
+        self.risco_versao = self.risco_versao if self.risco_versao is not None else other.risco_versao
+        return self
+
+    def to_frame(self, default_version: str | None = None) -> pd.DataFrame:
+        def pct(x: float | None) -> float:
+            return round(x * 100, 2) if x is not None else np.nan
+
+        n = self.linhas
+        return pd.DataFrame({
+            "linhas_total": [n],
+            "pct_encerrado": [pct(self.encerrado.mean)],
+            "pct_risco_alto": [pct(self.risco_alto.mean)],
+            "tempo_mediana": [self.tempo.median() if self.tempo.n else np.nan],
+            "tempo_media": [self.tempo.mean if self.tempo.n else np.nan],
+            "pct_cine_nao_informado": [pct(self.cine_nao_informado / self.cine_linhas) if self.cine_linhas else np.nan],
+            "risco_versao": [self.risco_versao if self.risco_versao is not None else default_version],
+        })
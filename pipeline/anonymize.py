@@ -0,0 +1,195 @@
+# pipeline/anonymize.py
+"""
+Anonimização de Mantenedora e IES (usada por `silver/anomização.ipynb`).
+
+Antes cada split (até 2018 / desde 2019) era anonimizado separadamente, com
+dicionários de códigos ordenados e um `map(lambda)` por linha (inclusive um
+SHA-256 por linha para o CNPJ fake) — a mesma instituição recebia ids
+diferentes em cada arquivo. Aqui:
+
+- a chave é fatorizada uma vez sobre a base inteira (`pd.factorize`), antes
+  do split: cada código vira o mesmo id fake em todos os arquivos;
+- um mapa persistente chave -> número (`pseudonimos_<entidade>.parquet`)
+  guarda os números já atribuídos: chaves conhecidas mantêm o número entre
+  execuções e chaves novas recebem os próximos (em ordem de código), sem
+  renumerar as antigas. Na primeira execução a numeração é a do notebook
+  (posição do código ordenado);
+- ids, nomes e CNPJ fake são gerados só para as chaves distintas (o SHA-256
+  roda em blocos num pool de processos quando são muitas) e espalhados para
+  as linhas por posição (`take`).
+
+O custo passa a depender do nº de entidades, não do nº de linhas.
+
+⚠️ O mapa contém os códigos reais: fica em `.pseudonimos/` ao lado da base
+bruta e não deve ser versionado.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.cleaning import norm_missing
+from pipeline.store import read_frame, stage_ext, write_frame
+
+MAP_DIRNAME = ".pseudonimos"
+PARALLEL_MIN_KEYS = 50_000   # abaixo disso o pool custa mais do que o hash
+CHUNK_KEYS = 20_000
+
+SENSITIVE_COLS = [
+    "Código Mantenedora",
+    "Nome Mantenedora",
+    "CNPJ Mantenedora",
+    "Código da IES",
+    "Nome da IES",
+    "Nome Técnico",
+    "Sinalizações vigente do Processo: Usuário Inclusão",
+]
+
+
+@dataclass(frozen=True)
+class Entity:
+    name: str
+    key_col: str
+    id_col: str
+    prefix: str
+    width: int
+    nome_col: str
+    nome_prefix: str
+    cnpj_col: str | None = None
+
+
+ENTITIES = [
+    Entity("mantenedora", "Código Mantenedora", "MANT_ID_FAKE", "MANT", 4,
+           "MANT_NOME_FAKE", "Mantenedora", cnpj_col="CNPJ_MANTENEDORA_FAKE"),
+    Entity("ies", "Código da IES", "IES_ID_FAKE", "IES", 5, "IES_NOME_FAKE", "IES"),
+]
+
+
+# =====================================================
+# CNPJ fake
+# =====================================================
+def cnpj_fake(seed: str) -> str:
+    """CNPJ fake determinístico (dígitos do SHA-256 do `seed`)."""
+    h = hashlib.sha256(seed.encode("utf-8")).hexdigest()
+    digits = "".join(c for c in h if c.isdigit())
+    digits = (digits * 14)[:14] if len(digits) < 14 else digits[:14]
+    return f"{digits[0:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:14]}"
+
+
+def _cnpj_chunk(seeds: list[str]) -> list[str]:
+    return [cnpj_fake(s) for s in seeds]
+
+
+def cnpj_fake_many(seeds: list[str], max_workers: int | None = None) -> list[str]:
+    """`cnpj_fake` para várias sementes (em blocos, num pool de processos, se forem muitas)."""
+    if len(seeds) < PARALLEL_MIN_KEYS:
+        return _cnpj_chunk(seeds)
+    chunks = [seeds[i:i + CHUNK_KEYS] for i in range(0, len(seeds), CHUNK_KEYS)]
+    workers = min(len(chunks), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [c for part in pool.map(_cnpj_chunk, chunks) for c in part]
+
+
+# =====================================================
+# Mapa persistente chave -> número
+# =====================================================
+def map_dir_for(source: Path) -> Path:
+    """Pasta dos mapas ao lado da base bruta."""
+    return Path(source).resolve().parent / MAP_DIRNAME
+
+
+def _map_path(map_dir: Path, entity: Entity) -> Path:
+    return Path(map_dir) / f"pseudonimos_{entity.name}.{stage_ext()}"
+
+
+def load_pseudonyms(map_dir: Path | None, entity: Entity) -> pd.DataFrame:
+    """Mapa (`chave`, `numero`) já atribuído (vazio se não houver)."""
+    path = None if map_dir is None else _map_path(map_dir, entity)
+    if path is None or not path.exists():
+        return pd.DataFrame({"chave": pd.Series(dtype="string"), "numero": pd.Series(dtype="int64")})
+    return read_frame(path)
+
+
+def normalize_keys(s: pd.Series) -> pd.Series:
+    """Códigos como texto, sem nulos disfarçados e sem o `.0` de colunas lidas como float."""
+    return norm_missing(s).astype("string").str.replace(r"\.0$", "", regex=True)
+
+
+def assign_numbers(keys: pd.Series, known: pd.DataFrame) -> tuple[np.ndarray, pd.Index, np.ndarray, pd.DataFrame]:
+    """
+    Fatoriza `keys` e devolve (código por linha [-1 = nulo], chaves distintas,
+    número de cada chave distinta, mapa atualizado). Chaves fora do mapa
+    recebem os próximos números, em ordem de chave.
+    """
+    codes, uniques = pd.factorize(keys, sort=True, use_na_sentinel=True)
+    uniques = pd.Index(uniques, dtype="string")
+
+    pos = pd.Index(known["chave"].astype("string")).get_indexer(uniques)
+    numbers = np.full(len(uniques), -1, dtype="int64")
+    numbers[pos >= 0] = known["numero"].to_numpy(dtype="int64")[pos[pos >= 0]]
+
+    new = numbers < 0
+    start = int(known["numero"].max()) + 1 if len(known) else 1
+    numbers[new] = np.arange(start, start + int(new.sum()))
+
+    if new.any():
+        known = pd.concat(
+            [known, pd.DataFrame({"chave": uniques[new], "numero": numbers[new]})],
+            ignore_index=True,
+        )
+    return codes, uniques, numbers, known
+
+
+def _broadcast(codes: np.ndarray, values: pd.Series) -> pd.Series:
+    """Valor da chave distinta para cada linha (nulo onde o código é -1)."""
+    values = pd.concat([values.reset_index(drop=True), pd.Series([pd.NA], dtype=values.dtype)],
+                       ignore_index=True)
+    return values.take(np.where(codes >= 0, codes, len(values) - 1)).reset_index(drop=True)
+
+
+# =====================================================
+# Anonimização
+# =====================================================
+def anonymize(
+    df: pd.DataFrame,
+    map_dir: Path | None = None,
+    max_workers: int | None = None,
+    drop_sensitive: bool = True,
+) -> pd.DataFrame:
+    """
+    Acrescenta ids/nomes (e CNPJ) fake de Mantenedora e IES e remove as
+    colunas sensíveis. Com `map_dir`, reaproveita e atualiza os mapas
+    persistentes chave -> número.
+    """
+    out = df.copy()
+    for entity in ENTITIES:
+        if entity.key_col not in df.columns:
+            continue
+
+        known = load_pseudonyms(map_dir, entity)
+        codes, _, numbers, updated = assign_numbers(normalize_keys(df[entity.key_col]), known)
+
+        nums = pd.Series(numbers, dtype="int64").astype("string").str.zfill(entity.width)
+        ids = (entity.prefix + "_" + nums).astype("string")
+        per_key = {
+            entity.id_col: ids,
+            entity.nome_col: (entity.nome_prefix + " " + nums).astype("string"),
+        }
+        if entity.cnpj_col:
+            per_key[entity.cnpj_col] = pd.Series(cnpj_fake_many(ids.tolist(), max_workers), dtype="string")
+
+        for col, values in per_key.items():
+            out[col] = _broadcast(codes, values).set_axis(df.index)
+
+        if map_dir is not None and len(updated) != len(known):
+            write_frame(updated, _map_path(map_dir, entity))
+
+    if drop_sensitive:
+        out = out.drop(columns=[c for c in SENSITIVE_COLS if c in out.columns])
+    return out
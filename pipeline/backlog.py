@@ -0,0 +1,145 @@
+# pipeline/backlog.py
+"""
+Backlog "em aberto na data" (as-of) sobre vetores de eventos ordenados.
+
+Cada processo vira dois eventos em dias desde 1970-01-01 (int64):
+
+- entrada: `dt_protocolo_key`, senão 01/01 do ano do protocolo;
+- saída: só para encerrados — `dt_ultimo_ato_key`, senão
+  `dt_entrada_fase_key`, senão 31/12 do `ano_encerramento` (mesma ordem de
+  preferência da build para o ano de encerramento). Ativos não saem.
+
+Os dois vetores são ordenados uma vez (`build_backlog_index`). Em aberto
+numa data `t` = entradas <= t − saídas <= t, ou seja, dois `searchsorted`
+para qualquer série de datas. Para um recorte (linhas do filtro), os
+vetores ordenados são só mascarados — continuam ordenados, sem reordenar
+nem reagrupar a fato.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+NEVER = np.iinfo(np.int64).max  # sem data / ainda em aberto
+
+
+def key_to_days(keys: pd.Series | np.ndarray | None, n_rows: int = 0) -> np.ndarray:
+    """Chaves YYYYMMDD -> dias desde 1970-01-01 (NEVER para nulo/inválido)."""
+    if keys is None:
+        return np.full(n_rows, NEVER, dtype=np.int64)
+    raw = pd.to_numeric(pd.Series(keys), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    out = np.full(len(raw), NEVER, dtype=np.int64)
+    valid = ~np.isnan(raw)
+    if not valid.any():
+        return out
+
+    # poucas datas distintas: converte cada uma uma única vez
+    uniques, inverse = np.unique(raw[valid].astype(np.int64), return_inverse=True)
+    dates = pd.to_datetime(pd.Series(uniques).astype(str), format="%Y%m%d", errors="coerce")
+    days = dates.to_numpy(dtype="datetime64[D]").astype(np.int64)
+    days[dates.isna().to_numpy()] = NEVER
+    out[valid] = days[inverse]
+    return out
+
+
+def year_days(years: pd.Series | None, n_rows: int = 0, end: bool = False) -> np.ndarray:
+    """Ano -> dias até 01/01 (ou 31/12, com `end=True`) do ano (NEVER para nulo)."""
+    if years is None:
+        return np.full(n_rows, NEVER, dtype=np.int64)
+    y = pd.to_numeric(pd.Series(years), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    out = np.full(len(y), NEVER, dtype=np.int64)
+    valid = ~np.isnan(y)
+    first = (y[valid].astype(np.int64) - 1970 + int(end)).astype("datetime64[Y]").astype("datetime64[D]")
+    out[valid] = first.astype(np.int64) - int(end)
+    return out
+
+
+@dataclass(frozen=True)
+class BacklogIndex:
+    opened: np.ndarray        # dias de entrada, ordenados
+    closed: np.ndarray        # dias de saída, ordenados (NEVER = em aberto)
+    open_order: np.ndarray    # linha da fato de cada posição de `opened`
+    close_order: np.ndarray   # linha da fato de cada posição de `closed`
+    n_rows: int
+
+    def _slice(self, rows: np.ndarray | None) -> tuple[np.ndarray, np.ndarray]:
+        if rows is None:
+            return self.opened, self.closed
+        keep = np.zeros(self.n_rows, dtype=bool)
+        keep[rows] = True
+        return self.opened[keep[self.open_order]], self.closed[keep[self.close_order]]
+
+    def counts(self, dates, rows: np.ndarray | None = None) -> pd.DataFrame:
+        """
+        Para cada data: protocolados e encerrados acumulados até a data e
+        em aberto na data. `rows` = posições das linhas do recorte (None = todas).
+        """
+        t = pd.DatetimeIndex(pd.to_datetime(dates)).to_numpy(dtype="datetime64[D]").astype(np.int64)
+        opened, closed = self._slice(rows)
+        entradas = np.searchsorted(opened, t, side="right")
+        saidas = np.searchsorted(closed, t, side="right")
+        return pd.DataFrame({
+            "data": pd.to_datetime(dates),
+            "protocolados": entradas,
+            "encerrados": saidas,
+            "em_aberto": entradas - saidas,
+        })
+
+    def date_range(self, rows: np.ndarray | None = None) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        """Primeira e última data de evento do recorte (None se vazio)."""
+        opened, closed = self._slice(rows)
+        opened = opened[opened != NEVER]
+        if not len(opened):
+            return None
+        closed = closed[closed != NEVER]
+        last = max(opened[-1], closed[-1]) if len(closed) else opened[-1]
+        return pd.Timestamp(opened[0], unit="D"), pd.Timestamp(last, unit="D")
+
+    def monthly(self, rows: np.ndarray | None = None, start=None, end=None) -> pd.DataFrame:
+        """Série mensal (fim de cada mês) entre `start` e `end` (padrão: datas do recorte)."""
+        span = self.date_range(rows)
+        if span is None:
+            return self.counts([], rows)
+        start = pd.Timestamp(start) if start is not None else span[0]
+        end = pd.Timestamp(end) if end is not None else span[1]
+        return self.counts(pd.date_range(start, end + pd.offsets.MonthEnd(0), freq="ME"), rows)
+
+
+def _first_valid(candidates: list[np.ndarray], n: int) -> np.ndarray:
+    out = np.full(n, NEVER, dtype=np.int64)
+    for cand in candidates:
+        out = np.where(out == NEVER, cand, out)
+    return out
+
+
+def build_backlog_index(
+    n_rows: int,
+    opened_key: pd.Series | None,
+    encerrado: pd.Series | None,
+    closed_keys: list[pd.Series | None],
+    ano_protocolo: pd.Series | None = None,
+    ano_encerramento: pd.Series | None = None,
+) -> BacklogIndex:
+    """
+    Monta o índice a partir das colunas da fato: chave de protocolo, flag de
+    encerrado e chaves candidatas de encerramento (em ordem de preferência).
+    Sem data, entrada cai para 01/01 de `ano_protocolo` e saída para 31/12
+    de `ano_encerramento`.
+    """
+    n = n_rows
+    opened = _first_valid([key_to_days(opened_key, n), year_days(ano_protocolo, n)], n)
+    closed = _first_valid(
+        [key_to_days(k, n) for k in closed_keys] + [year_days(ano_encerramento, n, end=True)], n
+    )
+
+    enc = (
+        pd.to_numeric(encerrado, errors="coerce").fillna(0).to_numpy() == 1
+        if encerrado is not None else np.zeros(n, dtype=bool)
+    )
+    closed = np.where(enc & (opened != NEVER), np.maximum(closed, opened), NEVER)
+
+    open_order = np.argsort(opened, kind="stable")
+    close_order = np.argsort(closed, kind="stable")
+    return BacklogIndex(opened[open_order], closed[close_order], open_order, close_order, n)
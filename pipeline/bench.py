@@ -0,0 +1,390 @@
+# pipeline/bench.py
+"""
+Benchmarks dos caminhos quentes sobre a base sintética (pipeline/synthetic.py).
+
+Cada caso é medido duas vezes: `--repeat` execuções só com relógio (vale a
+melhor) e uma execução extra com `tracemalloc` (Python + numpy) e o pool de
+memória do Arrow (colunas de texto do pandas, Parquet) para o pico de
+memória — o `tracemalloc` deixa tudo mais lento, então não entra no tempo.
+
+Grupos:
+
+- `gold`: builders da Gold sobre a Silver sintética (`prepare_base`,
+  dimensões, métricas, resumo, fato e cubo);
+- `app`: o que o dashboard faz a cada interação, sobre a Gold sintética
+  gravada em disco (`ensure_gold_fixture`): `load_model` com as projeções
+  do app e da página de risco, índice de filtros + `rows(filtros)`,
+  KPIs/contagens do cubo, `add_risk_score` e `safe_value_counts`.
+
+Baselines: `--save NOME` grava os números em `.bench/baselines/NOME.json`
+(com máquina, versões e os parâmetros do gerador: escalas, seed e
+`GENERATOR_VERSION`); `--compare NOME` recusa a comparação (código 2) se a
+execução atual usou outros parâmetros do gerador e, se não, compara com a
+baseline e sai com código 1 se algum caso ficou mais lento ou mais pesado
+além de `--tolerancia` (e de um mínimo absoluto, para não acusar ruído em
+casos de milissegundos). Baselines valem para a máquina em que foram
+gravadas — não são versionadas.
+
+Uso:
+
+    python -m pipeline.bench --rows 100000 1000000 --save antes
+    python -m pipeline.bench --rows 100000 1000000 --compare antes
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from pipeline.synthetic import BASE_DIR, DATA_MAXIMA, GENERATOR_VERSION, ensure_gold_fixture, generate_silver
+
+BASELINE_DIR = BASE_DIR / ".bench" / "baselines"
+DEFAULT_ROWS = [100_000, 1_000_000]
+GRUPOS = ("gold", "app")
+TOLERANCIA = 0.2
+MIN_DELTA_S = 0.05     # diferenças menores que isso são ruído
+MIN_DELTA_MB = 5.0
+
+# mesmas projeções de streamlit/app.py e da página de risco
+APP_FATO_COLS = (
+    "AnoProtocolo", "uf", "modalidade_norm", "id_ies",
+    "processo_encerrado", "flag_risco_alto", "tempo_tramitacao_dias",
+)
+APP_DIMS = ("dim_ies", "dim_local", "dim_modalidade")
+RISCO_FATO_COLS = (
+    "AnoProtocolo", "FASE_ATUAL", "ORGAO", "ATO", "CATEGORIA_ATO",
+    "processo_encerrado", "processo_ativo", "tempo_em_aberto_dias", "tempo_tramitacao_dias",
+    "risco_score", "risco_faixa", "risco_versao",
+    "endereco_divergente_flag", "tem_divergencia_vagas", "is_sede_ead_flag",
+    "dt_protocolo_key", "dt_ultimo_ato_key", "dt_entrada_fase_key", "ano_encerramento",
+)
+RISCO_DIMS = ("dim_atributo",)
+
+Case = tuple[str, Callable[[], object]]
+
+
+# =====================================================
+# Medição
+# =====================================================
+def _arrow_pool():
+    """Pool padrão do Arrow (já conta bytes alocados e o pico do processo), se houver pyarrow."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    return pa.default_memory_pool()
+
+
+class _ArrowPeak:
+    """Pico de bytes no pool do Arrow durante um trecho (amostrado; exato quando o trecho bate o recorde do processo)."""
+
+    def __init__(self, pool, interval: float = 0.002):
+        self.pool = pool
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.pool.bytes_allocated())
+
+    def __enter__(self) -> "_ArrowPeak":
+        self.start = self.pool.bytes_allocated()
+        self.record = self.pool.max_memory()
+        self.peak = self.start
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.pool.bytes_allocated())
+        if self.pool.max_memory() > self.record:
+            self.peak = max(self.peak, self.pool.max_memory())
+
+    @property
+    def mb(self) -> float:
+        return max(self.peak - self.start, 0) / 2**20
+
+
+def measure(fn: Callable[[], object], repeat: int = 3) -> dict:
+    """Melhor tempo de `repeat` execuções e pico de memória (Python/numpy + Arrow) de uma execução extra."""
+    tempos = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t0)
+
+    gc.collect()
+    pool = _arrow_pool()
+    tracemalloc.start()
+    try:
+        if pool is None:
+            fn()
+            arrow_mb = 0.0
+        else:
+            with _ArrowPeak(pool) as arrow:
+                fn()
+            arrow_mb = arrow.mb
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "tempo_s": round(min(tempos), 4),
+        "tempo_mediano_s": round(float(np.median(tempos)), 4),
+        "memoria_mb": round(pico / 2**20 + arrow_mb, 1),
+        "arrow_mb": round(arrow_mb, 1),
+    }
+
+
+# =====================================================
+# Casos
+# =====================================================
+def gold_cases(n_rows: int, seed: int = 0) -> Iterator[Case]:
+    """Builders da Gold sobre a Silver sintética (entradas preparadas fora da medição)."""
+    from pipeline.cube import build_cube
+    from pipeline.gold import (
+        build_dim_curso, build_dim_ies, build_dim_local, build_dim_modalidade, build_dim_tempo,
+        build_fato, build_metricas, build_resumo, prepare_base,
+    )
+
+    silver = generate_silver(n_rows, seed)
+    yield "prepare_base", lambda: prepare_base(silver)
+
+    base = prepare_base(silver)
+    del silver
+    for builder in [build_dim_curso, build_dim_ies, build_dim_local, build_dim_modalidade, build_dim_tempo]:
+        yield builder.__name__, lambda builder=builder: builder(base)
+
+    yield "build_metricas", lambda: build_metricas(base, today=DATA_MAXIMA)
+    metricas = build_metricas(base, today=DATA_MAXIMA)
+    yield "build_resumo", lambda: build_resumo(metricas)
+    yield "build_fato", lambda: build_fato(base, metricas)
+
+    fato = build_fato(base, metricas)
+    dim_ies = build_dim_ies(base)
+    yield "build_cube", lambda: build_cube(fato, dim_ies)
+
+
+def _app_modules(gold_dir: Path):
+    """`utils.data` / `utils.metrics` do dashboard apontando para `gold_dir`."""
+    app_dir = str(BASE_DIR / "streamlit")
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    from utils import data, metrics
+
+    data.GOLD_OUTPUT_DIR = data.GOLD_DIR = Path(gold_dir)
+    return data, metrics
+
+
+def _filtros(index) -> dict[str, list]:
+    """Recorte típico da barra lateral: últimos 3 anos, 2 UFs, uma modalidade."""
+    anos = sorted(index.values("ano"))
+    ufs = [u for u in ["SP", "MG"] if u in index.values("uf")]
+    mods = [m for m in ["EAD"] if m in index.values("modalidade_norm")]
+    return {"ano": anos[-3:], "uf": ufs, "modalidade_norm": mods, "PublicaPrivada": []}
+
+
+def app_cases(n_rows: int, seed: int = 0) -> Iterator[Case]:
+    """Caminhos quentes do dashboard sobre a Gold sintética gravada em disco."""
+    from pipeline.cube import cube_counts, cube_kpis
+
+    data, metrics = _app_modules(ensure_gold_fixture(n_rows, seed))
+    from utils.filter_index import build_filter_index
+
+    def load(columns, dims):
+        # sem cache: mede a carga de verdade (o app faz isso uma vez por processo)
+        data.load_model.clear()
+        data.load_dims.clear()
+        return data.load_model(None, columns, dims)
+
+    yield "load_model", lambda: load(APP_FATO_COLS, APP_DIMS)
+    yield "load_model_risco", lambda: load(RISCO_FATO_COLS, RISCO_DIMS)
+
+    dims, fato = load(APP_FATO_COLS, APP_DIMS)
+    labels = data.fato_labels(fato, ["uf", "modalidade_norm"], dims)
+    yield "build_filter_index", lambda: build_filter_index(labels, dims["dim_ies"])
+
+    index = build_filter_index(labels, dims["dim_ies"])
+    filtros = _filtros(index)
+    yield "filtro_rows", lambda: index.rows(filtros)
+
+    cube, cube_tempo = data.load_table("cubo_dashboard"), data.load_table("cubo_tempo")
+    yield "cube_kpis", lambda: cube_kpis(cube, cube_tempo, filtros)
+    yield "cube_counts", lambda: [cube_counts(cube, filtros, d) for d in ["ano", "uf", "modalidade_norm"]]
+
+    dims_risco, fato_risco = load(RISCO_FATO_COLS, RISCO_DIMS)
+    df = data.fato_labels(fato_risco, ["FASE_ATUAL", "ORGAO", "ATO", "CATEGORIA_ATO"], dims_risco)
+    yield "add_risk_score", lambda: metrics.add_risk_score(
+        df,
+        fase_col="FASE_ATUAL",
+        ato_col="ATO",
+        cat_ato_col="CATEGORIA_ATO",
+        end_div_col="endereco_divergente_flag",
+        vagas_div_col="tem_divergencia_vagas",
+        sede_ead_col="is_sede_ead_flag",
+    )
+    yield "safe_value_counts", lambda: [metrics.safe_value_counts(df, c, top=15) for c in ["FASE_ATUAL", "ORGAO"]]
+
+
+CASES = {"gold": gold_cases, "app": app_cases}
+
+
+def run(
+    rows: list[int],
+    grupos: tuple[str, ...] = GRUPOS,
+    seed: int = 0,
+    repeat: int = 3,
+    only: list[str] | None = None,
+) -> dict[str, dict]:
+    """Mede todos os casos; chave `grupo/caso@linhas`."""
+    results = {}
+    for n in rows:
+        for grupo in grupos:
+            for nome, fn in CASES[grupo](n, seed):
+                if only and nome not in only:
+                    continue
+                key = f"{grupo}/{nome}@{n}"
+                results[key] = r = measure(fn, repeat)
+                print(f"{key:<40} {r['tempo_s']:>9.3f}s {r['memoria_mb']:>9.1f} MB")
+    return results
+
+
+# =====================================================
+# Baselines
+# =====================================================
+def environment() -> dict:
+    return {
+        "maquina": platform.node(),
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "gerador": GENERATOR_VERSION,
+    }
+
+
+def baseline_path(name: str, root: Path = BASELINE_DIR) -> Path:
+    return Path(root) / f"{name}.json"
+
+
+def generator_params(rows: list[int], seed: int = 0) -> dict:
+    """Parâmetros da base sintética medida: duas medições só se comparam com os mesmos."""
+    return {"linhas": sorted(int(n) for n in rows), "seed": int(seed), "versao": GENERATOR_VERSION}
+
+
+def check_generator(baseline: dict, params: dict) -> None:
+    """ValueError se a baseline foi gravada com outros parâmetros do gerador (ou sem eles)."""
+    antes = baseline.get("parametros_gerador")
+    if antes is None:
+        raise ValueError("Baseline sem os parâmetros do gerador (gravada por uma versão antiga): grave de novo.")
+    diff = [f"{k}: {antes.get(k)} -> {v}" for k, v in params.items() if antes.get(k) != v]
+    if diff:
+        raise ValueError("Baseline gravada com outros parâmetros do gerador (" + "; ".join(diff) + ").")
+
+
+def save_baseline(
+    results: dict, name: str, rows: list[int], seed: int = 0, root: Path = BASELINE_DIR
+) -> Path:
+    path = baseline_path(name, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        **environment(),
+        "parametros_gerador": generator_params(rows, seed),
+        "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "casos": results,
+    }
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def load_baseline(name: str, root: Path = BASELINE_DIR) -> dict:
+    path = baseline_path(name, root)
+    if not path.exists():
+        raise FileNotFoundError(f"Baseline '{name}' não encontrada em {path}.")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(results: dict, baseline: dict, tol: float = TOLERANCIA) -> pd.DataFrame:
+    """
+    Uma linha por caso presente nas duas medições, com as razões atual/baseline
+    de tempo e memória e `regressao` = piorou mais que `tol` (e mais que o
+    mínimo absoluto) em tempo ou memória.
+    """
+    linhas = []
+    for key, atual in results.items():
+        antes = baseline["casos"].get(key)
+        if antes is None:
+            continue
+        linha = {"caso": key}
+        regressao = False
+        for metrica, minimo in [("tempo_s", MIN_DELTA_S), ("memoria_mb", MIN_DELTA_MB)]:
+            a, b = float(atual[metrica]), float(antes[metrica])
+            linha[f"{metrica}_antes"], linha[metrica] = b, a
+            linha[f"{metrica}_razao"] = round(a / b, 2) if b else np.nan
+            regressao |= a > b * (1 + tol) and a - b > minimo
+        linha["regressao"] = regressao
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos quentes sobre a base sintética.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help="escalas (nº de processos; padrão: 100 mil e 1 milhão)")
+    parser.add_argument("--grupos", nargs="+", choices=GRUPOS, default=list(GRUPOS))
+    parser.add_argument("--casos", nargs="+", default=None, help="só estes casos (ex.: load_model build_cube)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="execuções cronometradas por caso (vale a melhor)")
+    parser.add_argument("--save", metavar="NOME", help="grava os resultados em .bench/baselines/NOME.json")
+    parser.add_argument("--compare", metavar="NOME", help="compara com .bench/baselines/NOME.json")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="piora relativa tolerada antes de acusar regressão (padrão: 0.2)")
+    args = parser.parse_args(argv)
+
+    # parâmetros do gerador conferidos antes de medir: outra base não se compara
+    baseline = load_baseline(args.compare) if args.compare else None
+    if baseline is not None:
+        try:
+            check_generator(baseline, generator_params(args.rows, args.seed))
+        except ValueError as e:
+            print(f"❌ {e} Comparação recusada.")
+            return 2
+
+    results = run(args.rows, tuple(args.grupos), args.seed, args.repeat, args.casos)
+
+    if args.save:
+        print("💾 Baseline gravada em:", save_baseline(results, args.save, args.rows, args.seed))
+
+    if baseline is not None:
+        if baseline.get("maquina") != platform.node():
+            print(f"⚠️ Baseline gravada em outra máquina ({baseline.get('maquina')}): compare com cautela.")
+        tab = compare(results, baseline, args.tolerancia)
+        if tab.empty:
+            print("⚠️ Nenhum caso em comum com a baseline.")
+            return 0
+        print(tab.to_string(index=False))
+        piores = tab.loc[tab["regressao"], "caso"].tolist()
+        if piores:
+            print(f"❌ {len(piores)} regressão(ões) acima de {args.tolerancia:.0%}: " + ", ".join(piores))
+            return 1
+        print(f"✅ Sem regressões acima de {args.tolerancia:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
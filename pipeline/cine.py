@@ -0,0 +1,227 @@
+# pipeline/cine.py
+"""
+Enriquecimento CINE por código do curso (usado por `silver/merge_CINE.ipynb`).
+
+O notebook lia as duas planilhas inteiras, deduplicava a fonte CINE com
+sort + `groupby().first()`, fazia um merge LEFT em memória e só depois
+removia os `NO_DO_PROCESSO` duplicados (o merge já tinha processado as
+duplicatas). Aqui:
+
+- `load_cine_index`: índice código do curso (numérico) -> campos CINE,
+  montado uma vez por conteúdo da planilha fonte e guardado em
+  `.xlsx_cache/` (chave: hash do arquivo). Enriquecer um extrato novo não
+  relê nem reagrupa a fonte;
+- `enrich_chunks`: passa o arquivo de processos em blocos pelo índice —
+  deduplicação por `NO_DO_PROCESSO` (1ª ocorrência, também entre blocos)
+  antes do lookup, que é um `reindex` pela chave (hash), sem merge;
+- `enrich_file`: lê em blocos (CSV / Parquet / XLSX via cache colunar) e
+  grava em Parquet incremental (CSV se não houver pyarrow).
+
+Regras do notebook mantidas: nomes de colunas em UPPER_UNDERSCORE sem
+acentos, casa só código numérico igual (demais ficam vazios), campos CINE
+no final, 1º valor não nulo de cada campo quando o código se repete na fonte.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from pipeline.ingest import cache_dir_for, content_hash, read_xlsx
+from pipeline.store import parquet_available, read_frame, stage_ext, write_frame
+
+KEY_COL = "_CODCURSO_NUM"
+COL_PROCESSO = "NO_DO_PROCESSO"
+CHUNK_ROWS = 100_000
+
+CINE_FIELDS = [
+    "Código Área Geral (CINE)",
+    "Área Geral (CINE)",
+    "Código Área Detalhada (CINE)",
+    "Área Detalhada (CINE)",
+    "Código Área Específica (CINE)",
+    "Área Específica (CINE)",
+    "Rótulo (CINE)",
+    "Avaliação Oficial",
+]
+
+_CODIGO_CURSO_COLS = [
+    "CODIGO_DO_CURSO", "CODIGO_CURSO", "COD_CURSO",
+    "CODIGO_DO_CURSO_REGULACAO", "CODIGO_CURSO_REGULACAO",
+    "COD_CURSO_REGULACAO",
+]
+
+
+# =====================================================
+# Nomes de colunas
+# =====================================================
+@lru_cache(maxsize=None)
+def normalize_upper(s: str) -> str:
+    """'Código Área Geral (CINE)' -> 'CODIGO_AREA_GERAL_CINE' (uma vez por nome)."""
+    s = unicodedata.normalize("NFKD", str(s)).encode("ASCII", "ignore").decode("ASCII")
+    s = re.sub(r"\s+", "_", s.strip()).upper()
+    s = re.sub(r"[^A-Z0-9_]", "", s)
+    return re.sub(r"_+", "_", s)
+
+
+def find_codigo_curso_col(cols) -> str | None:
+    """Coluna de código do curso (nomes já normalizados)."""
+    cols = list(cols)
+    for p in _CODIGO_CURSO_COLS:
+        if p in cols:
+            return p
+    return next((c for c in cols if re.search(r"COD.*CURSO", c)), None)
+
+
+def _normalized(df: pd.DataFrame) -> pd.DataFrame:
+    return df.rename(columns=normalize_upper)
+
+
+def _course_key(s: pd.Series) -> np.ndarray:
+    """Chave numérica do curso (só casa número igual; texto vira NaN)."""
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+CINE_TARGETS = [normalize_upper(c) for c in CINE_FIELDS]
+
+
+# =====================================================
+# Índice código do curso -> CINE
+# =====================================================
+def build_cine_index(source: pd.DataFrame) -> pd.DataFrame:
+    """
+    Índice (`_CODCURSO_NUM` -> campos CINE) da planilha fonte: 1 linha por
+    código numérico, com o 1º valor não nulo de cada campo (ordem do arquivo).
+    """
+    source = _normalized(source)
+    col = find_codigo_curso_col(source.columns)
+    if not col:
+        raise KeyError(f"Coluna de CÓDIGO DO CURSO não encontrada na fonte CINE. Colunas: {source.columns.tolist()}")
+
+    sel = source.reindex(columns=CINE_TARGETS).astype("string")
+    sel[KEY_COL] = _course_key(source[col])
+    return sel.dropna(subset=[KEY_COL]).groupby(KEY_COL, sort=True).first()
+
+
+def load_cine_index(source_path: Path) -> pd.DataFrame:
+    """Índice CINE da planilha `source_path`, montado uma vez por conteúdo do arquivo."""
+    source_path = Path(source_path).resolve()
+    cache_dir = cache_dir_for(source_path)
+    path = cache_dir / f"cine_index__{content_hash(source_path)[:20]}.{stage_ext()}"
+    if path.exists():
+        return read_frame(path)
+
+    index = build_cine_index(read_xlsx(source_path, dtype=str))
+    write_frame(index, path)
+    return index
+
+
+# =====================================================
+# Enriquecimento em blocos
+# =====================================================
+def enrich_chunks(
+    chunks: Iterable[pd.DataFrame],
+    index: pd.DataFrame,
+    dedup_col: str | None = COL_PROCESSO,
+    stats: dict | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Para cada bloco: normaliza nomes, remove `dedup_col` já vistos (no bloco
+    ou em blocos anteriores) e acrescenta os campos CINE no final. `stats`
+    (opcional) recebe linhas lidas / duplicadas / gravadas / com CINE.
+    """
+    stats = stats if stats is not None else {}
+    for k in ["linhas_lidas", "duplicadas", "linhas_gravadas", "com_cine"]:
+        stats.setdefault(k, 0)
+
+    seen: set = set()
+    col = None
+    for chunk in chunks:
+        chunk = _normalized(chunk)
+        stats["linhas_lidas"] += len(chunk)
+
+        if dedup_col is not None:
+            if dedup_col not in chunk.columns:
+                raise KeyError(f"A coluna '{dedup_col}' não existe no arquivo de processos (após normalização).")
+            ids = chunk[dedup_col]
+            # pertinência no set por valor do bloco: O(bloco), não O(já vistos)
+            vistos = np.fromiter((x in seen for x in ids.to_numpy(dtype=object)), dtype=bool, count=len(ids))
+            dup = ids.duplicated(keep="first").to_numpy() | vistos
+            seen.update(ids.to_numpy(dtype=object)[~dup].tolist())
+            stats["duplicadas"] += int(dup.sum())
+            chunk = chunk[~dup]
+
+        col = col or find_codigo_curso_col(chunk.columns)
+        if not col:
+            raise KeyError(f"Coluna de CÓDIGO DO CURSO não encontrada. Colunas: {chunk.columns.tolist()}")
+
+        cine = index.reindex(_course_key(chunk[col])).set_axis(chunk.index)
+        base = chunk.drop(columns=[c for c in CINE_TARGETS if c in chunk.columns])
+        out = pd.concat([base, cine[CINE_TARGETS]], axis=1)
+
+        stats["linhas_gravadas"] += len(out)
+        stats["com_cine"] += int(cine.notna().any(axis=1).sum())
+        yield out
+
+
+def iter_input(path: Path, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Arquivo de processos em blocos, tudo como texto (CSV, Parquet ou XLSX via cache colunar)."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        yield from pd.read_csv(path, dtype=str, chunksize=chunk_rows, encoding="utf-8-sig", low_memory=False)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas().astype("string")
+    else:
+        df = read_xlsx(path, dtype=str)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+
+def enrich_file(
+    data_path: Path,
+    index: pd.DataFrame,
+    out_path: Path,
+    dedup_col: str | None = COL_PROCESSO,
+    chunk_rows: int = CHUNK_ROWS,
+) -> dict:
+    """
+    Enriquece `data_path` bloco a bloco e grava em `out_path` (.parquet,
+    incremental; .csv se não houver pyarrow). Retorna as contagens.
+    """
+    out_path = Path(out_path)
+    if not parquet_available():
+        out_path = out_path.with_suffix(".csv")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+
+    stats = {"arquivo": str(out_path)}
+    writer = None
+    try:
+        for i, chunk in enumerate(enrich_chunks(iter_input(data_path, chunk_rows), index, dedup_col, stats)):
+            chunk = chunk.astype("string")
+            if out_path.suffix == ".csv":
+                chunk.to_csv(tmp, mode="w" if i == 0 else "a", header=i == 0, index=False, encoding="utf-8-sig" if i == 0 else "utf-8")
+                continue
+
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if writer is None:
+                schema = pa.schema([pa.field(str(c), pa.string()) for c in chunk.columns])
+                writer = pq.ParquetWriter(tmp, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+    if tmp.exists():
+        tmp.replace(out_path)
+    return stats
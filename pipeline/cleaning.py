@@ -0,0 +1,109 @@
+# pipeline/cleaning.py
+"""
+Funções de padronização compartilhadas pelos builders da camada Gold.
+
+Antes cada notebook redefinia a sua cópia de `norm_missing` /
+`dedup_most_complete`; agora todos importam daqui (a deduplicação fica em
+`pipeline/dedup.py`).
+
+Conversões de texto (números, datas) passam por `parse_unique`: a coluna é
+fatorizada, cada valor distinto é convertido uma única vez e o resultado é
+espalhado para as linhas por posição. Datas e chaves se repetem muito (poucos
+milhares de dias para milhões de linhas), então o custo passa a depender do
+nº de valores distintos. Colunas já tipadas (Parquet) não são reconvertidas.
+"""
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+MISSING_TOKENS = {"": np.nan, "nan": np.nan, "NAN": np.nan, "None": np.nan, "NONE": np.nan}
+
+
+def norm_missing(s: pd.Series) -> pd.Series:
+    """Padroniza nulos e strings vazias."""
+    x = s.astype(str).str.strip()
+    return x.replace(MISSING_TOKENS)
+
+
+def norm_missing_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica `norm_missing` em todas as colunas (entrada lida com dtype=str)."""
+    return pd.DataFrame({c: norm_missing(df[c]) for c in df.columns}, index=df.index)
+
+
+def pick_first_existing(candidates, df_: pd.DataFrame) -> str | None:
+    """Retorna o primeiro nome de coluna existente dentre os candidatos."""
+    return next((c for c in candidates if c in df_.columns), None)
+
+
+def parse_unique(s: pd.Series, parser: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Aplica `parser` só aos valores distintos (não nulos) de `s` e espalha o
+    resultado para as linhas; nulos viram o nulo do tipo de saída.
+    """
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    parsed = parser(pd.Series(uniques))
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=s.index, name=s.name)
+
+
+def to_numeric(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(s):
+        return pd.to_numeric(s, errors="coerce")
+    return parse_unique(s, lambda u: pd.to_numeric(u, errors="coerce"))
+
+
+def to_datetime_safe(s: pd.Series, fmt: str | None = None) -> pd.Series:
+    """
+    Texto -> datetime (NaT se inválido). Sem `fmt`, usa o formato da coluna
+    (`guess_date_format`, a partir do 1º valor preenchido) de forma explícita;
+    se não houver formato reconhecível, cai no parser flexível com dayfirst.
+    """
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    if pd.api.types.is_numeric_dtype(s):
+        return pd.to_datetime(s, errors="coerce", format=fmt)
+
+    fmt = fmt or guess_date_format(s)
+    if fmt:
+        return parse_unique(s, lambda u: pd.to_datetime(u, errors="coerce", format=fmt))
+    return parse_unique(s, lambda u: pd.to_datetime(u, errors="coerce", dayfirst=True))
+
+
+def guess_date_format(s: pd.Series) -> str | None:
+    """
+    Formato da coluna inteira a partir do primeiro valor preenchido. Usado para
+    converter um subconjunto de linhas exatamente como a coluna completa seria
+    convertida.
+
+    Formatos com o ano na frente (ISO, `2016-05-08 00:00:00`) são adivinhados
+    sem `dayfirst`: com ele o pandas avisa a cada coluna e, se o dia do 1º
+    valor for <= 12, devolve `%Y-%d-%m` (dia e mês trocados, demais datas
+    viram NaT). Os outros (`08/05/2016`) seguem com `dayfirst`, como na Silver.
+    """
+    from pandas.tseries.api import guess_datetime_format
+
+    first = s.dropna()
+    if not len(first):
+        return None
+    value = str(first.iloc[0])
+    fmt = guess_datetime_format(value, dayfirst=False)
+    if fmt is not None and fmt.startswith("%Y"):
+        return fmt
+    return guess_datetime_format(value, dayfirst=True)
+
+
+def date_key(d: pd.Series) -> pd.Series:
+    """Datetime (normalizado) -> chave inteira YYYYMMDD (Int64), por aritmética (sem strftime)."""
+    return (d.dt.year * 10000 + d.dt.month * 100 + d.dt.day).astype("Int64")
+
+
+def date_key_to_datetime(keys: pd.Series) -> pd.Series:
+    """Chave YYYYMMDD (int, float ou texto) -> datetime; cada chave distinta é convertida uma vez."""
+    if pd.api.types.is_datetime64_any_dtype(keys):
+        return keys
+    k = pd.to_numeric(keys, errors="coerce").round(0)
+    return parse_unique(
+        k, lambda u: pd.to_datetime(u.astype("int64").astype(str), errors="coerce", format="%Y%m%d")
+    )
@@ -0,0 +1,168 @@
+# pipeline/cube.py
+"""
+Cubo pré-agregado do dashboard.
+
+Todos os filtros do `streamlit/app.py` são dimensões de baixa cardinalidade
+(ano, UF, modalidade, pública/privada). Em vez de filtrar a fato inteira a
+cada interação, a build Gold grava:
+
+- `cubo_dashboard`: 1 linha por célula ano × UF × modalidade × PublicaPrivada,
+  com a contagem de processos e, para cada flag, a soma e o nº de valores
+  válidos (média = soma / válidos);
+- `cubo_tempo`: um `QuantileSketch` (pipeline/accumulators.py) de
+  `tempo_tramitacao_dias` por célula, gravado como linhas (valor, qtd, bits).
+  Células com até `CUBE_TEMPO_BINS` valores distintos ficam exatas; as
+  demais têm os valores arredondados (erro relativo <= 2^-bits), então o
+  tamanho é limitado pelo nº de células, não pelo nº de dias distintos.
+  Os sketches das células selecionadas se somam em `cube_kpis` — mediana
+  de qualquer recorte sem reler a fato (exata se todas forem exatas).
+
+A fato continua sendo usada só para o drill-down (linhas individuais).
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from pipeline.accumulators import QuantileSketch, compact_histograms
+
+CUBE_DIMS = ["ano", "uf", "modalidade_norm", "PublicaPrivada"]
+CUBE_FLAGS = {"processo_encerrado": "encerrado", "flag_risco_alto": "risco_alto"}
+TEMPO_COL = "tempo_tramitacao_dias"
+CUBE_TEMPO_BINS = 64  # valores por célula no cubo_tempo (acima disso, sketch arredondado)
+
+# nomes aceitos na fato (CSV/Parquet da Gold ou já normalizada pelo app)
+_ANO_COLS = ["ANO_DO_PROTOCOLO", "AnoProtocolo", "ano_protocolo"]
+_UF_COLS = ["uf", "UF"]
+_MOD_COLS = ["modalidade_norm", "Modalidade_norm"]
+_PP_DIM_COLS = ["PublicaPrivada", "publica_privada", "PUBLICA_PRIVADA"]
+
+
+def _first(df: pd.DataFrame, candidates: list[str]) -> str | None:
+    return next((c for c in candidates if df is not None and c in df.columns), None)
+
+
+def _na(index: pd.Index) -> pd.Series:
+    return pd.Series(pd.NA, index=index, dtype=object)
+
+
+def cube_keys(fato: pd.DataFrame, dim_ies: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Dimensões do cubo alinhadas linha a linha com a fato."""
+    keys = pd.DataFrame(index=fato.index)
+
+    col_ano = _first(fato, _ANO_COLS)
+    keys["ano"] = (
+        pd.to_numeric(fato[col_ano], errors="coerce").round(0).astype("Int64") if col_ano else _na(fato.index)
+    )
+
+    col_uf = _first(fato, _UF_COLS)
+    keys["uf"] = fato[col_uf].astype(object) if col_uf else _na(fato.index)
+
+    col_mod = _first(fato, _MOD_COLS)
+    keys["modalidade_norm"] = fato[col_mod].astype(object) if col_mod else _na(fato.index)
+
+    # Pública/Privada vem da DIM_IES (via id_ies)
+    col_pp = _first(dim_ies, _PP_DIM_COLS)
+    if col_pp and "id_ies" in fato.columns and "id_ies" in dim_ies.columns:
+        ies = dim_ies.drop_duplicates("id_ies")
+        pp = pd.Series(ies[col_pp].to_numpy(), index=ies["id_ies"].astype(str))
+        keys["PublicaPrivada"] = fato["id_ies"].astype(str).map(pp).astype(object)
+    else:
+        keys["PublicaPrivada"] = _na(fato.index)
+
+    return keys
+
+
+def build_cube(fato: pd.DataFrame, dim_ies: pd.DataFrame | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Retorna (cubo_dashboard, cubo_tempo)."""
+    keys = cube_keys(fato, dim_ies)
+
+    measures = pd.DataFrame({"qtd": np.ones(len(fato), dtype="int64")}, index=fato.index)
+    for col, name in CUBE_FLAGS.items():
+        x = pd.to_numeric(fato[col], errors="coerce") if col in fato.columns else pd.Series(np.nan, index=fato.index)
+        measures[f"soma_{name}"] = x.fillna(0)
+        measures[f"validos_{name}"] = x.notna().astype("int64")
+
+    cube = (
+        pd.concat([keys, measures], axis=1)
+        .groupby(CUBE_DIMS, dropna=False, sort=True)
+        .sum()
+        .reset_index()
+    )
+
+    tempo = pd.to_numeric(fato[TEMPO_COL], errors="coerce") if TEMPO_COL in fato.columns else None
+    if tempo is None or tempo.notna().sum() == 0:
+        cube_tempo = pd.DataFrame(columns=CUBE_DIMS + [TEMPO_COL, "qtd", "bits"])
+    else:
+        cube_tempo = tempo_sketches(keys, tempo)
+
+    return cube, cube_tempo
+
+
+def tempo_sketches(keys: pd.DataFrame, tempo: pd.Series) -> pd.DataFrame:
+    """Um sketch de `tempo` por célula de `keys`, como linhas (dimensões, valor, qtd, bits)."""
+    hist = (
+        keys.assign(**{TEMPO_COL: tempo})
+        .dropna(subset=[TEMPO_COL])
+        .groupby(CUBE_DIMS + [TEMPO_COL], dropna=False, sort=True)
+        .size()
+        .reset_index(name="qtd")
+    )
+    cell = hist.groupby(CUBE_DIMS, dropna=False, sort=True).ngroup().to_numpy()
+    first = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]])  # hist já vem ordenado por célula
+
+    g, values, counts, bits = compact_histograms(cell, hist[TEMPO_COL], hist["qtd"], CUBE_TEMPO_BINS)
+    out = hist[CUBE_DIMS].iloc[first[g]].reset_index(drop=True)
+    out[TEMPO_COL] = values
+    out["qtd"] = counts
+    out["bits"] = pd.array(np.where(bits[g] < 0, None, bits[g]), dtype="Int64")
+    return out
+
+
+# =====================================================
+# Consultas (usadas pelo dashboard)
+# =====================================================
+def cube_mask(frame: pd.DataFrame, filters: dict[str, list]) -> np.ndarray:
+    """
+    Máscara booleana para `{dimensão: valores selecionados}` (lista vazia =
+    sem filtro). Serve para o cubo, para `cubo_tempo` e para `cube_keys(fato)`.
+    """
+    mask = np.ones(len(frame), dtype=bool)
+    for dim, values in filters.items():
+        if values:
+            mask &= frame[dim].isin(values).to_numpy(dtype=bool)
+    return mask
+
+
+def tempo_sketch(cube_tempo: pd.DataFrame) -> QuantileSketch:
+    """Soma dos sketches das linhas de `cube_tempo` (cubos antigos, sem `bits`, são exatos)."""
+    bits = pd.to_numeric(cube_tempo["bits"], errors="coerce").min() if "bits" in cube_tempo.columns else np.nan
+    return QuantileSketch.from_histogram(
+        cube_tempo[TEMPO_COL], cube_tempo["qtd"], None if pd.isna(bits) else int(bits)
+    )
+
+
+def cube_kpis(cube: pd.DataFrame, cube_tempo: pd.DataFrame | None, filters: dict[str, list]) -> dict:
+    """KPIs do dashboard para o recorte: total, % encerrados, tempo mediano, % risco alto."""
+    sel = cube[cube_mask(cube, filters)]
+
+    def _pct(name: str) -> float:
+        validos = sel[f"validos_{name}"].sum()
+        return float(sel[f"soma_{name}"].sum() / validos * 100) if validos else 0.0
+
+    med = None
+    if cube_tempo is not None and len(cube_tempo):
+        med = tempo_sketch(cube_tempo[cube_mask(cube_tempo, filters)]).median()
+
+    return {
+        "total": int(sel["qtd"].sum()),
+        "pct_encerrados": _pct("encerrado"),
+        "tempo_mediano": med,
+        "pct_risco_alto": _pct("risco_alto"),
+    }
+
+
+def cube_counts(cube: pd.DataFrame, filters: dict[str, list], dim: str) -> pd.DataFrame:
+    """Quantidade de processos por `dim` no recorte (NaN fora, como no groupby)."""
+    sel = cube[cube_mask(cube, filters)]
+    return sel.groupby(dim, dropna=True, observed=True)["qtd"].sum().reset_index()
@@ -0,0 +1,215 @@
+# pipeline/dag.py
+"""
+Agendador de DAG para a build Gold.
+
+Cada nó declara:
+- `deps`: nós dos quais depende;
+- `inputs`: arquivos de entrada (ex.: XLSX da Silver) cuja mudança o invalida;
+- `outputs`: arquivos que grava (se faltar algum, o nó é refeito).
+
+Nós independentes rodam em paralelo num pool de processos (um processo novo
+por nó, para medir o pico de memória de cada um). Só são executados os nós
+"sujos" — entrada alterada, saída ausente ou pedido explícito — e tudo o que
+está abaixo deles no grafo. O estado da última execução fica em um JSON; as
+entradas dos nós planejados saem dele antes de rodar e só voltam quando o nó
+termina bem, então um nó que falhou ou não rodou (ou cujo pai foi refeito)
+continua sujo na próxima execução.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+
+@dataclass
+class Node:
+    name: str
+    func: Callable[[dict], dict | None]
+    deps: list[str] = field(default_factory=list)
+    inputs: list[Path] = field(default_factory=list)
+    outputs: list[Path] = field(default_factory=list)
+
+
+# =====================================================
+# Medição (tempo / pico de memória)
+# =====================================================
+def peak_rss_mb() -> float | None:
+    """Pico de memória residente do processo atual (MB), quando disponível."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 2**20
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB; macOS em bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _run_node(func: Callable[[dict], dict | None], ctx: dict) -> dict:
+    t0 = time.perf_counter()
+    info = func(ctx) or {}
+    info["wall_s"] = round(time.perf_counter() - t0, 2)
+    info["peak_mb"] = peak_rss_mb()
+    return info
+
+
+# =====================================================
+# Planejamento (o que precisa rodar)
+# =====================================================
+def fingerprint(path: Path) -> list | None:
+    path = Path(path)
+    if not path.exists():
+        return None
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def load_state(state_file: Path) -> dict:
+    if Path(state_file).exists():
+        return json.loads(Path(state_file).read_text(encoding="utf-8"))
+    return {}
+
+
+def save_state(state_file: Path, state: dict) -> None:
+    Path(state_file).parent.mkdir(parents=True, exist_ok=True)
+    Path(state_file).write_text(json.dumps(state, indent=1), encoding="utf-8")
+
+
+def _downstream(nodes: dict[str, Node], roots: set[str]) -> set[str]:
+    out = set(roots)
+    changed = True
+    while changed:
+        changed = False
+        for n in nodes.values():
+            if n.name not in out and any(d in out for d in n.deps):
+                out.add(n.name)
+                changed = True
+    return out
+
+
+def stale_nodes(nodes: dict[str, Node], state: dict) -> set[str]:
+    """Nós cujas entradas mudaram ou cujas saídas não existem."""
+    stale = set()
+    for n in nodes.values():
+        prev = state.get(n.name)
+        if prev is None:
+            stale.add(n.name)
+            continue
+        if any(not Path(p).exists() for p in n.outputs):
+            stale.add(n.name)
+            continue
+        for p in n.inputs:
+            if prev.get("inputs", {}).get(str(p)) != fingerprint(p):
+                stale.add(n.name)
+                break
+    return stale
+
+
+def plan(nodes: dict[str, Node], state: dict, only: list[str] | None = None, force: bool = False) -> set[str]:
+    """Conjunto de nós a executar: sujos (ou `only`) + todos os seus dependentes."""
+    if force:
+        return set(nodes)
+    unknown = [n for n in (only or []) if n not in nodes]
+    if unknown:
+        raise KeyError(f"Nós desconhecidos: {unknown}. Disponíveis: {sorted(nodes)}")
+    roots = set(only) if only else stale_nodes(nodes, state)
+    return _downstream(nodes, roots)
+
+
+# =====================================================
+# Execução
+# =====================================================
+def run_dag(
+    nodes: list[Node],
+    ctx: dict,
+    state_file: Path,
+    max_workers: int | None = None,
+    only: list[str] | None = None,
+    force: bool = False,
+) -> list[dict]:
+    """
+    Executa o DAG e retorna um relatório por nó
+    (`node`, `status`, `wall_s`, `peak_mb` + o que o nó devolver).
+    """
+    by_name = {n.name: n for n in nodes}
+    for n in nodes:
+        missing = [d for d in n.deps if d not in by_name]
+        if missing:
+            raise KeyError(f"Nó '{n.name}' depende de nós inexistentes: {missing}")
+
+    state = load_state(state_file)
+    todo = plan(by_name, state, only=only, force=force)
+    report = [{"node": n, "status": "em dia"} for n in by_name if n not in todo]
+
+    if not todo:
+        return report
+
+    # tudo o que vai rodar (sujos + dependentes) deixa de estar "em dia" até
+    # terminar bem: falha, dependência que falhou ou interrupção mantêm o nó sujo
+    for name in todo:
+        state.pop(name, None)
+    save_state(state_file, state)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    done: set[str] = set(by_name) - todo
+    failed: set[str] = set()
+    running = {}
+
+    def _ready() -> list[str]:
+        return [
+            name for name in sorted(todo)
+            if name not in done and name not in failed and name not in running.values()
+            and all(d in done for d in by_name[name].deps)
+        ]
+
+    # um processo novo por nó: o pico de memória medido é só daquele nó
+    with ProcessPoolExecutor(max_workers=max_workers, max_tasks_per_child=1) as pool:
+        while True:
+            for name in _ready():
+                running[pool.submit(_run_node, by_name[name].func, ctx)] = name
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                try:
+                    info = fut.result()
+                except Exception as exc:  # noqa: BLE001 - reportado e propagado no final
+                    failed.add(name)
+                    report.append({"node": name, "status": f"erro: {exc!r}"})
+                    continue
+
+                done.add(name)
+                report.append({"node": name, "status": "ok", **info})
+                state[name] = {"inputs": {str(p): fingerprint(p) for p in by_name[name].inputs}}
+                save_state(state_file, state)
+
+    skipped = todo - done - failed
+    for name in sorted(skipped):
+        report.append({"node": name, "status": "não executado (dependência falhou)"})
+    if failed:
+        raise RuntimeError(f"Falha nos nós: {sorted(failed)}", report)
+
+    return report
+
+
+def format_report(report: list[dict]) -> str:
+    lines = [f"{'nó':<42} {'status':<10} {'tempo (s)':>10} {'pico (MB)':>10}"]
+    for r in report:
+        peak = r.get("peak_mb")
+        lines.append(
+            f"{r['node']:<42} {r['status'][:10]:<10} "
+            f"{r.get('wall_s', ''):>10} {'' if peak is None else f'{peak:.0f}':>10}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,131 @@
+# pipeline/dedup.py
+"""
+Deduplicação "linha mais completa por chave" em uma passada, bloco a bloco.
+
+A versão antiga (copiada em cada notebook da Gold) contava os preenchidos da
+tabela inteira, ordenava por (chave, completude) e só então fazia o
+`drop_duplicates` — para a DIM_IES/DIM_CURSO, ordenar centenas de milhares
+de linhas largas de texto para ficar com alguns milhares de chaves. Aqui:
+
+- a chave é fatorizada (hash) e a melhor linha de cada chave sai de máximos
+  por grupo (`np.maximum.at`), critério a critério, sem ordenar as linhas;
+- `MostCompleteDedup.update` processa um bloco por vez e guarda só a melhor
+  linha de cada chave vista até agora: a memória depende do nº de chaves,
+  não do nº de linhas, e a entrada pode vir em blocos (fora da memória);
+- critérios de desempate configuráveis (`tie_break`), em ordem: `"completude"`
+  (nº de colunas preenchidas) ou o nome de uma coluna de recência (data mais
+  recente vence, ex.: `DATA_DO_ULTIMO_ATO`). Empate em tudo: 1ª ocorrência.
+
+Só o resultado (uma linha por chave) é ordenado pela chave no final — mesma
+saída da versão com sort.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pipeline.cleaning import to_datetime_safe
+
+COMPLETUDE = "completude"
+DEFAULT_TIE_BREAK = (COMPLETUDE,)
+
+_LOWEST = np.iinfo(np.int64).min  # sem valor: perde de qualquer valor
+
+
+def _rank(chunk: pd.DataFrame, criterion: str) -> np.ndarray:
+    """Valor do critério por linha (int64; maior = melhor)."""
+    if criterion == COMPLETUDE:
+        return chunk.notna().sum(axis=1).to_numpy(dtype=np.int64)
+    if criterion not in chunk.columns:
+        raise KeyError(f"Coluna de desempate '{criterion}' não encontrada.")
+
+    s = chunk[criterion]
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        # ex.: chaves YYYYMMDD já numéricas
+        x = pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        return np.where(np.isnan(x), _LOWEST, x).astype(np.int64)
+    d = to_datetime_safe(s)
+    # NaT já é o menor int64
+    return d.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def _best_positions(codes: np.ndarray, n_groups: int, ranks: Sequence[np.ndarray]) -> np.ndarray:
+    """Posição da melhor linha de cada grupo (critérios em ordem; empate: a primeira)."""
+    cand = np.ones(len(codes), dtype=bool)
+    for r in ranks:
+        r = np.where(cand, r, _LOWEST)
+        top = np.full(n_groups, _LOWEST, dtype=np.int64)
+        np.maximum.at(top, codes, r)
+        cand &= r == top[codes]
+
+    first = np.full(n_groups, len(codes), dtype=np.int64)
+    np.minimum.at(first, codes[cand], np.flatnonzero(cand))
+    return first
+
+
+class MostCompleteDedup:
+    """Melhor linha por chave, acumulada bloco a bloco (`update`) e lida com `result`."""
+
+    def __init__(self, key: str, tie_break: Sequence[str] = DEFAULT_TIE_BREAK):
+        self.key = key
+        self.tie_break = tuple(tie_break)
+        self.linhas = 0
+        self._rows: pd.DataFrame | None = None
+        self._ranks: list[np.ndarray] = []
+
+    def _reduce(self, frame: pd.DataFrame, ranks: list[np.ndarray]) -> tuple[pd.DataFrame, list[np.ndarray]]:
+        # nulo na chave forma um grupo próprio (como no drop_duplicates)
+        codes, uniques = pd.factorize(frame[self.key], use_na_sentinel=False)
+        pos = _best_positions(codes, len(uniques), ranks)
+        return frame.iloc[pos], [r[pos] for r in ranks]
+
+    def update(self, chunk: pd.DataFrame) -> "MostCompleteDedup":
+        if self.key not in chunk.columns:
+            raise KeyError(f"Coluna-chave '{self.key}' não encontrada.")
+        self.linhas += len(chunk)
+        if not len(chunk):
+            return self
+
+        rows, ranks = self._reduce(chunk, [_rank(chunk, c) for c in self.tie_break])
+        if self._rows is not None:
+            # linhas já guardadas vêm antes: no empate fica a ocorrência anterior
+            rows = pd.concat([self._rows, rows])
+            ranks = [np.concatenate([a, b]) for a, b in zip(self._ranks, ranks)]
+            rows, ranks = self._reduce(rows, ranks)
+        self._rows, self._ranks = rows, ranks
+        return self
+
+    def result(self, sort: bool = True) -> pd.DataFrame:
+        """Uma linha por chave (ordenada pela chave, nulo no fim, com `sort=True`)."""
+        if self._rows is None:
+            return pd.DataFrame(columns=[self.key])
+        return self._rows.sort_values(self.key, kind="stable") if sort else self._rows
+
+
+def dedup_chunks(
+    chunks: Iterable[pd.DataFrame],
+    key: str,
+    tie_break: Sequence[str] = DEFAULT_TIE_BREAK,
+    sort: bool = True,
+) -> pd.DataFrame:
+    """Deduplica uma sequência de blocos (ex.: leitura em `chunksize`) sem juntá-los."""
+    dedup = MostCompleteDedup(key, tie_break)
+    for chunk in chunks:
+        dedup.update(chunk)
+    return dedup.result(sort)
+
+
+def dedup_most_complete(
+    df_in: pd.DataFrame,
+    key: str,
+    tie_break: Sequence[str] = DEFAULT_TIE_BREAK,
+    chunk_rows: int | None = None,
+) -> pd.DataFrame:
+    """Mantém a linha mais 'completa' por chave (mais colunas preenchidas), ordenada pela chave."""
+    if not chunk_rows:
+        return MostCompleteDedup(key, tie_break).update(df_in).result()
+    return dedup_chunks(
+        (df_in.iloc[i:i + chunk_rows] for i in range(0, len(df_in), chunk_rows)), key, tie_break
+    )
@@ -0,0 +1,1025 @@
+# pipeline/gold.py
+"""
+Build da camada Gold em uma única passada.
+
+Substitui a execução dos notebooks `gold/dim_*.ipynb`, `fato_processo.ipynb`
+e `metricas_derivadas.ipynb` (cada um relia os mesmos XLSX da Silver):
+
+1. lê e padroniza `2018_anonimizado.xlsx` + `2019_anonimizado.xlsx` uma vez;
+2. deriva colunas compartilhadas (UF, município, modalidade, datas);
+3. passa o mesmo frame para cada builder de dimensão, métricas e fato;
+4. grava todas as saídas em `gold/output/`.
+
+Por padrão a build roda como DAG (ver `pipeline.dag`): as dimensões rodam em
+paralelo e só são refeitos os nós cujas entradas mudaram (e os dependentes).
+
+Uso (na raiz do repositório):
+
+    python -m pipeline.gold
+    python -m pipeline.gold --input gold/2018_anonimizado.xlsx gold/2019_anonimizado.xlsx
+    python -m pipeline.gold --only dim_ies      # refaz dim_ies (e dependentes)
+    python -m pipeline.gold --force --workers 4
+    python -m pipeline.gold --serial            # tudo em um processo, sem DAG
+    python -m pipeline.gold --incremental       # só a fato, reprocessando processos alterados
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date
+from functools import partial
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from pipeline.accumulators import ResumoAccumulator
+from pipeline.cleaning import (
+    date_key,
+    norm_missing,
+    norm_missing_frame,
+    pick_first_existing,
+    to_datetime_safe,
+    to_numeric,
+)
+from pipeline.cube import build_cube
+from pipeline.dag import Node, format_report, run_dag
+from pipeline.dedup import dedup_most_complete
+from pipeline.ingest import read_xlsx
+from pipeline.keys import decode, dim_atributo_from, dim_local_from, dim_modalidade_from, encode_fato
+from pipeline.keywords import contains_any, keyword_hits
+from pipeline.metadata import METADATA_FILE, build_metadata, file_hash, write_metadata
+from pipeline.partitions import write_partitioned
+from pipeline.risk import RISK_VERSION, risk_components, risk_score
+from pipeline.store import read_frame, read_table, stage_ext, write_frame, write_table
+
+# =====================================================
+# Paths
+# =====================================================
+BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do repo
+GOLD_DIR = BASE_DIR / "gold"
+SILVER_DIR = BASE_DIR / "silver"
+OUT_DIR = GOLD_DIR / "output"
+
+INPUT_NAMES = ["2018_anonimizado.xlsx", "2019_anonimizado.xlsx"]
+
+DATE_COLS = ["DATA", "DATA_DO_ULTIMO_ATO", "DATA_DE_ENTRADA_FASE_ATUAL"]
+
+
+def default_input_files() -> list[Path]:
+    """Procura os XLSX primeiro em `gold/` e depois em `silver/`."""
+    for d in [GOLD_DIR, SILVER_DIR]:
+        files = [d / name for name in INPUT_NAMES]
+        if all(f.exists() for f in files):
+            return files
+    return [GOLD_DIR / name for name in INPUT_NAMES]
+
+
+# =====================================================
+# Leitura + base compartilhada
+# =====================================================
+def read_silver(files: list[Path]) -> pd.DataFrame:
+    """Lê os XLSX da Silver (via cache colunar) e consolida em um único dataframe."""
+    dfs = []
+    for f in files:
+        f = Path(f)
+        if not f.exists():
+            raise FileNotFoundError(f"Arquivo não encontrado: {f}")
+        tmp = read_xlsx(f, dtype=str)
+        tmp["fonte_arquivo"] = f.name
+        dfs.append(tmp)
+
+    return pd.concat(dfs, ignore_index=True)
+
+
+def _col_or_na(df: pd.DataFrame, col: str) -> pd.Series:
+    if col in df.columns:
+        return df[col]
+    return pd.Series(np.nan, index=df.index, dtype=object)
+
+
+def prepare_base(df: pd.DataFrame, date_formats: dict[str, str | None] | None = None) -> pd.DataFrame:
+    """
+    Padroniza nulos em todas as colunas e cria as derivações usadas por mais
+    de um builder (prefixo `_`):
+    - `_uf`, `_municipio`: Processo com fallback para Cadastro, em caixa alta
+    - `_modalidade_norm`: modalidade normalizada (mesma regra da DIM_MODALIDADE)
+    - `_dt_<COLUNA>`: colunas de data já convertidas (dayfirst, ou o formato
+      de `date_formats` quando informado)
+    """
+    base = norm_missing_frame(df)
+
+    uf = _col_or_na(base, "UF_PROCESSO").fillna(_col_or_na(base, "UF_CADASTRO"))
+    mun = _col_or_na(base, "MUNICIPIO_PROCESSO").fillna(_col_or_na(base, "MUNICIPIO_CADASTRO"))
+    base["_uf"] = uf.str.upper()
+    base["_municipio"] = mun.str.upper().fillna("NÃO INFORMADO")
+
+    if "MODALIDADE" in base.columns:
+        m = base["MODALIDADE"].str.upper()
+        base["_modalidade_norm"] = (
+            m.replace({"SEMI-PRESENCIAL": "SEMIPRESENCIAL"}).fillna("NÃO INFORMADO")
+        )
+    else:
+        base["_modalidade_norm"] = "NÃO INFORMADO"
+
+    for c in DATE_COLS:
+        if c in base.columns:
+            base[f"_dt_{c}"] = to_datetime_safe(base[c], (date_formats or {}).get(c))
+
+    return base
+
+
+# =====================================================
+# Dimensões
+# =====================================================
+DIM_CURSO_COLS = [
+    "CODIGO_DO_CURSO",
+    "NOME_CURSO_REGULACAO",
+    "GRAU",
+    "CARGA_HORARIA_CADASTRO",
+    "CODIGO_AREA_GERAL_CINE",
+    "AREA_GERAL_CINE",
+]
+IES_ID_COLS = ["IES_ID_FAKE", "CODIGO_DA_IES"]
+IES_NOME_COLS = ["IES_NOME_FAKE", "NOME_DA_IES"]
+DIM_IES_ATTRS = [
+    "ORGANIZACAO_ACADEMICA",
+    "SISTEMA_DE_ENSINO",
+    "CATEGORIA_ADMINISTRATIVA",
+    "SITUACAO_DA_IES",
+    "UF_PROCESSO",
+    "UF_CADASTRO",
+    "MUNICIPIO_PROCESSO",
+    "MUNICIPIO_CADASTRO",
+]
+
+
+def dim_source_columns(base: pd.DataFrame) -> list[str]:
+    """Colunas da base lidas por DIM_CURSO, DIM_IES e DIM_TEMPO (a build incremental guarda só estas)."""
+    cols = [*DIM_CURSO_COLS, *IES_ID_COLS, *IES_NOME_COLS, *DIM_IES_ATTRS, *(f"_dt_{c}" for c in DATE_COLS)]
+    return [c for c in dict.fromkeys(cols) if c in base.columns]
+
+
+def build_dim_curso(base: pd.DataFrame) -> pd.DataFrame:
+    required = DIM_CURSO_COLS
+    missing = [c for c in required if c not in base.columns]
+    if missing:
+        raise KeyError(f"Colunas não encontradas no dataframe: {missing}")
+
+    dim_curso = base[required].copy()
+    dim_curso["AREA_GERAL_CINE"] = dim_curso["AREA_GERAL_CINE"].fillna("Não informado")
+    dim_curso = dim_curso.dropna(subset=["CODIGO_DO_CURSO"])
+
+    dim_curso = dim_curso.rename(columns={
+        "CODIGO_DO_CURSO": "id_curso",
+        "NOME_CURSO_REGULACAO": "nome_curso",
+        "GRAU": "grau",
+        "CARGA_HORARIA_CADASTRO": "carga_horaria_cadastro",
+        "CODIGO_AREA_GERAL_CINE": "cod_cine_area_geral",
+        "AREA_GERAL_CINE": "cine_area_geral",
+    })
+
+    dim_curso = dedup_most_complete(dim_curso, "id_curso")
+    return dim_curso.sort_values("id_curso").reset_index(drop=True)
+
+
+def build_dim_ies(base: pd.DataFrame) -> pd.DataFrame:
+    ies_id_col = pick_first_existing(IES_ID_COLS, base)
+    ies_name_col = pick_first_existing(IES_NOME_COLS, base)
+
+    if ies_id_col is None:
+        raise KeyError("Não encontrei coluna de id de IES (IES_ID_FAKE ou CODIGO_DA_IES).")
+
+    cols = [ies_id_col]
+    if ies_name_col is not None:
+        cols.append(ies_name_col)
+
+    for c in DIM_IES_ATTRS:
+        if c in base.columns and c not in cols:
+            cols.append(c)
+
+    dim_ies = base[cols].copy()
+    dim_ies["UF"] = _col_or_na(dim_ies, "UF_PROCESSO").fillna(_col_or_na(dim_ies, "UF_CADASTRO"))
+    dim_ies = dim_ies.dropna(subset=[ies_id_col])
+
+    for c in ["ORGANIZACAO_ACADEMICA", "SISTEMA_DE_ENSINO", "CATEGORIA_ADMINISTRATIVA", "SITUACAO_DA_IES"]:
+        if c in dim_ies.columns:
+            dim_ies[c] = dim_ies[c].str.upper()
+
+    if "CATEGORIA_ADMINISTRATIVA" in dim_ies.columns:
+        cat = dim_ies["CATEGORIA_ADMINISTRATIVA"].astype(str).str.upper()
+        dim_ies["PUBLICA_PRIVADA"] = np.where(cat.str.contains("PÚBLIC|PUBLIC", na=False), "PÚBLICA", "PRIVADA")
+    else:
+        dim_ies["PUBLICA_PRIVADA"] = "DESCONHECIDO"
+
+    if "SISTEMA_DE_ENSINO" in dim_ies.columns:
+        sist = dim_ies["SISTEMA_DE_ENSINO"].astype(str).str.upper()
+        dim_ies["AMBITO_ADMINISTRATIVO"] = np.select(
+            [sist.str.contains("FEDERAL", na=False),
+             sist.str.contains("ESTADUAL", na=False),
+             sist.str.contains("MUNICIPAL", na=False)],
+            ["FEDERAL", "ESTADUAL", "MUNICIPAL"],
+            default="OUTROS"
+        )
+    else:
+        dim_ies["AMBITO_ADMINISTRATIVO"] = "DESCONHECIDO"
+
+    rename_map = {
+        ies_id_col: "id_ies",
+        ies_name_col: "nome_ies" if ies_name_col else None,
+        "ORGANIZACAO_ACADEMICA": "organizacao_academica",
+        "SISTEMA_DE_ENSINO": "sistema_de_ensino",
+        "CATEGORIA_ADMINISTRATIVA": "categoria_administrativa",
+        "SITUACAO_DA_IES": "situacao_da_ies",
+        "UF": "uf",
+        "MUNICIPIO_PROCESSO": "municipio_processo",
+        "MUNICIPIO_CADASTRO": "municipio_cadastro",
+    }
+    rename_map = {k: v for k, v in rename_map.items() if k is not None and v is not None and k in dim_ies.columns}
+    dim_ies = dim_ies.rename(columns=rename_map)
+
+    return dedup_most_complete(dim_ies, "id_ies").reset_index(drop=True)
+
+
+def build_dim_local(base: pd.DataFrame) -> pd.DataFrame:
+    return dim_local_from(base["_uf"], base["_municipio"])
+
+
+def build_dim_modalidade(base: pd.DataFrame) -> pd.DataFrame:
+    if "MODALIDADE" not in base.columns:
+        raise KeyError("Coluna MODALIDADE não encontrada.")
+    return dim_modalidade_from(base["_modalidade_norm"])
+
+
+def build_dim_tempo(base: pd.DataFrame) -> pd.DataFrame:
+    date_cols = [f"_dt_{c}" for c in DATE_COLS if f"_dt_{c}" in base.columns]
+    if not date_cols:
+        raise KeyError("Não encontrei colunas de data (DATA/DATA_DO_ULTIMO_ATO/DATA_DE_ENTRADA_FASE_ATUAL).")
+
+    dates = pd.concat([base[c].dt.normalize() for c in date_cols], axis=0)
+    dates = dates.dropna().drop_duplicates().sort_values()
+
+    dim_tempo = pd.DataFrame({"data": dates.to_numpy()})
+    dim_tempo["id_data"] = date_key(dim_tempo["data"]).astype(int)
+    dim_tempo["ano"] = dim_tempo["data"].dt.year
+    dim_tempo["mes"] = dim_tempo["data"].dt.month
+    dim_tempo["dia"] = dim_tempo["data"].dt.day
+    dim_tempo["trimestre"] = dim_tempo["data"].dt.quarter
+    dim_tempo["semana_ano"] = dim_tempo["data"].dt.isocalendar().week.astype(int)
+    dim_tempo["dia_semana"] = dim_tempo["data"].dt.dayofweek
+    dim_tempo["nome_dia"] = dim_tempo["data"].dt.day_name()
+    dim_tempo["nome_mes"] = dim_tempo["data"].dt.month_name()
+    return dim_tempo
+
+
+# =====================================================
+# Métricas derivadas (antigo metricas_derivadas.ipynb)
+# =====================================================
+KW_ENCERRADO_SITU = ["CONCLU", "ENCERR", "ARQUIV", "FINALIZ"]
+KW_ENCERRADO_FASE = [
+    "PUBLICAÇÃO", "PUBLICACAO",
+    "PORTARIA",
+    "GABINETE DO MINISTRO",
+    "DECISÃO FINAL", "DECISAO FINAL",
+    "FINALIZAÇÃO NO SISTEMA", "FINALIZACAO NO SISTEMA",
+    "ARQUIV"
+]
+KW_ATO_SENSIVEL = ["AUTORIZ", "CREDENCI", "RECREDENCI", "RENOVA", "RECONHEC"]
+
+W_VAGAS = 30
+W_END = 20
+W_TEMPO_LONGO = 25
+W_ATO = 25
+
+METRICAS_COLS_OUT = [
+    "id_processo",
+    "id_ies",
+    "id_curso",
+    "UF",
+    "Modalidade_norm",
+    "PublicaPrivada",
+    "AmbitoAdministrativo",
+    "AnoProtocolo",
+    "cine_area_geral",
+    "tempo_tramitacao_dias",
+    "tempo_tramitacao_categoria",
+    "tempo_acima_mediana_global",
+    "tempo_padronizado_zscore",
+    "processo_encerrado",
+    "tipo_encerramento",
+    "ano_encerramento",
+    "processo_ativo",
+    "tempo_em_aberto_dias",
+    "faixa_tempo_em_aberto",
+    "tem_divergencia_vagas",
+    "endereco_divergente_flag",
+    "ato_sensivel_flag",
+    "flag_risco_alto",
+    "risco_score",
+    "risco_faixa",
+    "risco_versao",
+    "score_risco_regulatorio",
+    "qtd_processos_por_ies",
+    "qtd_processos_por_curso",
+    "qtd_processos_por_area_cine",
+    "fonte_arquivo",
+]
+
+# métricas que também vão para a FATO principal (lidas pelo dashboard)
+FATO_METRICAS = [
+    "processo_encerrado",
+    "processo_ativo",
+    "ano_encerramento",
+    "tempo_em_aberto_dias",
+    "ato_sensivel_flag",
+    "flag_risco_alto",
+    "risco_score",
+    "risco_faixa",
+    "risco_versao",
+]
+
+METRICAS_MD = """# 📌 Mini-dicionário — Métricas Derivadas (Gold)
+
+| Métrica | Tipo | Descrição (objetiva) |
+|---|---:|---|
+| processo_encerrado | 0/1 | Proxy de encerramento administrativo (situação/fase) |
+| tipo_encerramento | texto | EM_ANDAMENTO / DEFERIDO / INDEFERIDO / ARQUIVADO / ENCERRADO_ADMIN |
+| ano_encerramento | inteiro | Ano do encerramento (quando aplicável) |
+| tempo_tramitacao_categoria | texto | Curto (≤1 ano) / Médio (1–2 anos) / Longo (>2 anos) |
+| tempo_acima_mediana_global | 0/1 | 1 se tempo_tramitacao_dias > mediana global |
+| tempo_padronizado_zscore | num | z-score do tempo de tramitação (outliers) |
+| ato_sensivel_flag | 0/1 | 1 se ATO for sensível (autoriz./credenc./etc.) |
+| flag_risco_alto | 0/1 | 1 se risco_faixa = Alto |
+| risco_score | 0–100 | Score de risco (tempo/divergências/ato/fase), pesos da versão `risco_versao` |
+| risco_faixa | texto | Baixo (≤33) / Médio (≤66) / Alto |
+| risco_versao | texto | Versão das regras do score (`pipeline/risk.py`) |
+| score_risco_regulatorio | 0–100 | Score ponderado (vagas/endereço/tempo/ato) |
+| qtd_processos_por_ies | inteiro | Volume de processos associados à mesma IES |
+| qtd_processos_por_curso | inteiro | Volume de processos associados ao mesmo curso |
+| qtd_processos_por_area_cine | inteiro | Volume de processos por área CINE geral |
+| processo_ativo | 0/1 | 1 se não encerrado |
+| tempo_em_aberto_dias | inteiro | Dias desde o protocolo até hoje (somente ativos) |
+| faixa_tempo_em_aberto | texto | Até 1 ano / 1–2 anos / +2 anos |
+"""
+
+
+def _pick_col(df: pd.DataFrame, *candidates: str) -> str | None:
+    return pick_first_existing(candidates, df)
+
+
+def _dates(base: pd.DataFrame, col: str | None) -> pd.Series:
+    if col and f"_dt_{col}" in base.columns:
+        return base[f"_dt_{col}"]
+    if col:
+        return to_datetime_safe(base[col])
+    return pd.Series(pd.NaT, index=base.index, dtype="datetime64[ns]")
+
+
+TEMPO_COLS = ("tempo_tramitacao_dias", "TEMPO_TRAMITACAO_DIAS")
+
+
+def tempo_from_dates(base: pd.DataFrame) -> bool:
+    """
+    `tempo_tramitacao_dias` sai das datas quando não há coluna pronta ou ela
+    está toda vazia. É uma decisão da base inteira: quem processa só parte
+    das linhas (build incremental) a calcula uma vez e repassa para
+    `build_metricas_local`, senão um subconjunto todo vazio cairia nas datas.
+    """
+    col = _pick_col(base, *TEMPO_COLS)
+    return col is None or to_numeric(norm_missing(base[col])).isna().all()
+
+
+def build_metricas_local(base: pd.DataFrame, from_dates: bool | None = None) -> pd.DataFrame:
+    """
+    Parte das métricas derivadas que depende só da própria linha
+    (texto, datas, flags). Colunas auxiliares com prefixo `_`.
+    `from_dates`: ver `tempo_from_dates` (None = decide pela própria `base`).
+    """
+    df = pd.DataFrame(index=base.index)
+    empty = pd.Series(np.nan, index=base.index, dtype=object)
+
+    # ----------------------------- campos-base
+    col_uf_proc = _pick_col(base, "UF_PROCESSO", "UF Processo")
+    col_uf_cad = _pick_col(base, "UF_CADASTRO", "UF Cadastro")
+    col_modal = _pick_col(base, "MODALIDADE", "Modalidade")
+    col_catadm = _pick_col(base, "CATEGORIA_ADMINISTRATIVA", "Categoria Administrativa")
+    col_sistens = _pick_col(base, "SISTEMA_DE_ENSINO", "Sistema de Ensino")
+    col_end_div = _pick_col(base, "ENDERECO_DIVERGENTE", "Endereço Divergente", "Endereco Divergente")
+    col_div_vag = _pick_col(base, "TEM_DIVERGENCIA_VAGAS", "tem_divergencia_vagas")
+    col_vag_proc = _pick_col(base, "VAGAS_SOLICITADAS_PROCESSO", "Vagas Solicitadas Processo")
+    col_vag_cad = _pick_col(base, "VAGAS_AUTORIZADAS_CADASTRO", "Vagas Autorizadas Cadastro")
+    col_data_proto = _pick_col(base, "DATA", "Data")
+    col_data_ult_ato = _pick_col(base, "DATA_DO_ULTIMO_ATO", "Data do Último Ato")
+    col_data_fase = _pick_col(base, "DATA_DE_ENTRADA_FASE_ATUAL", "Data de Entrada Fase Atual")
+    col_tempo = _pick_col(base, *TEMPO_COLS)
+
+    df["UF"] = base[col_uf_proc] if col_uf_proc else (base[col_uf_cad] if col_uf_cad else empty)
+
+    if col_modal:
+        df["Modalidade_norm"] = base[col_modal].str.upper().replace({
+            "EAD": "EAD",
+            "À DISTÂNCIA": "EAD",
+            "A DISTANCIA": "EAD",
+            "PRESENCIAL": "PRESENCIAL",
+            "SEMIPRESENCIAL": "SEMIPRESENCIAL",
+            "HÍBRIDO": "SEMIPRESENCIAL",
+            "HIBRIDO": "SEMIPRESENCIAL",
+        })
+    else:
+        df["Modalidade_norm"] = empty
+
+    if col_catadm:
+        cat = base[col_catadm].str.upper()
+        df["PublicaPrivada"] = np.where(cat.str.contains("PÚBLIC|PUBLIC", na=False), "PÚBLICA", "PRIVADA")
+    else:
+        df["PublicaPrivada"] = empty
+
+    if col_sistens:
+        sist = base[col_sistens].str.upper()
+        df["AmbitoAdministrativo"] = np.select(
+            [
+                sist.str.contains("FEDERAL", na=False),
+                sist.str.contains("ESTADUAL", na=False),
+                sist.str.contains("MUNICIPAL", na=False),
+            ],
+            ["FEDERAL", "ESTADUAL", "MUNICIPAL"],
+            default="OUTROS"
+        )
+    else:
+        df["AmbitoAdministrativo"] = "DESCONHECIDO"
+
+    if col_end_div:
+        ed = base[col_end_div].str.upper()
+        df["endereco_divergente_flag"] = ed.isin(["SIM", "TRUE", "1", "S"]).astype(int)
+    else:
+        df["endereco_divergente_flag"] = 0
+
+    if col_div_vag:
+        df["tem_divergencia_vagas"] = to_numeric(base[col_div_vag]).fillna(0).astype(int)
+    elif col_vag_proc and col_vag_cad:
+        vag_proc = to_numeric(base[col_vag_proc])
+        vag_cad = to_numeric(base[col_vag_cad])
+        df["dif_vagas_processo_cadastro"] = vag_proc.fillna(0) - vag_cad.fillna(0)
+        df["tem_divergencia_vagas"] = df["dif_vagas_processo_cadastro"].ne(0).astype(int)
+    else:
+        df["dif_vagas_processo_cadastro"] = np.nan
+        df["tem_divergencia_vagas"] = 0
+
+    col_ano_proto = _pick_col(base, "ANO_DO_PROTOCOLO", "Ano do Protocolo")
+    df["AnoProtocolo"] = to_numeric(base[col_ano_proto]).astype("Int64") if col_ano_proto else pd.NA
+
+    # tempo de tramitação: coluna pronta > fase - protocolo > último ato - protocolo
+    df["tempo_tramitacao_dias"] = to_numeric(base[col_tempo]) if col_tempo else np.nan
+    d0 = _dates(base, col_data_proto)
+    d_fase = _dates(base, col_data_fase)
+    d_ult = _dates(base, col_data_ult_ato)
+    if from_dates is None:
+        from_dates = df["tempo_tramitacao_dias"].isna().all()
+    if from_dates:
+        if col_data_proto and col_data_fase:
+            df["tempo_tramitacao_dias"] = (d_fase - d0).dt.days
+        elif col_data_proto and col_data_ult_ato:
+            df["tempo_tramitacao_dias"] = (d_ult - d0).dt.days
+        else:
+            df["tempo_tramitacao_dias"] = np.nan
+    df.loc[df["tempo_tramitacao_dias"] < 0, "tempo_tramitacao_dias"] = np.nan
+
+    # ----------------------------- 4.1 encerramento (proxy)
+    col_situacao = _pick_col(base, "SITUACAO_DO_PROCESSO", "Situação do Processo")
+    col_fase = _pick_col(base, "FASE_ATUAL", "Fase Atual")
+    situ = base[col_situacao] if col_situacao else None
+    fase = base[col_fase] if col_fase else None
+
+    # palavras testadas uma vez por valor distinto (pipeline/keywords.py)
+    n = len(base)
+    k = len(KW_ENCERRADO_SITU)
+    situ_hits = keyword_hits(situ, KW_ENCERRADO_SITU + ["INDEFER", "DEFER", "ARQUIV"], n)
+    fase_hits = keyword_hits(fase, KW_ENCERRADO_FASE + ["ARQUIV"], n)
+
+    proxy_situacao = situ_hits[:, :k].any(axis=1)
+    proxy_fase = fase_hits[:, :-1].any(axis=1)
+    df["processo_encerrado"] = (proxy_situacao | proxy_fase).astype(int)
+
+    df["tipo_encerramento"] = np.select(
+        [
+            df["processo_encerrado"].eq(0),
+            situ_hits[:, k],
+            situ_hits[:, k + 1],
+            situ_hits[:, k + 2] | fase_hits[:, -1],
+        ],
+        ["EM_ANDAMENTO", "INDEFERIDO", "DEFERIDO", "ARQUIVADO"],
+        default="ENCERRADO_ADMIN"
+    )
+
+    # ----------------------------- 4.2 ano de encerramento
+    ano_fim = d_ult.dt.year.fillna(d_fase.dt.year).fillna(df["AnoProtocolo"]).astype("Int64")
+    df["ano_encerramento"] = ano_fim.where(df["processo_encerrado"].eq(1))
+
+    # ----------------------------- 4.3 categorias de tempo
+    t = pd.to_numeric(df["tempo_tramitacao_dias"], errors="coerce")
+    df["tempo_tramitacao_categoria"] = pd.cut(
+        t,
+        bins=[0, 365, 730, np.inf],
+        labels=["Curto (≤1 ano)", "Médio (1–2 anos)", "Longo (>2 anos)"],
+        right=True,
+        include_lowest=True,
+    )
+
+    # ----------------------------- 4.4 ato sensível e score
+    col_ato = _pick_col(base, "ATO", "Ato")
+    ato = base[col_ato] if col_ato else None
+    df["ato_sensivel_flag"] = contains_any(ato, KW_ATO_SENSIVEL, n).astype(int)
+
+    cond_tempo_longo = df["tempo_tramitacao_categoria"].astype(str).str.contains("Longo", na=False)
+
+    df["score_risco_regulatorio"] = (
+        df["tem_divergencia_vagas"] * W_VAGAS
+        + df["endereco_divergente_flag"] * W_END
+        + cond_tempo_longo.astype(int) * W_TEMPO_LONGO
+        + df["ato_sensivel_flag"] * W_ATO
+    ).clip(0, 100).astype(int)
+
+    # entradas do score de risco versionado (pipeline/risk.py), usado em finalize_metricas
+    col_cat_ato = _pick_col(base, "CATEGORIA_ATO", "Categoria do Ato")
+    for name, col in [("fase", col_fase), ("ato", col_ato), ("categoria_ato", col_cat_ato)]:
+        if col:
+            df[f"_risco_{name}"] = base[col].astype("category")
+    col_sede_ead = _pick_col(base, "IS_SEDE_EAD")
+    if col_sede_ead:
+        df["_risco_sede_ead"] = base[col_sede_ead].str.upper().isin(["SIM", "S", "TRUE", "1", "EAD"]).astype(int)
+
+    # ----------------------------- 4.5 chaves de entidade
+    col_id_ies = _pick_col(base, "IES_ID_FAKE", "CODIGO_DA_IES", "Código da IES")
+    col_id_curso = _pick_col(base, "CODIGO_DO_CURSO", "Código do Curso", "CÓDIGO DO CURSO", "Codigo do Curso")
+    col_cine_geral = _pick_col(base, "AREA_GERAL_CINE", "CINE ÁREA GERAL", "CINE_AREA_GERAL", "ROTULO_CINE", "ROTULO CINE")
+
+    df["cine_area_geral"] = base[col_cine_geral].fillna("Não informado") if col_cine_geral else "Não informado"
+    df["id_ies"] = base[col_id_ies] if col_id_ies else pd.NA
+    df["id_curso"] = base[col_id_curso] if col_id_curso else pd.NA
+
+    # ----------------------------- 4.6 situação (tempo em aberto é global: depende de "hoje")
+    df["processo_ativo"] = (df["processo_encerrado"] == 0).astype(int)
+    df["_dt_protocolo"] = d0 if col_data_proto else pd.NaT
+
+    # ----------------------------- id do processo
+    col_proc = _pick_col(base, "NO_DO_PROCESSO", "Nº do Processo", "N_DO_PROCESSO", "NUMERO_DO_PROCESSO", "id_processo")
+    if col_proc:
+        df["id_processo"] = base[col_proc]
+    else:
+        df["id_processo"] = [f"PROC_{x:09d}" for x in range(1, len(df) + 1)]
+
+    df["fonte_arquivo"] = base["fonte_arquivo"] if "fonte_arquivo" in base.columns else pd.NA
+
+    return df
+
+
+def finalize_metricas(
+    local: pd.DataFrame,
+    today: pd.Timestamp | None = None,
+    risk_version: str = RISK_VERSION,
+) -> pd.DataFrame:
+    """
+    Completa as métricas que dependem do conjunto inteiro (mediana, z-score,
+    contagens por entidade) ou da data de referência (tempo em aberto) —
+    inclusive o score de risco, que usa o tempo em aberto.
+    São operações vetoriais baratas sobre colunas já tipadas; por isso a
+    build incremental recalcula só `build_metricas_local` para o que mudou.
+    """
+    today = pd.Timestamp(today or date.today())
+    df = local.reset_index(drop=True).copy()
+
+    # ----------------------------- 4.3 outliers de tempo
+    t = pd.to_numeric(df["tempo_tramitacao_dias"], errors="coerce")
+    median_global = t.median() if t.notna().any() else np.nan
+    df["tempo_acima_mediana_global"] = np.where(t.notna() & (t > median_global), 1, 0)
+
+    mu = t.mean() if t.notna().any() else np.nan
+    sd = t.std(ddof=0) if t.notna().any() else np.nan
+    df["tempo_padronizado_zscore"] = (t - mu) / sd if sd and sd > 0 else np.nan
+
+    # ----------------------------- 4.5 carga por entidade (id ausente -> NaN)
+    df["qtd_processos_por_ies"] = df.groupby("id_ies")["id_ies"].transform("size")
+    df["qtd_processos_por_curso"] = df.groupby("id_curso")["id_curso"].transform("size")
+    df["qtd_processos_por_area_cine"] = df.groupby("cine_area_geral")["cine_area_geral"].transform("size")
+
+    # ----------------------------- 4.6 tempo em aberto (ativos)
+    aberto = (today - pd.to_datetime(df["_dt_protocolo"])).dt.days.where(df["processo_ativo"] == 1)
+    df["tempo_em_aberto_dias"] = aberto.where(aberto >= 0)
+
+    df["faixa_tempo_em_aberto"] = pd.cut(
+        df["tempo_em_aberto_dias"],
+        bins=[0, 365, 730, np.inf],
+        labels=["Até 1 ano", "1–2 anos", "+2 anos"],
+        include_lowest=True,
+    )
+
+    # ----------------------------- 4.7 score de risco (regras versionadas; mesmo do painel)
+    def _helper(name: str) -> str | None:
+        return name if name in df.columns else None
+
+    comp = risk_components(
+        df,
+        tempo_tramit_col="tempo_tramitacao_dias",
+        tempo_aberto_col="tempo_em_aberto_dias",
+        fase_col=_helper("_risco_fase"),
+        ato_col=_helper("_risco_ato"),
+        cat_ato_col=_helper("_risco_categoria_ato"),
+        end_div_col="endereco_divergente_flag",
+        vagas_div_col="tem_divergencia_vagas",
+        sede_ead_col=_helper("_risco_sede_ead"),
+    )
+    score, faixa = risk_score(comp, version=risk_version)
+    df["risco_score"] = score
+    df["risco_faixa"] = faixa
+    df["risco_versao"] = risk_version
+    df["flag_risco_alto"] = (df["risco_faixa"] == "Alto").astype(int)
+
+    return df[[c for c in METRICAS_COLS_OUT if c in df.columns]]
+
+
+def build_metricas(base: pd.DataFrame, today: pd.Timestamp | None = None) -> pd.DataFrame:
+    """Métricas derivadas por processo (mesmas regras de `metricas_derivadas.ipynb`)."""
+    return finalize_metricas(build_metricas_local(base), today=today)
+
+
+def build_resumo(metricas: pd.DataFrame | Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Resumo rápido para QA (`resumo_metricas.csv`), em uma passada com
+    acumuladores combináveis (pipeline/accumulators.py). Aceita a tabela
+    inteira ou um iterável de blocos dela; colunas ausentes saem como NaN.
+    """
+    chunks = [metricas] if isinstance(metricas, pd.DataFrame) else metricas
+    acc = ResumoAccumulator()
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc.to_frame(default_version=RISK_VERSION)
+
+
+# =====================================================
+# Fato
+# =====================================================
+def build_fato(base: pd.DataFrame, metricas: pd.DataFrame | None = None) -> pd.DataFrame:
+    """FATO_PROCESSO_REGULATORIO (grão: 1 linha = 1 processo)."""
+    fact = pd.DataFrame(index=base.index)
+
+    if "NO_DO_PROCESSO" in base.columns:
+        fact["id_processo"] = base["NO_DO_PROCESSO"]
+    else:
+        fact["id_processo"] = pd.Series(range(1, len(base) + 1), index=base.index, dtype="Int64")
+    fact["id_curso"] = base["CODIGO_DO_CURSO"] if "CODIGO_DO_CURSO" in base.columns else pd.NA
+    ies_col = pick_first_existing(["IES_ID_FAKE", "CODIGO_DA_IES"], base)
+    fact["id_ies"] = base[ies_col] if ies_col else pd.NA
+
+    fact["uf"] = base["_uf"]
+    fact["municipio"] = base["_municipio"]
+    fact["modalidade_norm"] = base["_modalidade_norm"]
+
+    if "ANO_DO_PROTOCOLO" in base.columns:
+        fact["ANO_DO_PROTOCOLO"] = base["ANO_DO_PROTOCOLO"]
+
+    # datas -> chaves YYYYMMDD
+    dts = {}
+    for c, key in [
+        ("DATA", "dt_protocolo_key"),
+        ("DATA_DO_ULTIMO_ATO", "dt_ultimo_ato_key"),
+        ("DATA_DE_ENTRADA_FASE_ATUAL", "dt_entrada_fase_key"),
+    ]:
+        if f"_dt_{c}" in base.columns:
+            dts[c] = base[f"_dt_{c}"].dt.normalize()
+            fact[key] = date_key(dts[c])
+        else:
+            fact[key] = pd.Series(pd.NA, index=base.index, dtype="Int64")
+
+    if "tempo_tramitacao_dias" in base.columns:
+        fact["tempo_tramitacao_dias"] = to_numeric(base["tempo_tramitacao_dias"])
+    elif "DATA" in dts and "DATA_DE_ENTRADA_FASE_ATUAL" in dts:
+        fact["tempo_tramitacao_dias"] = (dts["DATA_DE_ENTRADA_FASE_ATUAL"] - dts["DATA"]).dt.days
+    else:
+        fact["tempo_tramitacao_dias"] = np.nan
+    fact.loc[fact["tempo_tramitacao_dias"] < 0, "tempo_tramitacao_dias"] = np.nan
+
+    # vagas
+    for c in ["VAGAS_SOLICITADAS_PROCESSO", "VAGAS_AUTORIZADAS_CADASTRO"]:
+        if c in base.columns:
+            fact[c] = to_numeric(base[c])
+
+    if "dif_vagas_processo_cadastro" in base.columns:
+        fact["dif_vagas_processo_cadastro"] = to_numeric(base["dif_vagas_processo_cadastro"])
+    elif {"VAGAS_SOLICITADAS_PROCESSO", "VAGAS_AUTORIZADAS_CADASTRO"}.issubset(fact.columns):
+        fact["dif_vagas_processo_cadastro"] = (
+            fact["VAGAS_SOLICITADAS_PROCESSO"].fillna(0) - fact["VAGAS_AUTORIZADAS_CADASTRO"].fillna(0)
+        )
+    else:
+        fact["dif_vagas_processo_cadastro"] = np.nan
+
+    if "tem_divergencia_vagas" in base.columns:
+        fact["tem_divergencia_vagas"] = to_numeric(base["tem_divergencia_vagas"]).fillna(0).astype(int)
+    else:
+        fact["tem_divergencia_vagas"] = fact["dif_vagas_processo_cadastro"].fillna(0).ne(0).astype(int)
+
+    # flags
+    if "IS_SEDE_EAD" in base.columns:
+        fact["is_sede_ead_flag"] = base["IS_SEDE_EAD"].str.upper().isin(["SIM", "S", "TRUE", "1", "EAD"]).astype(int)
+    else:
+        fact["is_sede_ead_flag"] = 0
+
+    if "ENDERECO_DIVERGENTE" in base.columns:
+        fact["endereco_divergente_flag"] = base["ENDERECO_DIVERGENTE"].str.upper().isin(["SIM", "S", "TRUE", "1"]).astype(int)
+    else:
+        fact["endereco_divergente_flag"] = 0
+
+    fact["cine_area_geral"] = base["AREA_GERAL_CINE"].fillna("Não informado") if "AREA_GERAL_CINE" in base.columns else "Não informado"
+
+    for c in ["ATO", "CATEGORIA_ATO", "ORGAO", "FASE_ATUAL", "SITUACAO_DO_PROCESSO"]:
+        if c in base.columns:
+            fact[c] = base[c]
+
+    # métricas derivadas usadas pelo dashboard (mesmo índice da base)
+    if metricas is not None:
+        for c in FATO_METRICAS:
+            if c in metricas.columns:
+                fact[c] = metricas[c]
+
+    return fact.reset_index(drop=True)
+
+
+def write_fato(
+    fato: pd.DataFrame,
+    out_dir: Path,
+    dim_local: pd.DataFrame | None = None,
+    dim_modalidade: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """
+    Grava a FATO com chaves substitutas no lugar dos textos (ver `pipeline.keys`)
+    e a DIM_ATRIBUTO correspondente. Sem `dim_local` / `dim_modalidade`, elas
+    são derivadas da própria fato e regravadas. Retorna a fato codificada.
+    """
+    if dim_local is None:
+        dim_local = dim_local_from(fato["uf"], fato["municipio"])
+        write_table(dim_local, "dim_local", out_dir)
+    if dim_modalidade is None:
+        dim_modalidade = dim_modalidade_from(fato["modalidade_norm"])
+        write_table(dim_modalidade, "dim_modalidade", out_dir)
+
+    dim_atributo = dim_atributo_from(fato)
+    write_table(dim_atributo, "dim_atributo", out_dir)
+
+    encoded = encode_fato(fato, dim_local, dim_modalidade, dim_atributo)
+    write_table(encoded, "fato_processo_regulatorio", out_dir, shared=True)
+    write_partitioned(encoded, "fato_processo_regulatorio", out_dir, by="ANO_DO_PROTOCOLO")
+    return encoded
+
+
+# =====================================================
+# Cubo do dashboard
+# =====================================================
+def write_cube(fato: pd.DataFrame, dim_ies: pd.DataFrame | None, out_dir: Path) -> pd.DataFrame:
+    """
+    Grava `cubo_dashboard` + `cubo_tempo` (ver `pipeline.cube`), também
+    particionados por ano, e o sidecar `metadados_app.json` (ver `pipeline.metadata`).
+    """
+    cube, cube_tempo = build_cube(fato, dim_ies)
+    write_table(cube, "cubo_dashboard", out_dir)
+    write_table(cube_tempo, "cubo_tempo", out_dir)
+    write_partitioned(cube, "cubo_dashboard", out_dir, by="ano")
+    write_partitioned(cube_tempo, "cubo_tempo", out_dir, by="ano")
+
+    # sidecar da barra lateral do app (gravado depois da fato)
+    fato_file = next((p for p in [Path(out_dir) / f"fato_processo_regulatorio.{ext}" for ext in ("parquet", "csv")]
+                      if p.exists()), None)
+    write_metadata(build_metadata(fato, cube, file_hash(fato_file) if fato_file else None), out_dir)
+    return cube
+
+
+# =====================================================
+# Orquestração
+# =====================================================
+def _log(step: str, df: pd.DataFrame, t0: float) -> None:
+    print(f"✅ {step}: {df.shape} ({time.perf_counter() - t0:.1f}s)")
+
+
+def build_all(
+    input_files: list[Path] | None = None,
+    out_dir: Path = OUT_DIR,
+    today: pd.Timestamp | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Roda a build Gold completa lendo a Silver uma única vez."""
+    input_files = input_files or default_input_files()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    base = prepare_base(read_silver(input_files))
+    _log("Silver lida e padronizada", base, t0)
+
+    outputs = {}
+    for name, builder in [
+        ("dim_curso", build_dim_curso),
+        ("dim_ies", build_dim_ies),
+        ("dim_local", build_dim_local),
+        ("dim_modalidade", build_dim_modalidade),
+        ("dim_tempo", build_dim_tempo),
+    ]:
+        t0 = time.perf_counter()
+        outputs[name] = builder(base)
+        write_table(outputs[name], name, out_dir)
+        _log(name.upper(), outputs[name], t0)
+
+    t0 = time.perf_counter()
+    metricas = build_metricas(base, today=today)
+    write_table(metricas, "fato_processo_regulatorio_com_metricas", out_dir, encoding="utf-8-sig")
+    resumo = build_resumo(metricas)
+    resumo.to_csv(out_dir / "resumo_metricas.csv", index=False, encoding="utf-8-sig")
+    (out_dir / "dicionario_metricas.md").write_text(METRICAS_MD, encoding="utf-8")
+    outputs["fato_processo_regulatorio_com_metricas"] = metricas
+    outputs["resumo_metricas"] = resumo
+    _log("MÉTRICAS DERIVADAS", metricas, t0)
+
+    t0 = time.perf_counter()
+    fato = build_fato(base, metricas)
+    outputs["fato_processo_regulatorio"] = write_fato(fato, out_dir, outputs["dim_local"], outputs["dim_modalidade"])
+    _log("FATO_PROCESSO_REGULATORIO", outputs["fato_processo_regulatorio"], t0)
+
+    t0 = time.perf_counter()
+    outputs["cubo_dashboard"] = write_cube(fato, outputs["dim_ies"], out_dir)
+    _log("CUBO_DASHBOARD", outputs["cubo_dashboard"], t0)
+
+    return outputs
+
+
+# =====================================================
+# DAG (nós executados em processos separados)
+# =====================================================
+STAGE_DIRNAME = "_stage"
+
+DIM_BUILDERS = {
+    "dim_curso": build_dim_curso,
+    "dim_ies": build_dim_ies,
+    "dim_local": build_dim_local,
+    "dim_modalidade": build_dim_modalidade,
+    "dim_tempo": build_dim_tempo,
+}
+
+# colunas da base que cada dimensão lê (projeção do estágio intermediário)
+DIM_BASE_COLUMNS = {
+    "dim_curso": [
+        "CODIGO_DO_CURSO", "NOME_CURSO_REGULACAO", "GRAU",
+        "CARGA_HORARIA_CADASTRO", "CODIGO_AREA_GERAL_CINE", "AREA_GERAL_CINE",
+    ],
+    "dim_ies": [
+        "IES_ID_FAKE", "CODIGO_DA_IES", "IES_NOME_FAKE", "NOME_DA_IES",
+        "ORGANIZACAO_ACADEMICA", "SISTEMA_DE_ENSINO", "CATEGORIA_ADMINISTRATIVA",
+        "SITUACAO_DA_IES", "UF_PROCESSO", "UF_CADASTRO",
+        "MUNICIPIO_PROCESSO", "MUNICIPIO_CADASTRO",
+    ],
+    "dim_local": ["_uf", "_municipio"],
+    "dim_modalidade": ["MODALIDADE", "_modalidade_norm"],
+    "dim_tempo": [f"_dt_{c}" for c in DATE_COLS],
+}
+
+
+def _stage_dir(ctx: dict) -> Path:
+    return Path(ctx["out_dir"]) / STAGE_DIRNAME
+
+
+def _stage_path(ctx: dict, name: str) -> Path:
+    return _stage_dir(ctx) / f"{name}.{stage_ext()}"
+
+
+def _write_stage(df: pd.DataFrame, ctx: dict, name: str) -> None:
+    write_frame(df, _stage_path(ctx, name))
+
+
+def _read_stage(ctx: dict, name: str, columns: list[str] | None = None) -> pd.DataFrame:
+    return read_frame(_stage_path(ctx, name), columns)
+
+
+def _node_base(ctx: dict) -> dict:
+    base = prepare_base(read_silver(ctx["input_files"]))
+    _write_stage(base, ctx, "base")
+    return {"linhas": len(base)}
+
+
+def _node_dim(name: str, ctx: dict) -> dict:
+    base = _read_stage(ctx, "base", DIM_BASE_COLUMNS.get(name))
+    dim = DIM_BUILDERS[name](base)
+    write_table(dim, name, ctx["out_dir"])
+    return {"linhas": len(dim)}
+
+
+def _node_metricas(ctx: dict) -> dict:
+    out_dir = Path(ctx["out_dir"])
+    metricas = build_metricas(_read_stage(ctx, "base"), today=ctx.get("today"))
+    write_table(metricas, "fato_processo_regulatorio_com_metricas", out_dir, encoding="utf-8-sig")
+    build_resumo(metricas).to_csv(out_dir / "resumo_metricas.csv", index=False, encoding="utf-8-sig")
+    (out_dir / "dicionario_metricas.md").write_text(METRICAS_MD, encoding="utf-8")
+    _write_stage(metricas[[c for c in FATO_METRICAS if c in metricas.columns]], ctx, "metricas")
+    return {"linhas": len(metricas)}
+
+
+def _node_fato(ctx: dict) -> dict:
+    out_dir = Path(ctx["out_dir"])
+    fato = build_fato(_read_stage(ctx, "base"), _read_stage(ctx, "metricas"))
+    write_fato(fato, out_dir, read_table("dim_local", [out_dir]), read_table("dim_modalidade", [out_dir]))
+    return {"linhas": len(fato)}
+
+
+def _node_cubo(ctx: dict) -> dict:
+    out_dir = Path(ctx["out_dir"])
+    dims = {name: read_table(name, [out_dir]) for name in ["dim_ies", "dim_local", "dim_modalidade"]}
+    fato = read_table("fato_processo_regulatorio", [out_dir])
+    fato = fato.assign(uf=decode(fato, "uf", dims), modalidade_norm=decode(fato, "modalidade_norm", dims))
+    cube = write_cube(fato, dims["dim_ies"], out_dir)
+    return {"linhas": len(cube)}
+
+
+def gold_nodes(ctx: dict) -> list[Node]:
+    """Grafo da build Gold: base -> dimensões | métricas -> fato -> cubo."""
+    out_dir = Path(ctx["out_dir"])
+    nodes = [
+        Node("base", _node_base, inputs=list(ctx["input_files"]),
+             outputs=[_stage_path(ctx, "base")]),
+    ]
+    for name in DIM_BUILDERS:
+        nodes.append(Node(name, partial(_node_dim, name), deps=["base"],
+                          outputs=[out_dir / f"{name}.csv"]))
+    nodes.append(Node("metricas_derivadas", _node_metricas, deps=["base"],
+                      outputs=[out_dir / "fato_processo_regulatorio_com_metricas.csv",
+                               out_dir / "resumo_metricas.csv",
+                               _stage_path(ctx, "metricas")]))
+    nodes.append(Node("fato_processo_regulatorio", _node_fato,
+                      deps=["base", "metricas_derivadas", "dim_local", "dim_modalidade"],
+                      outputs=[out_dir / "fato_processo_regulatorio.csv", out_dir / "dim_atributo.csv"]))
+    nodes.append(Node("cubo_dashboard", _node_cubo,
+                      deps=["dim_ies", "dim_local", "dim_modalidade", "fato_processo_regulatorio"],
+                      outputs=[out_dir / "cubo_dashboard.csv", out_dir / "cubo_tempo.csv",
+                               out_dir / METADATA_FILE]))
+    return nodes
+
+
+def run_gold_dag(
+    input_files: list[Path] | None = None,
+    out_dir: Path = OUT_DIR,
+    today: pd.Timestamp | None = None,
+    max_workers: int | None = None,
+    only: list[str] | None = None,
+    force: bool = False,
+) -> list[dict]:
+    """Roda a build Gold como DAG em paralelo; retorna o relatório por nó."""
+    ctx = {
+        "input_files": [Path(f).resolve() for f in (input_files or default_input_files())],
+        "out_dir": Path(out_dir).resolve(),
+        "today": today,
+    }
+    missing = [f for f in ctx["input_files"] if not f.exists()]
+    if missing:
+        raise FileNotFoundError(f"Arquivo não encontrado: {missing[0]}")
+
+    return run_dag(
+        gold_nodes(ctx),
+        ctx,
+        state_file=_stage_dir(ctx) / "dag_state.json",
+        max_workers=max_workers,
+        only=only,
+        force=force,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build da camada Gold (dimensões + fato + métricas).")
+    parser.add_argument("--input", nargs="+", type=Path, help="XLSX da Silver (padrão: 2018 + 2019 anonimizados)")
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR, help="pasta de saída (padrão: gold/output)")
+    parser.add_argument("--data-referencia", type=pd.Timestamp, default=None,
+                        help="data de referência para tempo em aberto (padrão: hoje)")
+    parser.add_argument("--workers", type=int, default=None, help="processos em paralelo (padrão: nº de CPUs)")
+    parser.add_argument("--only", nargs="+", help="refaz apenas estes nós (e seus dependentes)")
+    parser.add_argument("--force", action="store_true", help="refaz todos os nós")
+    parser.add_argument("--serial", action="store_true", help="roda tudo em um único processo (sem DAG)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="atualiza só a fato/métricas, reprocessando os processos novos ou alterados")
+    args = parser.parse_args(argv)
+
+    if args.incremental:
+        from pipeline.incremental import refresh_fato
+
+        info = refresh_fato(args.input, args.out_dir, today=args.data_referencia)
+        for k, v in info.items():
+            print(f"{k:<22} {v}")
+    elif args.serial:
+        build_all(args.input, args.out_dir, today=args.data_referencia)
+    else:
+        report = run_gold_dag(
+            args.input,
+            args.out_dir,
+            today=args.data_referencia,
+            max_workers=args.workers,
+            only=args.only,
+            force=args.force,
+        )
+        print(format_report(report))
+    print("📤 Saídas em:", args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
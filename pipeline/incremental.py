@@ -0,0 +1,214 @@
+# pipeline/incremental.py
+"""
+Atualização incremental da FATO_PROCESSO_REGULATORIO.
+
+Cada linha da Silver recebe uma impressão digital: `NO_DO_PROCESSO` + hash
+do conteúdo da linha. Na atualização:
+
+1. compara as impressões atuais com as da última execução;
+2. processos novos, alterados ou removidos viram "sujos";
+3. só as linhas dos processos sujos passam por `prepare_base`,
+   `build_metricas_local` e `build_fato` (texto, regex, datas);
+4. o resultado substitui essas linhas no estado anterior, que volta para a
+   ordem da Silver atual (mesma ordem de linhas da build completa);
+5. as métricas globais (mediana, z-score, contagens, tempo em aberto e o
+   score de risco) são recalculadas vetorialmente sobre o conjunto inteiro;
+6. DIM_IES, DIM_CURSO e DIM_TEMPO são refeitas a partir das colunas que
+   elas leem, guardadas no estado já padronizadas (sem repetir
+   `prepare_base` nas linhas que não mudaram) — a fato e o cubo gravados
+   usam as dimensões da mesma base.
+
+Decisões que dependem da base inteira (o tempo de tramitação vir das datas,
+ver `tempo_from_dates`, e o formato de cada coluna de data) são tomadas
+sobre a Silver inteira antes de processar o subconjunto. Se a decisão do
+tempo mudar, o estado é descartado.
+
+O estado fica em `gold/output/_stage/incremental/` e é independente da
+build completa. Sem estado anterior (ou se as colunas da Silver mudarem),
+todas as linhas são processadas.
+
+Uso:
+
+    python -m pipeline.gold --incremental
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.cleaning import guess_date_format, norm_missing
+from pipeline.gold import (
+    DATE_COLS,
+    FATO_METRICAS,
+    METRICAS_MD,
+    OUT_DIR,
+    STAGE_DIRNAME,
+    build_dim_curso,
+    build_dim_ies,
+    build_dim_tempo,
+    build_fato,
+    build_metricas_local,
+    build_resumo,
+    default_input_files,
+    dim_source_columns,
+    write_cube,
+    write_fato,
+    finalize_metricas,
+    prepare_base,
+    read_silver,
+    tempo_from_dates,
+)
+from pipeline.store import read_frame, stage_ext, write_frame, write_table
+
+KEY_COL = "NO_DO_PROCESSO"
+STATE_DIRNAME = "incremental"
+STATE_VERSION = 3  # muda quando o formato do estado (colunas auxiliares) muda
+
+
+def _state_paths(out_dir: Path) -> dict[str, Path]:
+    d = Path(out_dir) / STAGE_DIRNAME / STATE_DIRNAME
+    ext = stage_ext()
+    return {
+        "hashes": d / f"hashes.{ext}",
+        "fato": d / f"fato.{ext}",
+        "metricas": d / f"metricas_local.{ext}",
+        "dims": d / f"base_dims.{ext}",
+        "meta": d / "meta.json",
+    }
+
+
+def row_fingerprints(raw: pd.DataFrame, key_col: str = KEY_COL) -> pd.DataFrame:
+    """
+    Impressão digital por linha: chave do processo + hash do conteúdo.
+    `_occ` numera linhas idênticas repetidas, para comparar como multiconjunto.
+    """
+    if key_col not in raw.columns:
+        raise KeyError(f"Coluna '{key_col}' não encontrada: a atualização incremental precisa dela.")
+
+    fp = pd.DataFrame({
+        "_key": norm_missing(raw[key_col]).fillna("").to_numpy(),
+        "_hash": pd.util.hash_pandas_object(raw, index=False).to_numpy(),
+    })
+    fp["_occ"] = fp.groupby(["_key", "_hash"]).cumcount()
+    return fp
+
+
+def dirty_keys(prev: pd.DataFrame, cur: pd.DataFrame) -> tuple[set, set, set]:
+    """Retorna (novos, alterados, removidos) comparando as impressões digitais."""
+    m = cur.merge(prev, on=["_key", "_hash", "_occ"], how="outer", indicator=True)
+    dirty = set(m.loc[m["_merge"] != "both", "_key"])
+
+    prev_keys = set(prev["_key"])
+    cur_keys = set(cur["_key"])
+    novos = dirty - prev_keys
+    removidos = dirty - cur_keys
+    alterados = dirty - novos - removidos
+    return novos, alterados, removidos
+
+
+def current_order(hashes: pd.DataFrame, cur: pd.DataFrame) -> np.ndarray:
+    """Permutação que põe as linhas do estado (`hashes`) na ordem da Silver atual (`cur`)."""
+    pos = hashes.merge(cur.assign(_pos=np.arange(len(cur))), on=["_key", "_hash", "_occ"], how="left")["_pos"]
+    return np.argsort(pos.to_numpy(), kind="stable")
+
+
+def refresh_fato(
+    input_files: list[Path] | None = None,
+    out_dir: Path = OUT_DIR,
+    today: pd.Timestamp | None = None,
+) -> dict:
+    """Atualiza a FATO (e métricas derivadas) processando só os processos que mudaram."""
+    out_dir = Path(out_dir)
+    paths = _state_paths(out_dir)
+    t0 = time.perf_counter()
+
+    raw = read_silver(input_files or default_input_files())
+    cur = row_fingerprints(raw)
+    columns = list(raw.columns)
+    from_dates = bool(tempo_from_dates(raw))
+
+    meta = json.loads(paths["meta"].read_text(encoding="utf-8")) if paths["meta"].exists() else None
+    has_state = (
+        meta is not None
+        and meta.get("columns") == columns
+        and meta.get("versao") == STATE_VERSION
+        and meta.get("tempo_das_datas") == from_dates
+        and all(paths[k].exists() for k in ["hashes", "fato", "metricas", "dims"])
+    )
+
+    if has_state:
+        prev = read_frame(paths["hashes"])
+        novos, alterados, removidos = dirty_keys(prev, cur)
+        dirty = novos | alterados | removidos
+        keep = ~prev["_key"].isin(dirty).to_numpy()
+        prev_fato = read_frame(paths["fato"])[keep]
+        prev_local = read_frame(paths["metricas"])[keep]
+        prev_dims = read_frame(paths["dims"])[keep]
+        prev = prev[keep]
+    else:
+        novos, alterados, removidos = set(cur["_key"]), set(), set()
+        dirty = novos
+        prev = prev_fato = prev_local = prev_dims = None
+
+    # datas do subconjunto no mesmo formato que a coluna inteira teria
+    formats = {c: guess_date_format(norm_missing(raw[c])) for c in DATE_COLS if c in raw.columns}
+
+    rows = cur["_key"].isin(dirty).to_numpy()
+    base_sub = prepare_base(raw[rows], date_formats=formats)
+    local_sub = build_metricas_local(base_sub, from_dates=from_dates).reset_index(drop=True)
+    fato_sub = build_fato(base_sub).reset_index(drop=True)
+    dims_sub = base_sub[dim_source_columns(base_sub)].reset_index(drop=True)
+
+    hashes, fato, local, base_dims = cur[rows].reset_index(drop=True), fato_sub, local_sub, dims_sub
+    if prev is not None:
+        hashes = pd.concat([prev, hashes], ignore_index=True)
+        fato = pd.concat([prev_fato, fato], ignore_index=True)
+        local = pd.concat([prev_local, local], ignore_index=True)
+        base_dims = pd.concat([prev_dims, base_dims], ignore_index=True)
+
+    # ordem da Silver atual: mesmas linhas, na mesma ordem, da build completa
+    order = current_order(hashes, cur)
+    hashes, fato, local, base_dims = (f.iloc[order].reset_index(drop=True) for f in (hashes, fato, local, base_dims))
+
+    # dimensões que a fato e o cubo usam, sobre a base inteira
+    dims = {
+        "dim_curso": build_dim_curso(base_dims),
+        "dim_ies": build_dim_ies(base_dims),
+        "dim_tempo": build_dim_tempo(base_dims),
+    }
+
+    # métricas globais sobre o conjunto inteiro (vetorial, sem texto)
+    metricas = finalize_metricas(local, today=today)
+    for c in FATO_METRICAS:
+        if c in metricas.columns:
+            fato[c] = metricas[c]
+
+    for name, dim in dims.items():
+        write_table(dim, name, out_dir)
+    write_fato(fato, out_dir)
+    write_table(metricas, "fato_processo_regulatorio_com_metricas", out_dir, encoding="utf-8-sig")
+    build_resumo(metricas).to_csv(out_dir / "resumo_metricas.csv", index=False, encoding="utf-8-sig")
+    (out_dir / "dicionario_metricas.md").write_text(METRICAS_MD, encoding="utf-8")
+    write_cube(fato, dims["dim_ies"], out_dir)
+
+    write_frame(hashes, paths["hashes"])
+    write_frame(fato, paths["fato"])
+    write_frame(local, paths["metricas"])
+    write_frame(base_dims, paths["dims"])
+    paths["meta"].write_text(
+        json.dumps({"columns": columns, "versao": STATE_VERSION, "tempo_das_datas": from_dates}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+
+    return {
+        "linhas_total": len(fato),
+        "linhas_recalculadas": int(rows.sum()),
+        "processos_novos": len(novos),
+        "processos_alterados": len(alterados),
+        "processos_removidos": len(removidos),
+        "tempo_s": round(time.perf_counter() - t0, 2),
+    }
@@ -0,0 +1,232 @@
+# pipeline/ingest.py
+"""
+Cache de ingestão dos XLSX.
+
+`pd.read_excel` (openpyxl) é a etapa mais lenta de todos os notebooks. Aqui
+cada planilha é convertida uma única vez para um snapshot colunar (Parquet;
+pickle se alguma coluna tiver tipos mistos) e as leituras seguintes usam o
+snapshot.
+
+Chave do cache:
+- tamanho + mtime do arquivo -> atalho (sem reler o XLSX);
+- se mudarem, calcula o hash do conteúdo: se o conteúdo for o mesmo
+  (ex.: arquivo copiado/tocado), o snapshot é reaproveitado;
+- conteúdo novo -> nova conversão.
+
+Na conversão o workbook é aberto em modo somente leitura (streaming) e só
+as abas pedidas são lidas (todas, em paralelo, uma por processo, com
+`sheet_name=None`). Se `python-calamine` estiver instalado ele é usado no
+lugar do openpyxl. Snapshots e manifesto são gravados num temporário e
+trocados no final: uma conversão interrompida não deixa arquivo truncado.
+
+Uso:
+
+    from pipeline.ingest import read_xlsx
+    df = read_xlsx("total_2018_CINE.xlsx")             # mesma API básica do read_excel
+    df = read_xlsx("2019_anonimizado.xlsx", dtype=str)
+
+Os snapshots ficam em `.xlsx_cache/` ao lado do arquivo (ou em
+`$XLSX_CACHE_DIR`).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from pipeline.store import parquet_available
+
+CACHE_DIRNAME = ".xlsx_cache"
+MANIFEST_NAME = "manifest.json"
+
+
+# =====================================================
+# Chave (tamanho / mtime / hash do conteúdo)
+# =====================================================
+def cache_dir_for(path: Path) -> Path:
+    env = os.environ.get("XLSX_CACHE_DIR")
+    return Path(env) if env else Path(path).resolve().parent / CACHE_DIRNAME
+
+
+def content_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _write_atomic(path: Path, write: Callable[[Path], object]) -> None:
+    """`write(tmp)` num temporário ao lado de `path` (único por processo) e troca atômica no final."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _load_manifest(cache_dir: Path) -> dict:
+    f = cache_dir / MANIFEST_NAME
+    try:
+        return json.loads(f.read_text(encoding="utf-8")) if f.exists() else {}
+    except json.JSONDecodeError:  # manifesto antigo truncado: só perde o atalho do hash
+        return {}
+
+
+def _save_manifest_entry(cache_dir: Path, key: str, entry: dict) -> None:
+    """Relê o manifesto e grava só a entrada `key` (conversões paralelas de outros arquivos não se perdem)."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(cache_dir)
+    manifest[key] = entry
+    text = json.dumps(manifest, indent=1, ensure_ascii=False)
+    _write_atomic(cache_dir / MANIFEST_NAME, lambda tmp: tmp.write_text(text, encoding="utf-8"))
+
+
+def _file_hash(path: Path, manifest: dict) -> str:
+    """Hash do conteúdo; reaproveita o do manifesto se tamanho e mtime não mudaram."""
+    st = path.stat()
+    entry = manifest.get(str(path))
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry["sha256"]
+
+    sha = content_hash(path)
+    manifest[str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+    return sha
+
+
+# =====================================================
+# Conversão (somente leitura, abas em paralelo)
+# =====================================================
+def excel_engine() -> str:
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return "openpyxl"  # o pandas já abre em read_only=True / data_only=True
+    return "calamine"
+
+
+def sheet_names(path: Path) -> list[str]:
+    if excel_engine() == "calamine":
+        from python_calamine import CalamineWorkbook
+        return CalamineWorkbook.from_path(str(path)).sheet_names
+
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def _dtype_tag(dtype) -> str:
+    """Parte do nome do snapshot: `raw`, `str` ou hash curto do `repr` (dicts, tipos numpy...)."""
+    if dtype is None:
+        return "raw"
+    if dtype is str:
+        return "str"
+    return hashlib.sha256(repr(dtype).encode()).hexdigest()[:12]
+
+
+def _sheet_by_position(path: Path, names: list[str], sheet: int) -> str:
+    try:
+        return names[sheet]
+    except IndexError:
+        raise ValueError(f"Aba {sheet} não existe em {path}: o arquivo tem {len(names)} aba(s) {names}") from None
+
+
+def _snapshot_path(cache_dir: Path, sha: str, sheet: str, dtype) -> Path:
+    safe = "".join(ch if ch.isalnum() else "_" for ch in sheet)
+    return cache_dir / f"{sha[:20]}__{safe}__{_dtype_tag(dtype)}"
+
+
+def _write_snapshot(df: pd.DataFrame, stem: Path) -> None:
+    if parquet_available():
+        try:
+            _write_atomic(stem.with_suffix(".parquet"), df.to_parquet)
+            return
+        except (TypeError, ValueError):  # colunas com tipos mistos (ex.: int e texto)
+            pass
+    _write_atomic(stem.with_suffix(".pkl"), df.to_pickle)
+
+
+def _has_snapshot(stem: Path) -> bool:
+    return stem.with_suffix(".parquet").exists() or stem.with_suffix(".pkl").exists()
+
+
+def _read_snapshot(stem: Path) -> pd.DataFrame | None:
+    if stem.with_suffix(".parquet").exists():
+        return pd.read_parquet(stem.with_suffix(".parquet"))
+    if stem.with_suffix(".pkl").exists():
+        return pd.read_pickle(stem.with_suffix(".pkl"))
+    return None
+
+
+def _convert_sheet(path: Path, sheet: str, dtype, stem: Path) -> str:
+    df = pd.read_excel(path, sheet_name=sheet, dtype=dtype, engine=excel_engine())
+    _write_snapshot(df, stem)
+    return sheet
+
+
+def convert_workbook(
+    path: Path,
+    dtype=None,
+    max_workers: int | None = None,
+    sheets: list[str | int] | None = None,
+) -> dict[str, Path]:
+    """
+    Converte as abas `sheets` (nomes ou posições; None = todas) ainda sem
+    snapshot — em paralelo, se forem várias — e retorna {aba: snapshot} de
+    todas as abas do arquivo.
+    """
+    path = Path(path).resolve()
+    cache_dir = cache_dir_for(path)
+    manifest = _load_manifest(cache_dir)
+    cached = manifest.get(str(path), {})
+    sha = _file_hash(path, manifest)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # lista de abas do manifesto quando o conteúdo não mudou (sem abrir o workbook)
+    names = cached.get("sheets") if cached.get("sha256") == sha and cached.get("sheets") else sheet_names(path)
+    stems = {s: _snapshot_path(cache_dir, sha, s, dtype) for s in names}
+    wanted = names if sheets is None else [
+        _sheet_by_position(path, names, s) if isinstance(s, int) else s for s in sheets
+    ]
+    todo = [s for s in dict.fromkeys(wanted) if s in stems and not _has_snapshot(stems[s])]
+
+    if len(todo) == 1:
+        _convert_sheet(path, todo[0], dtype, stems[todo[0]])
+    elif todo:
+        workers = min(len(todo), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_convert_sheet, [path] * len(todo), todo, [dtype] * len(todo),
+                          [stems[s] for s in todo]))
+
+    _save_manifest_entry(cache_dir, str(path), {**manifest[str(path)], "sheets": list(names)})
+    return stems
+
+
+# =====================================================
+# Leitura
+# =====================================================
+def read_xlsx(path, sheet_name: str | int | None = 0, dtype=None) -> pd.DataFrame | dict[str, pd.DataFrame]:
+    """
+    Substituto de `pd.read_excel(path, sheet_name=..., dtype=...)` com cache.
+    `sheet_name=None` retorna todas as abas (dict), como no pandas; com uma
+    aba só, só ela é convertida.
+    """
+    stems = convert_workbook(path, dtype=dtype, sheets=None if sheet_name is None else [sheet_name])
+    names = list(stems)
+
+    if sheet_name is None:
+        return {s: _read_snapshot(stems[s]) for s in names}
+    if isinstance(sheet_name, int):
+        sheet_name = _sheet_by_position(path, names, sheet_name)
+    if sheet_name not in stems:
+        raise ValueError(f"Aba '{sheet_name}' não encontrada em {path}. Abas: {names}")
+    return _read_snapshot(stems[sheet_name])
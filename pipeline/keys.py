@@ -0,0 +1,158 @@
+# pipeline/keys.py
+"""
+Chaves substitutas (surrogate keys) da FATO.
+
+A fato deixa de repetir texto em toda linha (UF, município, modalidade, fase,
+órgão, ato...) e passa a guardar ids inteiros compactos (Int8/Int16/Int32):
+
+- `id_local`       -> DIM_LOCAL (uf + município)
+- `id_modalidade`  -> DIM_MODALIDADE
+- `id_fase`, `id_orgao`, `id_ato`, `id_categoria_ato`, `id_situacao`,
+  `id_cine_area`   -> DIM_ATRIBUTO (tabela de domínio: atributo, id, valor)
+
+Os rótulos só são resolvidos na hora de exibir (`decode`): o id vira o código
+de um `pd.Categorical` cujas categorias vêm da dimensão — sem materializar
+strings por linha.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from pipeline.store import compact_int
+
+# coluna textual da fato -> id na DIM_ATRIBUTO
+FATO_ATRIBUTOS = {
+    "FASE_ATUAL": "id_fase",
+    "ORGAO": "id_orgao",
+    "ATO": "id_ato",
+    "CATEGORIA_ATO": "id_categoria_ato",
+    "SITUACAO_DO_PROCESSO": "id_situacao",
+    "cine_area_geral": "id_cine_area",
+}
+
+
+# =====================================================
+# Dimensões de domínio
+# =====================================================
+def dim_local_from(uf: pd.Series, municipio: pd.Series) -> pd.DataFrame:
+    """DIM_LOCAL: pares (uf, município) distintos, ordenados, id a partir de 1."""
+    local = pd.DataFrame({"uf": uf.to_numpy(), "municipio": municipio.to_numpy()})
+    local = local.dropna(subset=["uf"])
+
+    dim_local = local.drop_duplicates().sort_values(["uf", "municipio"]).reset_index(drop=True)
+    dim_local["id_local"] = dim_local.index + 1
+    return dim_local[["id_local", "uf", "municipio"]]
+
+
+def dim_modalidade_from(modalidade: pd.Series) -> pd.DataFrame:
+    """DIM_MODALIDADE: modalidades distintas, ordenadas, id a partir de 1."""
+    dim_modalidade = (
+        pd.DataFrame({"modalidade_norm": modalidade.to_numpy()})
+          .drop_duplicates()
+          .sort_values("modalidade_norm")
+          .reset_index(drop=True)
+    )
+    dim_modalidade["id_modalidade"] = dim_modalidade["modalidade_norm"].factorize()[0] + 1
+    return dim_modalidade[["id_modalidade", "modalidade_norm"]]
+
+
+def dim_atributo_from(fato: pd.DataFrame) -> pd.DataFrame:
+    """DIM_ATRIBUTO: valores distintos de cada atributo textual da fato."""
+    parts = []
+    for col in FATO_ATRIBUTOS:
+        if col not in fato.columns:
+            continue
+        valores = pd.Series(fato[col].dropna().unique(), dtype=object).sort_values().reset_index(drop=True)
+        parts.append(pd.DataFrame({"atributo": col, "id": valores.index + 1, "valor": valores}))
+    if not parts:
+        return pd.DataFrame(columns=["atributo", "id", "valor"])
+    return pd.concat(parts, ignore_index=True)
+
+
+# =====================================================
+# Codificação (build) / decodificação (app)
+# =====================================================
+def _codes(values: pd.Series, labels: pd.Series) -> pd.Series:
+    """Posição (1..n) de cada valor em `labels`; NA se ausente."""
+    codes = pd.Index(labels).get_indexer(values)
+    ids = pd.Series(codes + 1, index=values.index).where(codes >= 0)
+    return compact_int(ids)
+
+
+def encode_fato(
+    fato: pd.DataFrame,
+    dim_local: pd.DataFrame,
+    dim_modalidade: pd.DataFrame,
+    dim_atributo: pd.DataFrame,
+) -> pd.DataFrame:
+    """Troca as colunas textuais da fato pelos ids das dimensões."""
+    out = fato.copy()
+
+    if {"uf", "municipio"}.issubset(out.columns):
+        pares = pd.MultiIndex.from_frame(dim_local[["uf", "municipio"]])
+        codes = pares.get_indexer(pd.MultiIndex.from_frame(out[["uf", "municipio"]].astype(object)))
+        ids = dim_local["id_local"].to_numpy()[codes]
+        out["id_local"] = compact_int(pd.Series(ids, index=out.index).where(codes >= 0))
+        out = out.drop(columns=["uf", "municipio"])
+
+    if "modalidade_norm" in out.columns:
+        lookup = dim_modalidade.set_index("modalidade_norm")["id_modalidade"]
+        out["id_modalidade"] = compact_int(out["modalidade_norm"].map(lookup))
+        out = out.drop(columns=["modalidade_norm"])
+
+    for col, id_col in FATO_ATRIBUTOS.items():
+        if col not in out.columns:
+            continue
+        dom = dim_atributo[dim_atributo["atributo"] == col].sort_values("id")
+        out[id_col] = _codes(out[col], dom["valor"])
+        out = out.drop(columns=[col])
+
+    return out
+
+
+def _from_ids(ids: pd.Series, id_values: pd.Series, labels: pd.Series) -> pd.Series:
+    """Categorical (códigos = posição do id na dimensão) alinhado a `ids`."""
+    categories = pd.Index(labels.to_numpy())
+    if categories.has_duplicates:  # ex.: mesmo município em UFs diferentes
+        categories = categories.unique()
+        pos = categories.get_indexer(labels.to_numpy())
+    else:
+        pos = np.arange(len(categories))
+
+    lookup = np.full(int(id_values.max()) + 1 if len(id_values) else 1, -1, dtype=np.int64)
+    lookup[id_values.to_numpy(dtype=np.int64)] = pos
+
+    raw = ids.to_numpy(dtype="float64", na_value=np.nan)
+    valid = ~np.isnan(raw) & (raw >= 0) & (raw < len(lookup))
+    codes = np.full(len(ids), -1, dtype=np.int64)
+    codes[valid] = lookup[raw[valid].astype(np.int64)]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=ids.index)
+
+
+def decode(fato: pd.DataFrame, attr: str, dims: dict[str, pd.DataFrame | None]) -> pd.Series | None:
+    """
+    Rótulo de `attr` (uf, municipio, modalidade_norm ou um de FATO_ATRIBUTOS)
+    para cada linha da fato. Se a fato ainda trouxer a coluna textual, ela é
+    usada como está. Retorna None se não houver como resolver.
+    """
+    if attr in fato.columns:
+        return fato[attr]
+
+    dim_local = dims.get("dim_local")
+    dim_modalidade = dims.get("dim_modalidade")
+    dim_atributo = dims.get("dim_atributo")
+
+    if attr in ("uf", "municipio") and "id_local" in fato.columns and dim_local is not None:
+        return _from_ids(fato["id_local"], dim_local["id_local"], dim_local[attr].astype(object))
+
+    if attr == "modalidade_norm" and "id_modalidade" in fato.columns and dim_modalidade is not None:
+        return _from_ids(fato["id_modalidade"], dim_modalidade["id_modalidade"],
+                         dim_modalidade["modalidade_norm"].astype(object))
+
+    id_col = FATO_ATRIBUTOS.get(attr)
+    if id_col and id_col in fato.columns and dim_atributo is not None:
+        dom = dim_atributo[dim_atributo["atributo"] == attr]
+        return _from_ids(fato[id_col], dom["id"], dom["valor"].astype(object))
+
+    return None
@@ -0,0 +1,58 @@
+# pipeline/keywords.py
+"""
+Classificação por palavras-chave sobre valores distintos.
+
+Colunas como FASE_ATUAL, SITUACAO_DO_PROCESSO e ATO têm poucas centenas de
+valores distintos para centenas de milhares de linhas. Em vez de rodar
+`str.contains` linha a linha (uma vez por regra), as palavras-chave são
+testadas uma única vez em cada valor distinto, montando uma tabela
+(valor x palavra). O resultado por linha é só uma indexação pelos códigos
+da coluna (`Categorical.codes` ou `pd.factorize`).
+
+A comparação é "contém a substring", sem diferenciar maiúsculas (os valores
+são passados para caixa alta, como no `str.upper().str.contains(...)`
+original). Nulos nunca casam.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def value_codes(s: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    """Códigos por linha (-1 = nulo) e valores distintos da série."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.codes.to_numpy(), s.cat.categories
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    return codes, pd.Index(uniques)
+
+
+def keyword_table(values, keywords: list[str]) -> np.ndarray:
+    """
+    Tabela booleana (len(values) + 1, len(keywords)): a palavra j aparece no
+    valor i? A última linha (toda False) atende o código -1 (nulo).
+    """
+    keywords = [k.upper() for k in keywords]
+    table = np.zeros((len(values) + 1, len(keywords)), dtype=bool)
+    for i, v in enumerate(values):
+        if pd.isna(v):
+            continue
+        text = str(v).upper()
+        table[i] = [k in text for k in keywords]
+    return table
+
+
+def keyword_hits(s: pd.Series | None, keywords: list[str], n_rows: int | None = None) -> np.ndarray:
+    """Matriz booleana (linhas x palavras). `s=None` -> nenhuma linha casa (`n_rows` linhas)."""
+    if s is None:
+        return np.zeros((n_rows or 0, len(keywords)), dtype=bool)
+    codes, uniques = value_codes(s)
+    return keyword_table(uniques, keywords)[codes]
+
+
+def contains_any(s: pd.Series | None, keywords: list[str], n_rows: int | None = None) -> np.ndarray:
+    """Equivalente a `s.str.upper().str.contains("|".join(keywords), na=False)`."""
+    if s is None:
+        return np.zeros(n_rows or 0, dtype=bool)
+    codes, uniques = value_codes(s)
+    return keyword_table(uniques, keywords).any(axis=1)[codes]
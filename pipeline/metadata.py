@@ -0,0 +1,102 @@
+# pipeline/metadata.py
+"""
+Sidecar de metadados do app (`gold/output/metadados_app.json`).
+
+Gravado pela build Gold junto com o cubo, traz o que a barra lateral do
+dashboard precisa para aparecer antes de ler a fato:
+
+- `dimensoes`: valores distintos (ordenados) e nº de processos por valor de
+  ano, UF, modalidade e pública/privada — os mesmos filtros do cubo;
+- `linhas`: total de processos;
+- `datas`: min/max de cada chave de data (`dt_*_key`, YYYYMMDD);
+- `risco_versao`: versão do score gravado na fato;
+- `versao`: hash do arquivo da fato gravado (muda quando os dados mudam).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.cube import CUBE_DIMS
+
+METADATA_FILE = "metadados_app.json"
+
+
+def _key_date(v) -> str | None:
+    """20240131 -> '2024-01-31'."""
+    if pd.isna(v):
+        return None
+    v = int(v)
+    return f"{v // 10000:04d}-{v // 100 % 100:02d}-{v % 100:02d}"
+
+
+def _dimension(cube: pd.DataFrame, dim: str) -> dict:
+    """Valores distintos (sem nulos/vazios, ordenados) e contagem de cada um."""
+    if dim not in cube.columns:
+        return {"valores": [], "contagens": []}
+    values = cube[dim]
+    if dim == "ano":
+        values = pd.to_numeric(values, errors="coerce").round(0).astype("Int64")
+    else:
+        values = values.astype("string").str.strip().mask(lambda x: x.isin(["", "nan", "None"]))
+    counts = cube["qtd"].groupby(values.to_numpy(), dropna=True).sum().sort_index()
+    cast = int if dim == "ano" else str
+    return {"valores": [cast(v) for v in counts.index], "contagens": [int(c) for c in counts]}
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Hash do conteúdo de um arquivo (lido em blocos)."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def build_metadata(fato: pd.DataFrame, cube: pd.DataFrame, versao: str | None = None) -> dict:
+    """Monta o sidecar a partir da fato e do cubo já calculados."""
+    datas = {}
+    for col in [c for c in fato.columns if c.startswith("dt_") and c.endswith("_key")]:
+        key = pd.to_numeric(fato[col], errors="coerce")
+        datas[col] = {"min": _key_date(key.min()), "max": _key_date(key.max())}
+
+    risco_versao = None
+    if "risco_versao" in fato.columns and fato["risco_versao"].notna().any():
+        risco_versao = str(fato["risco_versao"].dropna().iloc[0])
+
+    return {
+        "versao": versao,
+        "linhas": int(len(fato)),
+        "dimensoes": {dim: _dimension(cube, dim) for dim in CUBE_DIMS},
+        "datas": datas,
+        "risco_versao": risco_versao,
+    }
+
+
+def write_metadata(meta: dict, out_dir: Path) -> Path:
+    """Grava o sidecar (substituição atômica)."""
+    path = Path(out_dir) / METADATA_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def read_metadata(dirs: list[Path], newer_than: list[Path] | None = None) -> dict | None:
+    """
+    Primeiro sidecar encontrado em `dirs`. Com `newer_than`, devolve None se
+    algum desses arquivos for mais novo que o sidecar (fato regravada sem o
+    sidecar acompanhar).
+    """
+    for d in dirs:
+        path = Path(d) / METADATA_FILE
+        if not path.exists():
+            continue
+        mtime = path.stat().st_mtime_ns
+        if any(p.exists() and p.stat().st_mtime_ns > mtime for p in newer_than or []):
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+    return None
@@ -0,0 +1,210 @@
+# pipeline/partitions.py
+"""
+Tabelas Gold particionadas por ano.
+
+Além do arquivo único (`name.parquet` / `.csv` / `.arrow`), a fato e o cubo
+são gravados em partições Parquet, uma por ano, em layout Hive:
+
+    gold/output/fato_processo_regulatorio/
+        ANO_DO_PROTOCOLO=2020/part-0.parquet
+        ANO_DO_PROTOCOLO=2021/part-0.parquet
+        ANO_DO_PROTOCOLO=__HIVE_DEFAULT_PARTITION__/part-0.parquet   (ano nulo)
+        _manifest.json
+
+O `_manifest.json` guarda, por partição, o arquivo, o nº de linhas, min/max
+das colunas numéricas, a soma das flags 0/1, acumuladores combináveis das
+métricas do dashboard (pipeline/accumulators.py) e um hash do conteúdo. Com
+ele o app lista os anos, monta contagens por ano e KPIs de qualquer recorte
+de anos (inclusive medianas) sem abrir nenhuma partição, e lê só as
+partições do recorte de anos selecionado (poda de partições).
+
+A gravação compara o hash de cada partição com o do manifesto anterior e só
+regrava as que mudaram: um ano novo acrescenta uma partição, sem reescrever
+as demais (o mesmo layout serve para atualização incremental no Power BI).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.accumulators import NumericAccumulator, merge_all
+from pipeline.store import FLAG_COLS, cast_gold_types, parquet_available, read_frame
+
+MANIFEST = "_manifest.json"
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+PART_FILE = "part-0.parquet"
+
+# coluna -> guarda quantis? (acumuladores por partição no manifesto)
+ACCUMULATOR_COLS = {
+    "processo_encerrado": False,
+    "flag_risco_alto": False,
+    "tempo_tramitacao_dias": True,
+    "tempo_em_aberto_dias": True,
+}
+
+
+# =====================================================
+# Manifesto
+# =====================================================
+def _scalar(v):
+    """Valor JSON (int/float/None) a partir de um escalar numpy/pandas."""
+    if pd.isna(v):
+        return None
+    v = v.item() if hasattr(v, "item") else v
+    return int(v) if float(v).is_integer() else float(v)
+
+
+def partition_stats(part: pd.DataFrame) -> dict:
+    """Nº de linhas, min/max das colunas numéricas, soma das flags 0/1 e acumuladores."""
+    stats = {"linhas": len(part), "min": {}, "max": {}, "soma": {}, "metricas": {}}
+    for col in part.columns:
+        s = part[col]
+        if not pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+            continue
+        if s.notna().any():
+            stats["min"][col] = _scalar(s.min())
+            stats["max"][col] = _scalar(s.max())
+        if col in FLAG_COLS or col.endswith("_flag"):
+            stats["soma"][col] = _scalar(s.sum())
+        if col in ACCUMULATOR_COLS:
+            stats["metricas"][col] = NumericAccumulator(quantiles=ACCUMULATOR_COLS[col]).update(s).to_dict()
+    return stats
+
+
+def _content_hash(part: pd.DataFrame) -> str:
+    h = hashlib.sha1()
+    h.update(repr([(c, str(t)) for c, t in part.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def read_manifest(table_dir: Path) -> dict | None:
+    """Manifesto da tabela particionada (None se não existir)."""
+    path = Path(table_dir) / MANIFEST
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def find_manifest(name: str, dirs: list[Path]) -> tuple[Path, dict] | None:
+    """(diretório da tabela, manifesto) no primeiro diretório que tiver `name/`."""
+    for d in dirs:
+        manifest = read_manifest(Path(d) / name)
+        if manifest is not None:
+            return Path(d) / name, manifest
+    return None
+
+
+def partition_values(manifest: dict) -> list:
+    """Valores de partição (ordenados; o nulo fica de fora)."""
+    return sorted(p["valor"] for p in manifest["particoes"] if p["valor"] is not None)
+
+
+def selected_partitions(manifest: dict, values: list | None = None) -> list[dict]:
+    """Partições de `values` (None = todas, inclusive a de nulos)."""
+    wanted = None if values is None else {int(v) for v in values}
+    return [
+        p for p in manifest["particoes"]
+        if wanted is None or (p["valor"] is not None and p["valor"] in wanted)
+    ]
+
+
+def merge_partition_metrics(manifest: dict, col: str, values: list | None = None) -> NumericAccumulator | None:
+    """
+    Acumulador de `col` para o recorte de partições `values`, combinando os
+    do manifesto. None se alguma partição não tiver o acumulador (manifesto
+    antigo).
+    """
+    parts = selected_partitions(manifest, values)
+    if any(col not in p.get("metricas", {}) for p in parts):
+        return None
+    return merge_all(
+        (NumericAccumulator.from_dict(p["metricas"][col]) for p in parts),
+        quantiles=ACCUMULATOR_COLS.get(col, False),
+    )
+
+
+# =====================================================
+# Gravação / Leitura
+# =====================================================
+def write_partitioned(df: pd.DataFrame, name: str, out_dir: Path, by: str) -> dict | None:
+    """
+    Grava `out_dir/name/<by>=<valor>/part-0.parquet` + `_manifest.json`.
+    Partições sem mudança (mesmo hash) não são regravadas; partições que
+    deixaram de existir são removidas. Sem pyarrow, não faz nada.
+    """
+    if not parquet_available() or by not in df.columns:
+        return None
+
+    table_dir = Path(out_dir) / name
+    table_dir.mkdir(parents=True, exist_ok=True)
+    previous = {p["pasta"]: p for p in (read_manifest(table_dir) or {}).get("particoes", [])}
+
+    typed = cast_gold_types(df)
+    key = pd.to_numeric(typed[by], errors="coerce").round(0).astype("Int64")
+    codes, values = pd.factorize(key, sort=True, use_na_sentinel=True)
+
+    partitions = []
+    for k, value in [*enumerate(values.tolist()), (-1, None)]:
+        rows = np.flatnonzero(codes == k)
+        if not len(rows):
+            continue
+        part = typed.iloc[rows].reset_index(drop=True)
+        folder = f"{by}={NULL_PARTITION if value is None else int(value)}"
+        digest = _content_hash(part)
+
+        path = table_dir / folder / PART_FILE
+        old = previous.get(folder)
+        if old is None or old["hash"] != digest or not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            part.to_parquet(tmp, index=False)
+            tmp.replace(path)
+
+        partitions.append({
+            "valor": None if value is None else int(value),
+            "pasta": folder,
+            "arquivo": f"{folder}/{PART_FILE}",
+            "hash": digest,
+            **partition_stats(part),
+        })
+
+    for folder in set(previous) - {p["pasta"] for p in partitions}:
+        shutil.rmtree(table_dir / folder, ignore_errors=True)
+
+    manifest = {"tabela": name, "particao": by, "linhas": len(typed), "particoes": partitions}
+    tmp = table_dir / f"{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(table_dir / MANIFEST)
+    return manifest
+
+
+def read_partitioned(
+    name: str,
+    dirs: list[Path],
+    values: list | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame | None:
+    """
+    Lê só as partições de `values` (None = todas, inclusive a de nulos) e
+    apenas `columns`, se informado. Retorna None se a tabela não for
+    particionada.
+    """
+    found = find_manifest(name, dirs)
+    if found is None or not found[1]["particoes"]:
+        return None
+    table_dir, manifest = found
+
+    parts = selected_partitions(manifest, values)
+    if not parts:  # nenhum ano do recorte: frame vazio com as colunas certas
+        return read_frame(table_dir / manifest["particoes"][0]["arquivo"], columns).iloc[:0]
+
+    frames = [read_frame(table_dir / p["arquivo"], columns) for p in parts]
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    # categorias podem diferir entre partições; reaplica os tipos Gold
+    return cast_gold_types(df)
@@ -0,0 +1,140 @@
+# pipeline/risk.py
+"""
+Score de risco regulatório (0..100, faixas Baixo/Médio/Alto).
+
+O score é separado em duas partes:
+
+- `risk_components`: matriz compacta (linhas x componentes, int8) com os
+  indicadores de cada regra — faixa de tempo, flags de divergência e
+  palavras-chave de ato/categoria/fase. É montada uma vez por fato.
+- `risk_score`: produto matriz x vetor de pesos (regra versionada em
+  `RISK_RULES` ou pesos ajustados pelo analista), somado coluna a coluna sem
+  converter a matriz para float64, com corte em 0..100, e a faixa
+  correspondente.
+
+A build Gold grava `risco_score` / `risco_faixa` / `risco_versao` na fato com
+a versão `RISK_VERSION` (e `flag_risco_alto` = faixa Alto), então o painel e
+o `resumo_metricas.csv` usam o mesmo score. Mudou alguma regra? Crie uma nova
+versão em `RISK_RULES` em vez de editar a existente.
+
+Trocar pesos não relê nem copia a fato: só refaz o produto.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from pipeline.keywords import keyword_hits
+
+# faixas de tempo (dias): < 365, 365–730, >= 730
+TEMPO_BANDS = {"curto": (0, 365), "medio": (365, 730), "longo": (730, np.inf)}
+
+# palavras-chave procuradas em ato / categoria do ato / fase
+RISK_KEYWORDS = ["CREDENCI", "AUTORIZ", "PORTARIA", "GABINETE", "MINISTRO"]
+
+# componente -> peso (pontos somados ao score quando o indicador é 1)
+DEFAULT_WEIGHTS = {
+    "tramitacao_curto": 10,
+    "tramitacao_medio": 25,
+    "tramitacao_longo": 40,
+    "aberto_curto": 10,
+    "aberto_medio": 25,
+    "aberto_longo": 40,
+    "endereco_divergente": 12,
+    "vagas_divergente": 12,
+    "sede_ead": 6,
+    "kw_credenci": 10,
+    "kw_autoriz": 10,
+    "kw_portaria": 8,
+    "kw_gabinete": 8,
+    "kw_ministro": 6,
+}
+COMPONENTS = list(DEFAULT_WEIGHTS)
+
+RISK_BINS = [33, 66]                  # (.., 33] Baixo, (33, 66] Médio, (66, ..] Alto
+RISK_LABELS = ["Baixo", "Médio", "Alto"]
+
+# regras versionadas: versão -> pesos + cortes das faixas
+RISK_RULES = {
+    "v1": {"weights": DEFAULT_WEIGHTS, "bins": RISK_BINS},
+}
+RISK_VERSION = "v1"
+
+
+def _numeric(df: pd.DataFrame, col: str | None) -> pd.Series | None:
+    if not col or col not in df.columns:
+        return None
+    return pd.to_numeric(df[col], errors="coerce")
+
+
+def risk_components(
+    df: pd.DataFrame,
+    tempo_tramit_col: str | None = "tempo_tramitacao_dias",
+    tempo_aberto_col: str | None = "tempo_em_aberto_dias",
+    fase_col: str | None = None,
+    ato_col: str | None = None,
+    cat_ato_col: str | None = None,
+    end_div_col: str | None = None,
+    vagas_div_col: str | None = None,
+    sede_ead_col: str | None = None,
+) -> np.ndarray:
+    """Matriz int8 (len(df) x len(COMPONENTS)); colunas ausentes ficam zeradas."""
+    comp = np.zeros((len(df), len(COMPONENTS)), dtype=np.int8)
+    pos = {name: j for j, name in enumerate(COMPONENTS)}
+
+    # 1) tempo de tramitação / em aberto (nulo = nenhuma faixa)
+    for prefix, col in [("tramitacao", tempo_tramit_col), ("aberto", tempo_aberto_col)]:
+        t = _numeric(df, col)
+        if t is None:
+            continue
+        t = t.to_numpy(dtype="float64", na_value=np.nan)
+        for band, (lo, hi) in TEMPO_BANDS.items():
+            comp[:, pos[f"{prefix}_{band}"]] = (t >= lo) & (t < hi) if band != "curto" else t < hi
+
+    # 2) divergências (flag == 1)
+    for name, col in [("endereco_divergente", end_div_col), ("vagas_divergente", vagas_div_col),
+                      ("sede_ead", sede_ead_col)]:
+        f = _numeric(df, col)
+        if f is not None:
+            comp[:, pos[name]] = (f.round(0) == 1).to_numpy(dtype=bool, na_value=False)
+
+    # 3) palavras-chave (uma vez por valor distinto de cada coluna)
+    hits = np.zeros((len(df), len(RISK_KEYWORDS)), dtype=bool)
+    for col in (ato_col, cat_ato_col, fase_col):
+        if col and col in df.columns:
+            hits |= keyword_hits(df[col], RISK_KEYWORDS)
+    for k, kw in enumerate(RISK_KEYWORDS):
+        comp[:, pos[f"kw_{kw.lower()}"]] = hits[:, k]
+
+    return comp
+
+
+def weight_vector(weights: dict[str, float] | None = None, version: str = RISK_VERSION) -> np.ndarray:
+    """Pesos na ordem de COMPONENTS (componentes omitidos usam os da versão)."""
+    w = {**RISK_RULES[version]["weights"], **(weights or {})}
+    return np.array([w[c] for c in COMPONENTS], dtype="float64")
+
+
+def risk_faixa(score: np.ndarray, version: str = RISK_VERSION) -> pd.Categorical:
+    """Baixo/Médio/Alto (v1: mesmos cortes do antigo `pd.cut([-0.1, 33, 66, 100])`)."""
+    bins = np.array(RISK_RULES[version]["bins"], dtype="float64")
+    codes = np.searchsorted(bins, score, side="left")
+    return pd.Categorical.from_codes(codes, categories=RISK_LABELS)
+
+
+def risk_score(
+    comp: np.ndarray,
+    weights: dict[str, float] | None = None,
+    version: str = RISK_VERSION,
+) -> tuple[np.ndarray, pd.Categorical]:
+    """(risco_score 0..100, risco_faixa) para a matriz de componentes."""
+    # soma coluna a coluna: `comp @ w` (int8 x float64) converteria a matriz
+    # inteira para float64; aqui só há um vetor float64 de trabalho por vez
+    w = weight_vector(weights, version)
+    score = np.zeros(len(comp), dtype="float64")
+    tmp = np.empty_like(score)
+    for j in np.flatnonzero(w):
+        np.multiply(comp[:, j], w[j], out=tmp)
+        score += tmp
+    np.clip(score, 0, 100, out=score)
+    return score, risk_faixa(score, version)
@@ -0,0 +1,337 @@
+# pipeline/store.py
+"""
+Armazenamento tipado da camada Gold.
+
+As tabelas são gravadas em Parquet (colunar, com tipos) e, para Power BI /
+Excel, também em CSV. A leitura prefere o Parquet; o CSV fica como fallback
+e recebe a mesma tipagem ao ser carregado.
+
+Tabelas grandes lidas pelo app (a fato) também podem ser gravadas em Arrow
+IPC sem compressão (`name.arrow`). Esse arquivo é lido por memory map: os
+buffers das colunas numéricas e de texto apontam direto para o page cache
+do sistema, compartilhado entre processos, sem cópia privada por processo.
+
+Tipos aplicados:
+- `id_*` e `*_key`      -> Int64 (mantém texto se o id não for numérico)
+- chaves substitutas    -> menor inteiro que couber (Int8/Int16/Int32)
+- flags 0/1             -> int8
+- anos / contagens      -> Int64
+- `tempo_*_dias`, vagas -> float64
+- textos de baixa cardinalidade (UF, modalidade, fase...) -> category
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+NULL_TOKENS = ["", "nan", "NAN", "NaN", "None", "NONE", "<NA>"]
+
+FLAG_COLS = {
+    "processo_encerrado",
+    "processo_ativo",
+    "flag_risco_alto",
+    "tem_divergencia_vagas",
+    "is_sede_ead_flag",
+    "endereco_divergente_flag",
+    "ato_sensivel_flag",
+    "tempo_acima_mediana_global",
+}
+
+# ids gerados pela build (ver pipeline.keys): inteiros compactos
+SURROGATE_KEYS = {
+    "id_local",
+    "id_modalidade",
+    "id_fase",
+    "id_orgao",
+    "id_ato",
+    "id_categoria_ato",
+    "id_situacao",
+    "id_cine_area",
+}
+
+INT_COLS = {
+    "AnoProtocolo",
+    "ANO_DO_PROTOCOLO",
+    "ano_encerramento",
+    "qtd_processos_por_ies",
+    "qtd_processos_por_curso",
+    "qtd_processos_por_area_cine",
+    # dim_atributo
+    "id",
+    # cubo do dashboard
+    "qtd",
+    "validos_encerrado",
+    "validos_risco_alto",
+    # dim_tempo
+    "ano",
+    "mes",
+    "dia",
+    "trimestre",
+    "semana_ano",
+    "dia_semana",
+}
+
+FLOAT_COLS = {
+    "VAGAS_SOLICITADAS_PROCESSO",
+    "VAGAS_AUTORIZADAS_CADASTRO",
+    "dif_vagas_processo_cadastro",
+    "tempo_padronizado_zscore",
+    "score_risco_regulatorio",
+    "risco_score",
+    "soma_encerrado",
+    "soma_risco_alto",
+}
+
+CATEGORY_COLS = {
+    "uf",
+    "UF",
+    "UF_PROCESSO",
+    "UF_CADASTRO",
+    "municipio",
+    "modalidade_norm",
+    "Modalidade_norm",
+    "PublicaPrivada",
+    "PUBLICA_PRIVADA",
+    "AmbitoAdministrativo",
+    "AMBITO_ADMINISTRATIVO",
+    "cine_area_geral",
+    "FASE_ATUAL",
+    "ORGAO",
+    "ATO",
+    "CATEGORIA_ATO",
+    "SITUACAO_DO_PROCESSO",
+    "tipo_encerramento",
+    "tempo_tramitacao_categoria",
+    "faixa_tempo_em_aberto",
+    "risco_faixa",
+    "risco_versao",
+    "fonte_arquivo",
+    "organizacao_academica",
+    "sistema_de_ensino",
+    "categoria_administrativa",
+    "situacao_da_ies",
+    "grau",
+    "nome_dia",
+    "nome_mes",
+}
+
+
+def gold_dtype(col: str) -> str | None:
+    """Tipo-alvo de uma coluna Gold (None = manter como está)."""
+    if col in FLAG_COLS or col.endswith("_flag"):
+        return "int8"
+    if col.startswith("id_") or col.endswith("_key"):
+        return "Int64"
+    if col in INT_COLS:
+        return "Int64"
+    if col in FLOAT_COLS or (col.startswith("tempo_") and col.endswith("_dias")):
+        return "float64"
+    if col in CATEGORY_COLS:
+        return "category"
+    return None
+
+
+def _clean_text(s: pd.Series, null_tokens=NULL_TOKENS) -> pd.Series:
+    x = s.astype("string").str.strip()
+    return x.mask(x.isin(list(null_tokens)))
+
+
+def _to_number(s: pd.Series, null_tokens=NULL_TOKENS) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return s.astype("float64")
+    return pd.to_numeric(_clean_text(s, null_tokens), errors="coerce").astype("float64")
+
+
+def cast_column(s: pd.Series, dtype: str, null_tokens=NULL_TOKENS) -> pd.Series:
+    """Converte uma série para o tipo Gold, sem perder valores não numéricos."""
+    if str(s.dtype) == dtype:
+        return s
+
+    if dtype == "category":
+        return _clean_text(s, null_tokens).astype("category")
+
+    x = _to_number(s, null_tokens)
+
+    if dtype == "int8":
+        return x.fillna(0).astype("int8")
+
+    if dtype == "Int64":
+        # ids alfanuméricos (ex.: "IES_00001") continuam como texto
+        parsed_all = x.notna().sum() == _clean_text(s, null_tokens).notna().sum()
+        integral = bool((x.dropna() % 1 == 0).all())
+        if not (parsed_all and integral):
+            return _clean_text(s, null_tokens).astype(object)
+        return x.round(0).astype("Int64")
+
+    return x.astype(dtype)
+
+
+def compact_int(s: pd.Series) -> pd.Series:
+    """Inteiro anulável mais estreito que comporta os valores (Int8/Int16/Int32/Int64)."""
+    x = s if pd.api.types.is_integer_dtype(s) else pd.to_numeric(s, errors="coerce").round(0)
+    hi = x.abs().max()
+    hi = 0 if pd.isna(hi) else int(hi)
+    for dtype, limit in [("Int8", 2**7), ("Int16", 2**15), ("Int32", 2**31)]:
+        if hi < limit:
+            return x.astype(dtype)
+    return x.astype("Int64")
+
+
+def cast_gold_types(df: pd.DataFrame | None) -> pd.DataFrame | None:
+    """Aplica os tipos Gold às colunas conhecidas (as demais ficam como estão)."""
+    if df is None or df.empty:
+        return df
+
+    out = {}
+    for col in df.columns:
+        dtype = gold_dtype(col)
+        out[col] = cast_column(df[col], dtype) if dtype else df[col]
+        if col in SURROGATE_KEYS and pd.api.types.is_numeric_dtype(out[col]):
+            out[col] = compact_int(out[col])
+    return pd.DataFrame(out, index=df.index)
+
+
+# =====================================================
+# Gravação / Leitura
+# =====================================================
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_table(
+    df: pd.DataFrame,
+    name: str,
+    out_dir: Path,
+    csv: bool = True,
+    encoding: str = "utf-8",
+    shared: bool = False,
+) -> Path:
+    """
+    Grava `name.parquet` (tipado) e, opcionalmente, `name.csv`.
+    Com `shared=True`, grava também `name.arrow` (ver `write_shared`).
+    Retorna o caminho principal gravado.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    csv_path = out_dir / f"{name}.csv"
+    if csv:
+        df.to_csv(csv_path, index=False, encoding=encoding)
+
+    if not parquet_available():
+        return csv_path
+
+    typed = cast_gold_types(df)
+    parquet_path = out_dir / f"{name}.parquet"
+    typed.to_parquet(parquet_path, index=False)
+    if shared:
+        write_shared(typed, out_dir / f"{name}.arrow")
+    return parquet_path
+
+
+def write_shared(df: pd.DataFrame, path: Path) -> None:
+    """
+    Grava Arrow IPC sem compressão, pronto para memory map. Colunas float
+    guardam NaN como valor (não como nulo) para que a leitura não precise
+    materializar uma cópia só para preencher os nulos.
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    arrays = [
+        pa.array(df[c].to_numpy(), from_pandas=False) if pd.api.types.is_float_dtype(df[c]) else table.column(c)
+        for c in df.columns
+    ]
+    table = pa.Table.from_arrays(arrays, schema=table.schema)
+
+    tmp = Path(path).with_suffix(".arrow.tmp")
+    with ipc.new_file(str(tmp), table.schema) as writer:
+        writer.write_table(table)
+    tmp.replace(path)  # troca atômica: leitores com o arquivo antigo mapeado não quebram
+
+
+def read_shared(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Lê `name.arrow` por memory map. Colunas float, flags int8 e textos saem
+    sem cópia (somente leitura); inteiros anuláveis e códigos de categoria
+    são pequenos e são convertidos. Com `columns`, só essas colunas são lidas.
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    if columns:
+        table = table.select([c for c in columns if c in table.column_names])
+    return table.to_pandas(split_blocks=True)
+
+
+def read_table(
+    name: str,
+    dirs: list[Path],
+    columns: list[str] | None = None,
+    mmap: bool = False,
+) -> pd.DataFrame | None:
+    """
+    Lê a tabela `name` procurando, em cada diretório, primeiro o Parquet
+    e depois o CSV (tipado na leitura). Com `mmap=True`, prefere o
+    `name.arrow` (memory map) se ele não for mais antigo que o Parquet.
+    Com `columns`, lê só essas colunas (as que não existirem são ignoradas).
+    Retorna None se não existir.
+    """
+    wanted = set(columns) if columns else None
+    for d in dirs:
+        arrow_path = Path(d) / f"{name}.arrow"
+        parquet_path = Path(d) / f"{name}.parquet"
+        if mmap and arrow_path.exists() and parquet_available() and (
+            not parquet_path.exists() or arrow_path.stat().st_mtime_ns >= parquet_path.stat().st_mtime_ns
+        ):
+            return read_shared(arrow_path, columns)
+
+        if parquet_path.exists() and parquet_available():
+            return read_frame(parquet_path, columns)
+
+        csv_path = Path(d) / f"{name}.csv"
+        if csv_path.exists():
+            usecols = (lambda c: str(c).strip() in wanted) if wanted else None
+            df = pd.read_csv(csv_path, dtype=str, usecols=usecols, low_memory=False)
+            return cast_gold_types(df)
+
+    return None
+
+
+# =====================================================
+# Estágios intermediários (uso interno da build)
+# =====================================================
+def stage_ext() -> str:
+    """Extensão dos estágios: Parquet quando houver pyarrow, senão pickle."""
+    return "parquet" if parquet_available() else "pkl"
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> None:
+    """Grava um estágio intermediário preservando índice e tipos."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".parquet":
+        df.to_parquet(path)
+    else:
+        df.to_pickle(path)
+
+
+def read_frame(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """Lê um estágio intermediário (apenas `columns`, se informado e existente)."""
+    path = Path(path)
+    if path.suffix != ".parquet":
+        df = pd.read_pickle(path)
+        return df[[c for c in columns if c in df.columns]] if columns else df
+
+    if columns:
+        import pyarrow.parquet as pq
+        available = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in available]
+    return pd.read_parquet(path, columns=columns)
@@ -0,0 +1,445 @@
+# pipeline/synthetic.py
+"""
+Base sintética determinística para medir desempenho em qualquer escala.
+
+A fato Gold não é versionada, então números de desempenho não eram
+reproduzíveis. Aqui:
+
+- `iter_silver` / `generate_silver`: Silver anonimizada sintética (mesmas
+  colunas e textos de `*_anonimizado.xlsx`, tudo como texto), de 100 mil a
+  10 milhões de linhas. Mesma `seed` + mesmo nº de linhas = mesma base, em
+  qualquer máquina. As cardinalidades e taxas de nulo seguem a base real
+  (≈ 92 processos por IES, ≈ 4,3 mil municípios, ~30% sem área CINE,
+  ~84% encerrados, metade dos processos com tramitação de 0 dias), com
+  popularidade desigual (poucas IES/cursos concentram muitos processos);
+- `write_gold_fixture`: roda os builders reais da Gold sobre essa Silver,
+  bloco a bloco (mesmo caminho da build incremental: `prepare_base` +
+  `build_metricas_local` + `build_fato` por bloco; métricas globais uma vez;
+  DIM_IES/DIM_CURSO por `MostCompleteDedup`), e grava fato, dimensões, cubo
+  e sidecar com os esquemas reais. Sem juntar a Silver inteira em memória;
+- `ensure_gold_fixture`: a mesma coisa com cache em disco (`.bench/dados/`),
+  refeita só quando muda a escala, a seed ou `GENERATOR_VERSION`.
+
+Uso:
+
+    python -m pipeline.synthetic --rows 1000000 --out-dir /tmp/gold_1m
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+GENERATOR_VERSION = "1"
+BLOCK_ROWS = 250_000            # linhas por bloco gerado (fixo: não muda a base)
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATA_MAXIMA = pd.Timestamp("2025-12-09")
+ANOS = np.arange(2007, 2026)
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do repo
+FIXTURE_DIR = BASE_DIR / ".bench" / "dados"
+FIXTURE_META = "_sintetico.json"
+
+# UF -> peso (distribuição das IES na DIM_IES real)
+UF_PESOS = {
+    "SP": 22.0, "MG": 11.5, "PR": 6.5, "BA": 6.1, "GO": 5.2, "RJ": 4.7, "PE": 4.2,
+    "CE": 4.2, "RS": 4.0, "DF": 4.0, "SC": 3.8, "PA": 3.2, "MA": 2.5, "ES": 2.2,
+    "MT": 2.0, "PB": 1.8, "PI": 1.6, "RN": 1.5, "MS": 1.5, "AL": 1.3, "AM": 1.2,
+    "TO": 1.2, "SE": 1.0, "RO": 0.9, "AC": 0.4, "AP": 0.4, "RR": 0.3,
+}
+N_MUNICIPIOS = 4_300
+
+ORGANIZACAO_ACADEMICA = {
+    "FACULDADE": 89.1, "CENTRO UNIVERSITÁRIO": 5.8, "UNIVERSIDADE": 2.7,
+    "INSTITUIÇÃO FEDERAL DE EDUCAÇÃO, CIÊNCIA E TECNOLOGIA": 0.6, "ESCOLA DE GOVERNO": 0.5,
+    "INSTITUTO SUPERIOR OU ESCOLA SUPERIOR": 0.4, "FACULDADE DE TECNOLOGIA": 0.4,
+    "FACULDADES INTEGRADAS": 0.1,
+}
+SISTEMA_DE_ENSINO = {"FEDERAL": 96.1, "ESTADUAL": 3.7, "MUNICIPAL": 0.2}
+CATEGORIA_ADMINISTRATIVA = {
+    "PRIVADA COM FINS LUCRATIVOS": 64.5, "PRIVADA SEM FINS LUCRATIVOS": 28.3,
+    "PÚBLICA ESTADUAL": 3.4, "PÚBLICA FEDERAL": 2.4, "ESPECIAL": 0.7, "PÚBLICA MUNICIPAL": 0.7,
+}
+SITUACAO_DA_IES = {"ATIVA": 71.0, "EXTINTA": 29.0}
+
+CURSOS = [
+    "DIREITO", "ADMINISTRAÇÃO", "PEDAGOGIA", "ENFERMAGEM", "PSICOLOGIA", "CIÊNCIAS CONTÁBEIS",
+    "EDUCAÇÃO FÍSICA", "FISIOTERAPIA", "NUTRIÇÃO", "ENGENHARIA CIVIL", "MEDICINA", "ODONTOLOGIA",
+    "ARQUITETURA E URBANISMO", "SISTEMAS DE INFORMAÇÃO", "ANÁLISE E DESENVOLVIMENTO DE SISTEMAS",
+    "GESTÃO DE RECURSOS HUMANOS", "LOGÍSTICA", "MARKETING", "FARMÁCIA", "BIOMEDICINA",
+    "ENGENHARIA DE PRODUÇÃO", "LETRAS - PORTUGUÊS", "HISTÓRIA", "MATEMÁTICA", "SERVIÇO SOCIAL",
+    "JORNALISMO", "MEDICINA VETERINÁRIA", "AGRONOMIA", "CIÊNCIA DA COMPUTAÇÃO", "GASTRONOMIA",
+]
+GRAU = {"BACHARELADO": 55.0, "LICENCIATURA": 18.0, "TECNOLÓGICO": 27.0}
+CARGA_HORARIA = ["1600", "2400", "2800", "3000", "3200", "3600", "4000", "7200"]
+
+# código -> área geral CINE
+CINE_AREAS = {
+    "00": "Programas básicos",
+    "01": "Educação",
+    "02": "Artes e humanidades",
+    "03": "Ciências sociais, comunicação e informação",
+    "04": "Negócios, administração e direito",
+    "05": "Ciências naturais, matemática e estatística",
+    "06": "Computação e Tecnologias da Informação e Comunicação (TIC)",
+    "07": "Engenharia, produção e construção",
+    "08": "Agricultura, silvicultura, pesca e veterinária",
+    "09": "Saúde e bem-estar",
+    "10": "Serviços",
+}
+
+ATOS_CURSO = {
+    "Autorização": 24.0, "Reconhecimento de Curso": 22.0, "Renovação de Reconhecimento de Curso": 30.0,
+    "Autorização EaD": 6.0, "Aditamento de Aumento de Vagas": 4.0,
+    "Aditamento de Mudança de Endereço": 2.0,
+}
+ATOS_IES = {
+    "Credenciamento": 4.0, "Recredenciamento": 5.0, "Credenciamento EaD": 2.0,
+    "Transformação de Organização Acadêmica": 0.6, "Descredenciamento Voluntário": 0.4,
+}
+CATEGORIA_ATO = {"Regulação": 82.0, "Supervisão": 6.0, "Aditamento": 12.0}
+ORGAO = {"SERES": 55.0, "INEP": 25.0, "CNE": 6.0, "DIREG": 8.0, "CGARCES": 4.0, "GM": 2.0}
+# fase atual: de encerramento (palavras-chave da build) ou ainda em curso
+FASE_ENCERRAMENTO = {
+    "Publicação de Portaria": 50.0, "Finalização no Sistema": 26.0, "Arquivado": 12.0,
+    "Decisão Final": 9.0, "Gabinete do Ministro": 3.0,
+}
+FASE_EM_CURSO = {
+    "Análise Técnica": 25.0, "Avaliação INEP": 22.0, "Despacho Saneador": 16.0, "Parecer Final": 12.0,
+    "Diligência": 10.0, "Impugnação CTAA": 5.0, "Aguardando Pagamento de Taxa": 4.0, "Protocolo": 6.0,
+}
+SITUACAO_ENCERRADA = {"Concluído": 64.0, "Arquivado": 12.0, "Encerrado": 4.0}
+SITUACAO_EM_CURSO = {"Em Análise": 12.0, "Em Diligência": 5.0, "Sobrestado": 1.5, "Indeferido": 1.5}
+TAXA_SITUACAO_ENCERRADA = 0.8
+FASE_ENCERRAMENTO_EM_CURSO = 0.2  # situação em curso com fase já de encerramento (~84% encerrados)
+MODALIDADE = {"Presencial": 58.0, "EAD": 38.0, "Semipresencial": 1.0}
+VAGAS = ["40", "50", "60", "80", "100", "120", "150", "200", "300", "500", "1000"]
+
+# taxas de nulo por coluna (linha a linha)
+NULOS = {
+    "DATA": 0.01, "DATA_DO_ULTIMO_ATO": 0.03, "DATA_DE_ENTRADA_FASE_ATUAL": 0.02,
+    "MODALIDADE": 0.03, "ORGAO": 0.02, "CATEGORIA_ATO": 0.01, "FASE_ATUAL": 0.01,
+    "SITUACAO_DO_PROCESSO": 0.005, "UF_PROCESSO": 0.2, "UF_CADASTRO": 0.01,
+    "VAGAS_SOLICITADAS_PROCESSO": 0.4, "VAGAS_AUTORIZADAS_CADASTRO": 0.1,
+    "IS_SEDE_EAD": 0.05, "ENDERECO_DIVERGENTE": 0.05,
+}
+NULO_CINE_CURSO = 0.20  # + atos institucionais sem curso: ~30% sem área CINE
+NULO_CATEGORIA_IES = 0.154
+NULO_SITUACAO_IES = 0.466
+
+
+# =====================================================
+# Auxiliares
+# =====================================================
+def _weights(d: dict) -> tuple[np.ndarray, np.ndarray]:
+    p = np.asarray(list(d.values()), dtype="float64")
+    return np.asarray(list(d), dtype=object), p / p.sum()
+
+
+def _choice(rng: np.random.Generator, d: dict, n: int) -> np.ndarray:
+    values, p = _weights(d)
+    return values[rng.choice(len(values), size=n, p=p)]
+
+
+def _zipf_weights(n: int, s: float = 0.9) -> np.ndarray:
+    """Popularidade desigual: o i-ésimo item pesa 1 / i^s."""
+    w = 1.0 / np.arange(1, n + 1) ** s
+    return w / w.sum()
+
+
+def _with_nulls(rng: np.random.Generator, values: np.ndarray, rate: float) -> np.ndarray:
+    out = values.astype(object, copy=True)
+    out[rng.random(len(out)) < rate] = None
+    return out
+
+
+def _text(values: np.ndarray) -> pd.Series:
+    return pd.Series(values, dtype="str")
+
+
+def scale_sizes(n_rows: int) -> dict[str, int]:
+    """Nº de entidades para `n_rows` processos (proporções da base real)."""
+    return {
+        "ies": int(np.clip(n_rows // 92, 50, 20_000)),
+        "mantenedoras": int(np.clip(n_rows // 120, 40, 15_000)),
+        "cursos": int(np.clip(n_rows // 6, 100, 500_000)),
+    }
+
+
+# =====================================================
+# Entidades (IES, cursos, municípios)
+# =====================================================
+def _municipios(rng: np.random.Generator) -> pd.DataFrame:
+    ufs, p = _weights(UF_PESOS)
+    qtd = np.maximum(15, np.round(p * N_MUNICIPIOS)).astype(int)
+    uf = np.repeat(ufs, qtd)
+    nome = np.concatenate([[f"Município {u} {i:03d}" for i in range(1, q + 1)] for u, q in zip(ufs, qtd)])
+    # capitais / polos concentram as IES
+    peso = np.concatenate([_zipf_weights(q, 1.1) * pu for q, pu in zip(qtd, p)])
+    return pd.DataFrame({"uf": uf, "municipio": nome, "peso": peso / peso.sum()})
+
+
+def _entities(n_rows: int, seed: int) -> dict[str, pd.DataFrame]:
+    rng = np.random.default_rng([seed, 0])
+    sizes = scale_sizes(n_rows)
+    mun = _municipios(rng)
+
+    n_ies = sizes["ies"]
+    loc = rng.choice(len(mun), size=n_ies, p=mun["peso"].to_numpy())
+    mant = rng.integers(1, sizes["mantenedoras"] + 1, n_ies)
+    ies = pd.DataFrame({
+        "IES_ID_FAKE": [f"IES_{i:05d}" for i in range(1, n_ies + 1)],
+        "IES_NOME_FAKE": [f"IES {i:05d}" for i in range(1, n_ies + 1)],
+        "MANT_ID_FAKE": [f"MANT_{m:04d}" for m in mant],
+        "MANT_NOME_FAKE": [f"Mantenedora {m:04d}" for m in mant],
+        "ORGANIZACAO_ACADEMICA": _choice(rng, ORGANIZACAO_ACADEMICA, n_ies),
+        "SISTEMA_DE_ENSINO": _choice(rng, SISTEMA_DE_ENSINO, n_ies),
+        "CATEGORIA_ADMINISTRATIVA": _with_nulls(rng, _choice(rng, CATEGORIA_ADMINISTRATIVA, n_ies), NULO_CATEGORIA_IES),
+        "SITUACAO_DA_IES": _with_nulls(rng, _choice(rng, SITUACAO_DA_IES, n_ies), NULO_SITUACAO_IES),
+        "UF_CADASTRO": mun["uf"].to_numpy()[loc],
+        "MUNICIPIO_CADASTRO": mun["municipio"].to_numpy()[loc],
+    })
+
+    n_cur = sizes["cursos"]
+    cine_codes = np.asarray(list(CINE_AREAS), dtype=object)
+    area = cine_codes[rng.integers(0, len(cine_codes), n_cur)]
+    sem_cine = rng.random(n_cur) < NULO_CINE_CURSO
+    cursos = pd.DataFrame({
+        "CODIGO_DO_CURSO": (1_000 + rng.permutation(n_cur * 3)[:n_cur]).astype(str),
+        "_ies": rng.choice(n_ies, size=n_cur, p=_zipf_weights(n_ies)),
+        "NOME_CURSO_REGULACAO": np.asarray(CURSOS, dtype=object)[rng.integers(0, len(CURSOS), n_cur)],
+        "GRAU": _choice(rng, GRAU, n_cur),
+        "CARGA_HORARIA_CADASTRO": np.asarray(CARGA_HORARIA, dtype=object)[rng.integers(0, len(CARGA_HORARIA), n_cur)],
+        "CODIGO_AREA_GERAL_CINE": np.where(sem_cine, None, area),
+        "AREA_GERAL_CINE": np.where(sem_cine, None, pd.Series(area).map(CINE_AREAS).to_numpy()),
+    })
+    return {"ies": ies, "cursos": cursos}
+
+
+# =====================================================
+# Processos (Silver)
+# =====================================================
+def _dates_text(days: np.ndarray) -> np.ndarray:
+    """Dias desde 1970 (int64, -1 = nulo) -> texto no formato da Silver (formata só os dias distintos)."""
+    out = np.full(len(days), None, dtype=object)
+    valid = days >= 0
+    uniq, inv = np.unique(days[valid], return_inverse=True)
+    out[valid] = pd.to_datetime(uniq, unit="D").strftime(DATE_FORMAT).to_numpy(dtype=object)[inv]
+    return out
+
+
+def _block(n: int, start: int, seed: int, block: int, ent: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    rng = np.random.default_rng([seed, 1, block])
+    ies, cursos = ent["ies"], ent["cursos"]
+
+    # ano de protocolo: volume cresce ~8% ao ano
+    p_ano = 1.08 ** (ANOS - ANOS[0])
+    ano = ANOS[rng.choice(len(ANOS), size=n, p=p_ano / p_ano.sum())]
+
+    # ato de curso (com curso) ou institucional (sem curso)
+    atos_all = {**ATOS_CURSO, **ATOS_IES}
+    ato = _choice(rng, atos_all, n)
+    de_curso = np.isin(ato, list(ATOS_CURSO))
+    cur = rng.choice(len(cursos), size=n, p=_zipf_weights(len(cursos), 0.7))
+    ies_row = np.where(de_curso, cursos["_ies"].to_numpy()[cur],
+                       rng.choice(len(ies), size=n, p=_zipf_weights(len(ies))))
+
+    # datas: protocolo no ano; metade sem tramitação registrada (0 dias)
+    inicio = (ano - 1970).astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64)
+    d0 = inicio + rng.integers(0, 365, n)
+    tempo = np.where(rng.random(n) < 0.55, 0, rng.lognormal(6.2, 0.9, n).astype(np.int64))
+    limite = np.int64((DATA_MAXIMA - pd.Timestamp("1970-01-01")).days)
+    fase = np.minimum(d0 + tempo, limite)
+    ult = np.minimum(fase + rng.integers(0, 60, n), limite)
+
+    def nulls(col: str, days: np.ndarray) -> np.ndarray:
+        return np.where(rng.random(n) < NULOS[col], -1, days)
+
+    # situação e fase coerentes entre si
+    encerrada = rng.random(n) < TAXA_SITUACAO_ENCERRADA
+    situacao = np.where(encerrada, _choice(rng, SITUACAO_ENCERRADA, n), _choice(rng, SITUACAO_EM_CURSO, n))
+    fase_fim = encerrada | (rng.random(n) < FASE_ENCERRAMENTO_EM_CURSO)
+    fase_atual = np.where(fase_fim, _choice(rng, FASE_ENCERRAMENTO, n), _choice(rng, FASE_EM_CURSO, n))
+
+    modalidade = _with_nulls(rng, _choice(rng, MODALIDADE, n), NULOS["MODALIDADE"])
+    vag_sol = np.asarray(VAGAS, dtype=object)[rng.integers(0, len(VAGAS), n)]
+    vag_aut = np.where(rng.random(n) < 0.85, vag_sol, np.asarray(VAGAS, dtype=object)[rng.integers(0, len(VAGAS), n)])
+    sede_ead = np.where((modalidade == "EAD") & (rng.random(n) < 0.3), "Sim", "Não").astype(object)
+
+    uf_cad = ies["UF_CADASTRO"].to_numpy()[ies_row]
+    mun_cad = ies["MUNICIPIO_CADASTRO"].to_numpy()[ies_row]
+    sem_proc = rng.random(n) < NULOS["UF_PROCESSO"]
+
+    df = pd.DataFrame({
+        "NO_DO_PROCESSO": _text((ano.astype(np.int64) * 10**8 + start + np.arange(n)).astype(str)),
+        "ANO_DO_PROTOCOLO": _text(ano.astype(str)),
+        "DATA": _text(_dates_text(nulls("DATA", d0))),
+        "DATA_DO_ULTIMO_ATO": _text(_dates_text(nulls("DATA_DO_ULTIMO_ATO", ult))),
+        "DATA_DE_ENTRADA_FASE_ATUAL": _text(_dates_text(nulls("DATA_DE_ENTRADA_FASE_ATUAL", fase))),
+        "ATO": _text(ato),
+        "CATEGORIA_ATO": _text(_with_nulls(rng, _choice(rng, CATEGORIA_ATO, n), NULOS["CATEGORIA_ATO"])),
+        "ORGAO": _text(_with_nulls(rng, _choice(rng, ORGAO, n), NULOS["ORGAO"])),
+        "FASE_ATUAL": _text(_with_nulls(rng, fase_atual, NULOS["FASE_ATUAL"])),
+        "SITUACAO_DO_PROCESSO": _text(_with_nulls(rng, situacao, NULOS["SITUACAO_DO_PROCESSO"])),
+        "MODALIDADE": _text(modalidade),
+        "UF_PROCESSO": _text(np.where(sem_proc, None, uf_cad)),
+        "MUNICIPIO_PROCESSO": _text(np.where(sem_proc, None, mun_cad)),
+        "UF_CADASTRO": _text(_with_nulls(rng, uf_cad, NULOS["UF_CADASTRO"])),
+        "MUNICIPIO_CADASTRO": _text(mun_cad),
+        "VAGAS_SOLICITADAS_PROCESSO": _text(np.where(de_curso, _with_nulls(rng, vag_sol, NULOS["VAGAS_SOLICITADAS_PROCESSO"]), None)),
+        "VAGAS_AUTORIZADAS_CADASTRO": _text(np.where(de_curso, _with_nulls(rng, vag_aut, NULOS["VAGAS_AUTORIZADAS_CADASTRO"]), None)),
+        "IS_SEDE_EAD": _text(_with_nulls(rng, sede_ead, NULOS["IS_SEDE_EAD"])),
+        "ENDERECO_DIVERGENTE": _text(_with_nulls(rng, np.where(rng.random(n) < 0.08, "Sim", "Não").astype(object),
+                                                 NULOS["ENDERECO_DIVERGENTE"])),
+    })
+
+    for col in ["IES_ID_FAKE", "IES_NOME_FAKE", "MANT_ID_FAKE", "MANT_NOME_FAKE", "ORGANIZACAO_ACADEMICA",
+                "SISTEMA_DE_ENSINO", "CATEGORIA_ADMINISTRATIVA", "SITUACAO_DA_IES"]:
+        df[col] = _text(ies[col].to_numpy()[ies_row])
+    for col in ["CODIGO_DO_CURSO", "NOME_CURSO_REGULACAO", "GRAU", "CARGA_HORARIA_CADASTRO",
+                "CODIGO_AREA_GERAL_CINE", "AREA_GERAL_CINE"]:
+        df[col] = _text(np.where(de_curso, cursos[col].to_numpy()[cur], None))
+
+    df["fonte_arquivo"] = _text(np.where(ano <= 2018, "2018_anonimizado.xlsx", "2019_anonimizado.xlsx").astype(object))
+    return df.set_axis(pd.RangeIndex(start, start + n))
+
+
+def iter_silver(n_rows: int, seed: int = 0, chunk_rows: int = BLOCK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Silver sintética em blocos de `chunk_rows` linhas (múltiplo de
+    `BLOCK_ROWS` ou menor). A base não depende de `chunk_rows`: cada bloco
+    interno de `BLOCK_ROWS` linhas tem a sua própria semente.
+    """
+    ent = _entities(n_rows, seed)
+    pending: list[pd.DataFrame] = []
+    size = 0
+    for block, start in enumerate(range(0, n_rows, BLOCK_ROWS)):
+        part = _block(min(BLOCK_ROWS, n_rows - start), start, seed, block, ent)
+        for i in range(0, len(part), chunk_rows):
+            pending.append(part.iloc[i:i + chunk_rows])
+            size += len(pending[-1])
+            if size >= chunk_rows:
+                yield pd.concat(pending)
+                pending, size = [], 0
+    if pending:
+        yield pd.concat(pending)
+
+
+def generate_silver(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Silver sintética inteira (ver `iter_silver`)."""
+    return pd.concat(iter_silver(n_rows, seed), ignore_index=True)
+
+
+# =====================================================
+# Gold sintética (builders reais, bloco a bloco)
+# =====================================================
+def write_gold_fixture(
+    n_rows: int,
+    out_dir: Path,
+    seed: int = 0,
+    today: pd.Timestamp | None = None,
+    chunk_rows: int = BLOCK_ROWS,
+) -> dict:
+    """
+    Grava as tabelas Gold (fato, dimensões, métricas, cubo, sidecar) da
+    Silver sintética em `out_dir`, com os builders de `pipeline.gold`.
+    """
+    from pipeline.cleaning import guess_date_format
+    from pipeline.dedup import MostCompleteDedup
+    from pipeline.gold import (
+        DATE_COLS, FATO_METRICAS, METRICAS_MD, build_dim_curso, build_dim_ies, build_dim_tempo,
+        build_fato, build_metricas_local, build_resumo, finalize_metricas, prepare_base, write_cube, write_fato,
+    )
+    from pipeline.store import write_table
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    today = pd.Timestamp(today or DATA_MAXIMA)
+    t0 = time.perf_counter()
+
+    dim_ies = MostCompleteDedup("id_ies")
+    dim_curso = MostCompleteDedup("id_curso")
+    tempos, locais, fatos = [], [], []
+    formats = None
+    for raw in iter_silver(n_rows, seed, chunk_rows):
+        formats = formats or {c: guess_date_format(raw[c]) for c in DATE_COLS}
+        base = prepare_base(raw, date_formats=formats)
+        dim_ies.update(build_dim_ies(base))
+        dim_curso.update(build_dim_curso(base))
+        tempos.append(build_dim_tempo(base))
+        locais.append(build_metricas_local(base).reset_index(drop=True))
+        fatos.append(build_fato(base))
+        del base, raw
+
+    metricas = finalize_metricas(pd.concat(locais, ignore_index=True), today=today)
+    del locais
+    fato = pd.concat(fatos, ignore_index=True)
+    del fatos
+    for c in FATO_METRICAS:
+        if c in metricas.columns:
+            fato[c] = metricas[c]
+
+    ies = dim_ies.result().reset_index(drop=True)
+    dims = {
+        "dim_ies": ies,
+        "dim_curso": dim_curso.result().reset_index(drop=True),
+        "dim_tempo": (pd.concat(tempos, ignore_index=True).drop_duplicates("id_data")
+                        .sort_values("data").reset_index(drop=True)),
+    }
+    for name, dim in dims.items():
+        write_table(dim, name, out_dir)
+
+    write_table(metricas, "fato_processo_regulatorio_com_metricas", out_dir, encoding="utf-8-sig")
+    build_resumo(metricas).to_csv(out_dir / "resumo_metricas.csv", index=False, encoding="utf-8-sig")
+    (out_dir / "dicionario_metricas.md").write_text(METRICAS_MD, encoding="utf-8")
+    del metricas
+
+    write_fato(fato, out_dir)
+    write_cube(fato, ies, out_dir)
+
+    meta = {
+        "linhas": n_rows,
+        "seed": seed,
+        "versao_gerador": GENERATOR_VERSION,
+        "data_referencia": str(today.date()),
+        "entidades": scale_sizes(n_rows),
+        "tempo_s": round(time.perf_counter() - t0, 1),
+    }
+    (out_dir / FIXTURE_META).write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+    return meta
+
+
+def fixture_dir(n_rows: int, seed: int = 0, root: Path = FIXTURE_DIR) -> Path:
+    return Path(root) / f"gold_{n_rows}_s{seed}_v{GENERATOR_VERSION}"
+
+
+def ensure_gold_fixture(n_rows: int, seed: int = 0, root: Path = FIXTURE_DIR) -> Path:
+    """Pasta com a Gold sintética de `n_rows` linhas (gerada na primeira vez)."""
+    out_dir = fixture_dir(n_rows, seed, root)
+    meta = out_dir / FIXTURE_META
+    if not meta.exists():
+        write_gold_fixture(n_rows, out_dir, seed)
+    return out_dir
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Gold sintética determinística (fato + dimensões) para benchmarks.")
+    parser.add_argument("--rows", type=int, default=100_000, help="nº de processos (padrão: 100 mil)")
+    parser.add_argument("--seed", type=int, default=0, help="semente (padrão: 0)")
+    parser.add_argument("--out-dir", type=Path, default=None, help="pasta de saída (padrão: .bench/dados/...)")
+    args = parser.parse_args(argv)
+
+    out_dir = args.out_dir or fixture_dir(args.rows, args.seed)
+    meta = write_gold_fixture(args.rows, out_dir, args.seed)
+    for k, v in meta.items():
+        print(f"{k:<16} {v}")
+    print("📤 Saídas em:", out_dir)
+
+
+if __name__ == "__main__":
+    main()
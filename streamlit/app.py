@@ -1,15 +1,28 @@
 # streamlit/app.py
 import streamlit as st
-import pandas as pd
 
-from utils.data import load_model
+from utils.background import wait_for
+from utils.data import (
+    FATO_LABELS,
+    background_load,
+    cached_result,
+    data_version,
+    fato_labels,
+    load_cube,
+    load_dims,
+    load_filter_index,
+    load_metadata,
+    load_model,
+    load_partitions,
+    load_resumo,
+    partition_kpis,
+    sidebar_values,
+)
 from utils.metrics import (
-    resolve_col,
-    safe_mean_pct,
-    safe_median,
     unique_sorted_int_list,
     unique_sorted_str_list,
 )
+from pipeline.cube import cube_counts, cube_kpis  # utils põe a raiz no sys.path
 
 # ---------------------------------------------------------
 # Configuração da página
@@ -25,47 +38,75 @@ st.caption(
 )
 
 # ---------------------------------------------------------
-# Carregar modelo (dimensões + fato)
+# Carregar modelo (dimensões + fato) e cubo pré-agregado
 # ---------------------------------------------------------
-dims, fato = load_model()
+# projeção: só as colunas da fato e as dimensões que esta página usa
+FATO_COLS = (
+    "AnoProtocolo", "uf", "modalidade_norm", "id_ies",
+    "processo_encerrado", "flag_risco_alto", "tempo_tramitacao_dias",
+)
+DIMS = ("dim_ies", "dim_local", "dim_modalidade")
 
-if fato is None or len(fato) == 0:
-    st.error(
-        "⚠️ A tabela FATO_PROCESSO_REGULATORIO não está disponível.\n\n"
-        "Ela não é versionada no GitHub por boas práticas e limite de tamanho.\n"
-        "➡️ Gere localmente o CSV e coloque em: gold/output/fato_processo_regulatorio.csv"
-    )
-    st.stop()
+versao = data_version()
 
-df_base = fato.copy()
+# sidecar da build (pipeline/metadata.py): com ele, a barra lateral é montada
+# antes de ler cubo e fato
+meta = load_metadata(versao)
 
-# ---------------------------------------------------------
-# Dimensões (podem ser None)
-# ---------------------------------------------------------
-dim_modalidade = dims.get("dim_modalidade")
-dim_ies = dims.get("dim_ies")
-dim_tempo = dims.get("dim_tempo")
 
-# ---------------------------------------------------------
-# Resolver colunas reais da FATO
-# ---------------------------------------------------------
-COL_ANO = resolve_col(df_base, ["AnoProtocolo", "ANO_DO_PROTOCOLO", "ano_protocolo"])
-COL_UF = resolve_col(df_base, ["uf", "UF"])
+# Carga em segundo plano (utils/background.py), disparada pela primeira sessão
+# do processo. Fato particionada por ano (pipeline/partitions.py): só é lida no
+# drill-down, e só as partições dos anos filtrados. Sem partições, é lida
+# inteira e também serve de fallback para o cubo.
+def _fato_step(load):
+    if load_partitions(versao) is not None:
+        return None
+    return load_model(versao, FATO_COLS, DIMS)[1]
 
-# ✅ SUA FATO TEM modalidade_norm
-COL_MOD_TXT = resolve_col(df_base, ["modalidade_norm", "Modalidade_norm"])
 
-# Pública/Privada normalmente NÃO está na FATO
-COL_PP_TXT = resolve_col(df_base, ["PublicaPrivada", "publica_privada"])
+def _cubo_step(load):
+    fato = load.result("fato")
+    particoes = load_partitions(versao)
+    if particoes is not None:
+        fato_rows = int(particoes["linhas"].sum())
+    else:
+        fato_rows = None if fato is None else len(fato)
+    # KPIs e gráficos saem do cubo (ano × UF × modalidade × pública/privada);
+    # a fato só é usada no drill-down
+    return load_cube(fato, load.result("dimensões"), fato_rows=fato_rows, version=versao, columns=FATO_COLS)
+
+
+carga = background_load(versao, "app", [
+    ("dimensões", lambda load: load_dims(versao, DIMS)),
+    ("fato", _fato_step),
+    ("cubo", _cubo_step),
+])
+
+
+def _cube():
+    """(cubo, cubo_tempo) quando a carga terminar; para a página sem cubo."""
+    wait_for(carga, ["cubo"], "Carregando cubo e fato")
+    cube, cube_tempo = carga.result("cubo")
+    if cube is None or len(cube) == 0:
+        st.error(
+            "⚠️ A tabela FATO_PROCESSO_REGULATORIO não está disponível.\n\n"
+            "Ela não é versionada no GitHub por boas práticas e limite de tamanho.\n"
+            "➡️ Gere localmente o CSV e coloque em: gold/output/fato_processo_regulatorio.csv"
+        )
+        st.stop()
+    return cube, cube_tempo
+
+
+if meta is None:
+    cube, cube_tempo = _cube()
 
-# IDs para fallback
-COL_ID_MOD = resolve_col(df_base, ["id_modalidade"])
-COL_ID_IES = resolve_col(df_base, ["id_ies"])
 
-# Métricas
-COL_TEMPO = resolve_col(df_base, ["tempo_tramitacao_dias"])
-COL_ENC = resolve_col(df_base, ["processo_encerrado"])
-COL_RISCO = resolve_col(df_base, ["flag_risco_alto"])
+def _opcoes(dim: str) -> list:
+    """Valores do filtro: do sidecar, ou do cubo quando não houver sidecar."""
+    if meta is not None:
+        return sidebar_values(meta, dim) or []
+    return unique_sorted_int_list(cube, dim) if dim == "ano" else unique_sorted_str_list(cube, dim)
+
 
 # ---------------------------------------------------------
 # Sidebar — Filtros
@@ -74,74 +115,69 @@ with st.sidebar:
     st.header("🎛️ Filtros")
 
     # Ano
-    anos = unique_sorted_int_list(df_base, COL_ANO) if COL_ANO else []
+    anos = _opcoes("ano")
     ano_default = anos[-5:] if len(anos) > 5 else anos
     ano_sel = st.multiselect("Ano do Protocolo", anos, default=ano_default)
 
     # UF
-    ufs = unique_sorted_str_list(df_base, COL_UF) if COL_UF else []
+    ufs = _opcoes("uf")
     uf_sel = st.multiselect("UF", ufs, default=[])
 
-    # Modalidade (vem direto da FATO)
-    mods = unique_sorted_str_list(df_base, COL_MOD_TXT) if COL_MOD_TXT else []
+    # Modalidade
+    mods = _opcoes("modalidade_norm")
     mod_sel = st.multiselect("Modalidade", mods, default=[])
 
-    # Pública / Privada (vem da DIM_IES)
-    if isinstance(dim_ies, pd.DataFrame) and len(dim_ies) > 0:
-        col_pp_dim = resolve_col(dim_ies, ["PublicaPrivada", "publica_privada"])
-        pps = unique_sorted_str_list(dim_ies, col_pp_dim) if col_pp_dim else []
-    else:
-        pps = []
+    # Pública / Privada (vem da DIM_IES, já resolvida no cubo)
+    pps = _opcoes("PublicaPrivada")
     pp_sel = st.multiselect("Pública / Privada", pps, default=[])
 
+filtros = {
+    "ano": ano_sel,
+    "uf": uf_sel,
+    "modalidade_norm": mod_sel,
+    "PublicaPrivada": pp_sel,
+}
+
 # ---------------------------------------------------------
-# Aplicar filtros
+# KPIs
 # ---------------------------------------------------------
-df = df_base.copy()
+slots = [c.empty() for c in st.columns(4)]
 
-# Ano
-if COL_ANO and ano_sel:
-    df["_ano"] = pd.to_numeric(df[COL_ANO], errors="coerce")
-    df = df[df["_ano"].isin(ano_sel)]
 
-# UF
-if COL_UF and uf_sel:
-    df = df[df[COL_UF].isin(uf_sel)]
+def _show_kpis(kpis: dict, label: str = "Registros (filtrados)") -> None:
+    total = kpis["total"]
+    med_tempo = kpis["tempo_mediano"]
+    slots[0].metric(label, f"{total:,}".replace(",", "."))
+    slots[1].metric("% Encerrados (proxy)", f"{kpis['pct_encerrados']:.1f}%")
+    slots[2].metric(
+        "Tempo mediano (dias)",
+        "-" if med_tempo is None else f"{int(med_tempo):,}".replace(",", "."),
+    )
+    slots[3].metric("% Risco alto (proxy)", f"{kpis['pct_risco_alto']:.1f}%")
 
-# Modalidade
-if COL_MOD_TXT and mod_sel:
-    df = df[df[COL_MOD_TXT].isin(mod_sel)]
 
-# Pública / Privada (via DIM_IES)
-if pp_sel and COL_ID_IES and isinstance(dim_ies, pd.DataFrame):
-    col_pp_dim = resolve_col(dim_ies, ["PublicaPrivada", "publica_privada"])
-    col_id_ies_dim = resolve_col(dim_ies, ["id_ies"])
-    if col_pp_dim and col_id_ies_dim:
-        ids_ies = (
-            dim_ies[dim_ies[col_pp_dim].isin(pp_sel)][col_id_ies_dim]
-            .astype(str)
-            .unique()
-            .tolist()
-        )
-        df = df[df[COL_ID_IES].astype(str).isin(ids_ies)]
+# enquanto o cubo carrega: com filtro só de ano, KPIs do recorte a partir dos
+# acumuladores por partição do manifesto; senão, KPIs da base inteira
+# pré-calculados na build
+if not carga.ready("cubo"):
+    so_ano = not (uf_sel or mod_sel or pp_sel)
+    kpis_anos = partition_kpis(versao, tuple(ano_sel) or None) if so_ano else None
+    resumo = load_resumo(versao)
+    if kpis_anos is not None:
+        _show_kpis(kpis_anos)
+    elif resumo is not None:
+        _show_kpis(resumo, "Registros (base completa)")
 
-# ---------------------------------------------------------
-# KPIs
-# ---------------------------------------------------------
-c1, c2, c3, c4 = st.columns(4)
+if meta is not None:
+    cube, cube_tempo = _cube()
+dims, fato = carga.result("dimensões"), carga.result("fato")
 
-total = len(df)
-pct_enc = safe_mean_pct(df, COL_ENC) if COL_ENC else 0.0
-med_tempo = safe_median(df, COL_TEMPO) if COL_TEMPO else None
-pct_risco = safe_mean_pct(df, COL_RISCO) if COL_RISCO else 0.0
+# agregados em cache por (página, agregado, filtros, versão dos dados)
+def _cached(aggregate: str, compute):
+    return cached_result("app", aggregate, filtros, versao, compute)
 
-c1.metric("Registros (filtrados)", f"{total:,}".replace(",", "."))
-c2.metric("% Encerrados (proxy)", f"{pct_enc:.1f}%")
-c3.metric(
-    "Tempo mediano (dias)",
-    "-" if med_tempo is None else f"{int(med_tempo):,}".replace(",", "."),
-)
-c4.metric("% Risco alto (proxy)", f"{pct_risco:.1f}%")
+
+_show_kpis(_cached("kpis", lambda: cube_kpis(cube, cube_tempo, filtros)))
 
 st.divider()
 
@@ -150,16 +186,13 @@ st.divider()
 # ---------------------------------------------------------
 st.subheader("📈 Volume por ano de protocolo")
 
-if COL_ANO:
-    by_year = (
-        df.assign(_ano=pd.to_numeric(df[COL_ANO], errors="coerce"))
-        .dropna(subset=["_ano"])
-        .assign(_ano=lambda x: x["_ano"].astype(int))
-        .groupby("_ano")
-        .size()
-        .reset_index(name="qtd")
-        .sort_values("_ano")
-    )
+def _by_year():
+    out = cube_counts(cube, filtros, "ano").rename(columns={"ano": "_ano"})
+    return out.astype({"_ano": int}).sort_values("_ano")
+
+
+by_year = _cached("by_year", _by_year)
+if len(by_year):
     st.bar_chart(by_year, x="_ano", y="qtd")
 else:
     st.info("Ano do protocolo não disponível.")
@@ -169,14 +202,8 @@ else:
 # ---------------------------------------------------------
 st.subheader("🗺️ Distribuição por UF")
 
-if COL_UF:
-    by_uf = (
-        df.groupby(COL_UF)
-        .size()
-        .reset_index(name="qtd")
-        .sort_values("qtd", ascending=False)
-        .head(27)
-    )
+by_uf = _cached("by_uf", lambda: cube_counts(cube, filtros, "uf").sort_values("qtd", ascending=False).head(27))
+if len(by_uf):
     st.dataframe(by_uf, use_container_width=True)
 else:
     st.info("UF não disponível.")
@@ -186,19 +213,25 @@ else:
 # ---------------------------------------------------------
 st.subheader("🏷️ Distribuição por Modalidade")
 
-if COL_MOD_TXT:
-    by_mod = (
-        df.groupby(COL_MOD_TXT)
-        .size()
-        .reset_index(name="qtd")
-        .sort_values("qtd", ascending=False)
-    )
+by_mod = _cached("by_mod", lambda: cube_counts(cube, filtros, "modalidade_norm").sort_values("qtd", ascending=False))
+if len(by_mod):
     st.dataframe(by_mod, use_container_width=True)
 else:
     st.info("Modalidade não disponível na FATO.")
 
 # ---------------------------------------------------------
-# DEBUG (pode remover depois)
+# Drill-down (linhas da FATO para o recorte)
 # ---------------------------------------------------------
-st.write("DEBUG — Colunas da FATO:", list(df_base.columns))
+tem_fato = fato is not None or load_partitions(versao) is not None
+if tem_fato and st.checkbox("🔎 Ver processos do recorte (drill-down)"):
+    anos_fato = (tuple(ano_sel) or None) if load_partitions(versao) is not None else None
+    _, fato = load_model(versao, FATO_COLS, DIMS, anos_fato)
+    index = load_filter_index(
+        fato, dims, fato_rows=len(fato), version=versao, columns=FATO_COLS, anos=anos_fato
+    )
+    rows = index.rows(filtros)
+    # só o drill-down precisa de todas as colunas (mesmas linhas e anos)
+    dims_todas, fato_toda = load_model(versao, anos=anos_fato)
+    st.caption(f"{len(rows):,} processos (exibindo até 1.000)".replace(",", "."))
+    st.dataframe(fato_labels(fato_toda.iloc[rows[:1000]], FATO_LABELS, dims_todas), use_container_width=True)
 
@@ -1,231 +1,303 @@
 # streamlit/pages/1_📌_Risco_Regulatorio.py
 import streamlit as st
-import pandas as pd
 import numpy as np
 
-from utils.data import load_model
-from utils.metrics import (
-    resolve_col,
-    coerce_numeric,
-    coerce_int,
-    parse_date_key_yyyymmdd,
-    safe_value_counts,
-    add_risk_score,
+from utils.background import wait_for
+from utils.data import (
+    background_load,
+    cached_result,
+    data_version,
+    fato_labels,
+    load_backlog_index,
+    load_filter_index,
+    load_metadata,
+    load_model,
+    load_partitions,
+    load_resumo,
+    load_risk_scores,
+    partition_kpis,
+    partition_years,
+    sidebar_values,
 )
+from utils.metrics import safe_value_counts
+from pipeline.risk import DEFAULT_WEIGHTS, RISK_LABELS, RISK_VERSION  # utils põe a raiz no sys.path
 
 st.set_page_config(page_title="Risco Regulatório", layout="wide")
 
 st.title("🎯 Visão de Risco Regulatório")
 st.caption("Processos ativos • tempo em aberto • gargalos por fase/órgão • score regulatório")
 
-dims, fato = load_model()
+# projeção: só as colunas da fato e as dimensões que esta página usa
+# (filtros, KPIs, gargalos, backlog mensal e componentes do score)
+FATO_COLS = (
+    "AnoProtocolo", "FASE_ATUAL", "ORGAO", "ATO", "CATEGORIA_ATO",
+    "processo_encerrado", "processo_ativo", "tempo_em_aberto_dias", "tempo_tramitacao_dias",
+    "risco_score", "risco_faixa", "risco_versao",
+    "endereco_divergente_flag", "tem_divergencia_vagas", "is_sede_ead_flag",
+    "dt_protocolo_key", "dt_ultimo_ato_key", "dt_entrada_fase_key", "ano_encerramento",
+)
+DIMS = ("dim_atributo",)
 
-if fato is None or len(fato) == 0:
-    st.error(
-        "⚠️ Não foi possível carregar a FATO_PROCESSO_REGULATORIO.\n\n"
-        "Gere localmente e coloque em: gold/output/fato_processo_regulatorio.csv"
-    )
-    st.stop()
+versao = data_version()
 
-df = fato.copy()
+# ----------------------------
+# KPIs topo (slots criados antes da carga: a prévia é trocada pelos valores do recorte)
+# ----------------------------
+slots = [c.empty() for c in st.columns(4)]
+
+
+def _dias(valor) -> str:
+    return "-" if valor is None or np.isnan(valor) else f"{int(valor):,}".replace(",", ".")
+
+
+def _show_kpis(total: int, ativos: int, tempo_aberto_med, tempo_tram_med,
+               label: str = "Registros (filtrados)") -> None:
+    slots[0].metric(label, f"{total:,}".replace(",", "."))
+    slots[1].metric("Ativos", f"{ativos:,}".replace(",", "."))
+    slots[2].metric("Tempo em aberto (mediano)", _dias(tempo_aberto_med))
+    slots[3].metric("Tempo tramitação (mediano)", _dias(tempo_tram_med))
+
+
+def _show_previa(anos: tuple[int, ...] | None) -> None:
+    """
+    Enquanto a fato carrega: KPIs dos anos pedidos pelos acumuladores por
+    partição do manifesto ou, sem eles, da base inteira pré-calculados na
+    build (como no app). Sem filtro de risco/situação; ativos = total menos
+    os encerrados, tempo em aberto só depois da carga.
+    """
+    kpis = partition_kpis(versao, anos)
+    label = "Registros (base completa)" if anos is None else "Registros (anos selecionados)"
+    if kpis is None:
+        kpis, label = load_resumo(versao), "Registros (base completa)"
+    if kpis is None:
+        return
+    total = kpis["total"]
+    ativos = round(total * (100 - kpis["pct_encerrados"]) / 100)
+    _show_kpis(total, ativos, None, kpis["tempo_mediano"], label)
+
+
+def _load(anos: tuple[int, ...] | None = None):
+    # carga em segundo plano (utils/background.py): prévia dos KPIs e barra de progresso
+    carga = background_load(versao, f"risco:{anos}", [
+        ("fato", lambda load: load_model(versao, FATO_COLS, DIMS, anos)),
+    ])
+    if not carga.ready("fato"):
+        _show_previa(anos)
+    wait_for(carga, ["fato"], "Carregando a fato")
+    dims, fato = carga.result("fato")
+    if fato is None or len(fato) == 0:
+        st.error(
+            "⚠️ Não foi possível carregar a FATO_PROCESSO_REGULATORIO.\n\n"
+            "Gere localmente e coloque em: gold/output/fato_processo_regulatorio.csv"
+        )
+        st.stop()
+    return dims, fato
+
+
+# Anos do filtro: do sidecar da build (pipeline/metadata.py) ou do manifesto
+# da fato particionada (pipeline/partitions.py), sem ler a fato; com partições,
+# só as dos anos selecionados são lidas. Sem nenhum dos dois, a fato é lida
+# inteira e os anos vêm do índice de filtros.
+meta = load_metadata(versao)
+particoes = load_partitions(versao)
+anos_fato = None
+fato = None
+if meta is not None:
+    anos = sidebar_values(meta, "ano") or []
+elif particoes is not None:
+    anos = partition_years(versao)
+else:
+    dims, fato = _load()
+    index = load_filter_index(fato, dims, fato_rows=len(fato), version=versao, columns=FATO_COLS)
+    anos = [int(a) for a in index.values("ano")] if "AnoProtocolo" in fato.columns else []
 
 # ----------------------------
-# Resolver colunas
+# Sidebar: filtros básicos
 # ----------------------------
-COL_ENC = resolve_col(df, ["processo_encerrado", "PROCESSO_ENCERRADO"])
-COL_TTR = resolve_col(df, ["tempo_tramitacao_dias", "TEMPO_TRAMITACAO_DIAS"])
-COL_TEA = resolve_col(df, ["tempo_em_aberto_dias", "TEMPO_EM_ABERTO_DIAS"])
-COL_ANO = resolve_col(df, ["AnoProtocolo", "ANO_DO_PROTOCOLO", "ano_protocolo"])
+with st.sidebar:
+    st.header("🎛️ Filtros (Risco)")
 
-COL_FASE = resolve_col(df, ["FASE_ATUAL", "fase_atual"])
-COL_ORGAO = resolve_col(df, ["ORGAO", "ORGÃO", "ORGAO_PROCESSO", "ÓRGÃO", "ORGAO"])
-COL_ATO = resolve_col(df, ["ATO", "ato"])
-COL_CAT_ATO = resolve_col(df, ["CATEGORIA_ATO", "categoria_ato"])
+    # ano
+    ano_sel = st.multiselect("Ano do Protocolo", anos, default=anos[-5:] if len(anos) > 5 else anos)
 
-# flags de divergência
-COL_END_DIV = resolve_col(df, ["endereco_divergente_flag", "ENDERECO_DIVERGENTE_FLAG"])
-COL_VAG_DIV = resolve_col(df, ["tem_divergencia_vagas", "TEM_DIVERGENCIA_VAGAS"])
-COL_SEDE_EAD = resolve_col(df, ["is_sede_ead_flag", "IS_SEDE_EAD_FLAG"])
+if fato is None:
+    anos_fato = (tuple(ano_sel) or None) if particoes is not None else None
+    dims, fato = _load(anos_fato)
+    index = load_filter_index(
+        fato, dims, fato_rows=len(fato), version=versao, columns=FATO_COLS, anos=anos_fato
+    )
 
-COL_DT_PROTO_KEY = resolve_col(df, ["dt_protocolo_key", "DT_PROTOCOLO_KEY"])
-COL_DT_FASE_KEY = resolve_col(df, ["dt_entrada_fase_key", "DT_ENTRADA_FASE_KEY"])
-COL_DT_ULT_KEY = resolve_col(df, ["dt_ultimo_ato_key", "DT_ULTIMO_ATO_KEY"])
+# rótulos de fase/órgão vêm das dimensões (a fato guarda ids)
+df = fato_labels(fato, ["FASE_ATUAL", "ORGAO"], dims)
 
 # ----------------------------
-# Tipos / Normalizações
+# Colunas (nomes canônicos e tipos já aplicados em load_model — utils/schema.py)
 # ----------------------------
-if COL_ENC:
-    df["_enc"] = coerce_int(df[COL_ENC]).fillna(0).astype(int)
-else:
-    df["_enc"] = 0
+def _col(name: str) -> str | None:
+    return name if name in df.columns else None
 
-df["_ativo"] = (df["_enc"] == 0).astype(int)
+COL_ANO = _col("AnoProtocolo")
+COL_FASE = _col("FASE_ATUAL")
+COL_ORGAO = _col("ORGAO")
 
-if COL_TTR:
-    df["_tempo_tram"] = coerce_numeric(df[COL_TTR])
-else:
-    df["_tempo_tram"] = np.nan
+df["_ativo"] = (df["processo_encerrado"] == 0).astype(int)
 
-if COL_TEA:
-    df["_tempo_aberto"] = coerce_numeric(df[COL_TEA])
-else:
-    df["_tempo_aberto"] = np.nan
-
-# datas (se existirem)
-if COL_DT_PROTO_KEY:
-    df["_dt_protocolo"] = parse_date_key_yyyymmdd(df[COL_DT_PROTO_KEY])
-else:
-    df["_dt_protocolo"] = pd.NaT
+with st.sidebar:
+    # risco
+    riscos = RISK_LABELS
+    risco_sel = st.multiselect("Faixa de risco", riscos, default=riscos)
 
-if COL_DT_FASE_KEY:
-    df["_dt_entrada_fase"] = parse_date_key_yyyymmdd(df[COL_DT_FASE_KEY])
-else:
-    df["_dt_entrada_fase"] = pd.NaT
+    # ativo
+    ativo_sel = st.selectbox("Situação", ["Todos", "Ativos", "Encerrados"], index=1)
 
-if COL_DT_ULT_KEY:
-    df["_dt_ultimo_ato"] = parse_date_key_yyyymmdd(df[COL_DT_ULT_KEY])
-else:
-    df["_dt_ultimo_ato"] = pd.NaT
+    # pesos do score (what-if): só refaz matriz @ pesos
+    with st.expander("⚖️ Pesos do score"):
+        pesos = {
+            c: st.number_input(c, value=float(w), step=1.0, key=f"peso_{c}")
+            for c, w in DEFAULT_WEIGHTS.items()
+        }
 
 # ----------------------------
 # Score regulatório (Baixo/Médio/Alto)
 # ----------------------------
-df = add_risk_score(
-    df,
-    tempo_tramit_col="_tempo_tram",
-    tempo_aberto_col="_tempo_aberto",
-    fase_col=COL_FASE,
-    ato_col=COL_ATO,
-    cat_ato_col=COL_CAT_ATO,
-    end_div_col=COL_END_DIV,
-    vagas_div_col=COL_VAG_DIV,
-    sede_ead_col=COL_SEDE_EAD,
+# a build Gold já grava o score da versão atual e o índice de filtros já traz
+# a faixa; só recalcula (matriz x pesos, em cache por vetor de pesos) se os
+# pesos forem alterados ou a fato for de outra versão/antiga
+materializado = (
+    "risco_faixa" in fato.columns
+    and "risco_versao" in fato.columns
+    and (fato["risco_versao"] == RISK_VERSION).all()
 )
+pesos_custom = pesos != DEFAULT_WEIGHTS
+if pesos_custom or not materializado:
+    score, faixa, index = load_risk_scores(
+        fato, dims, index, fato_rows=len(fato), version=versao, columns=FATO_COLS, anos=anos_fato,
+        pesos=tuple(sorted(pesos.items())),
+    )
+    df = df.assign(risco_score=score, risco_faixa=faixa)
 
-# ----------------------------
-# Sidebar: filtros básicos
-# ----------------------------
-with st.sidebar:
-    st.header("🎛️ Filtros (Risco)")
-
-    # ano
-    anos = []
-    if COL_ANO:
-        anos = (
-            coerce_int(df[COL_ANO])
-            .dropna()
-            .astype(int)
-            .sort_values()
-            .unique()
-            .tolist()
-        )
-    ano_sel = st.multiselect("Ano do Protocolo", anos, default=anos[-5:] if len(anos) > 5 else anos)
+# aplica filtros (AND entre dimensões, OR entre valores)
+filtros = {
+    "ano": ano_sel if COL_ANO else [],
+    "risco_faixa": risco_sel,
+    "situacao": [] if ativo_sel == "Todos" else [ativo_sel],
+}
+rows = index.rows(filtros)
 
-    # risco
-    riscos = ["Baixo", "Médio", "Alto"]
-    risco_sel = st.multiselect("Faixa de risco", riscos, default=riscos)
 
-    # ativo
-    ativo_sel = st.selectbox("Situação", ["Todos", "Ativos", "Encerrados"], index=1)
-
-# aplica filtros
-df_view = df.copy()
+def _view(*cols: str | None):
+    """Só as colunas pedidas, nas linhas do filtro (a fato em si não é copiada)."""
+    return df[[c for c in cols if c]].iloc[rows]
 
-if COL_ANO and len(ano_sel) > 0:
-    ano_num = coerce_int(df_view[COL_ANO])
-    df_view = df_view[ano_num.isin(ano_sel)]
 
-if len(risco_sel) > 0:
-    df_view = df_view[df_view["risco_faixa"].isin(risco_sel)]
+# agregados em cache por (página, agregado, filtros, versão dos dados);
+# pesos alterados mudam as faixas, então também entram na chave
+def _cached(aggregate: str, compute, filters: dict | None = None):
+    chave = dict(filtros if filters is None else filters, pesos=pesos if pesos_custom else None)
+    return cached_result("risco", aggregate, chave, versao, compute)
 
-if ativo_sel == "Ativos":
-    df_view = df_view[df_view["_ativo"] == 1]
-elif ativo_sel == "Encerrados":
-    df_view = df_view[df_view["_ativo"] == 0]
 
 # ----------------------------
 # KPIs topo
 # ----------------------------
-c1, c2, c3, c4 = st.columns(4)
+def _kpis():
+    n = len(rows)
+    df_view = _view("_ativo", "tempo_em_aberto_dias", "tempo_tramitacao_dias")
+    return {
+        "total": n,
+        "ativos": int(df_view["_ativo"].sum()) if n else 0,
+        "tempo_aberto_med": df_view["tempo_em_aberto_dias"].median(skipna=True) if n else np.nan,
+        "tempo_tram_med": df_view["tempo_tramitacao_dias"].median(skipna=True) if n else np.nan,
+    }
 
-total = len(df_view)
-ativos = int(df_view["_ativo"].sum()) if total else 0
-encerrados = total - ativos
 
-tempo_aberto_med = df_view["_tempo_aberto"].median(skipna=True) if total else np.nan
-tempo_tram_med = df_view["_tempo_tram"].median(skipna=True) if total else np.nan
-
-c1.metric("Registros (filtrados)", f"{total:,}".replace(",", "."))
-c2.metric("Ativos", f"{ativos:,}".replace(",", "."))
-c3.metric("Tempo em aberto (mediano)", "-" if np.isnan(tempo_aberto_med) else f"{int(tempo_aberto_med):,}".replace(",", "."))
-c4.metric("Tempo tramitação (mediano)", "-" if np.isnan(tempo_tram_med) else f"{int(tempo_tram_med):,}".replace(",", "."))
+kpis = _cached("kpis", _kpis)
+total = kpis["total"]
+_show_kpis(total, kpis["ativos"], kpis["tempo_aberto_med"], kpis["tempo_tram_med"])
 
 st.divider()
 
 # ----------------------------
 # Backlog: Ativo vs Encerrado (por ano)
 # ----------------------------
-# 1) Identificar colunas no seu df (ajuste se já existirem no seu código)
-COL_ANO = "_ano" if "_ano" in df.columns else ("AnoProtocolo" if "AnoProtocolo" in df.columns else None)
-COL_ATIVO = "processo_ativo" if "processo_ativo" in df.columns else None
-COL_ENC = "processo_encerrado" if "processo_encerrado" in df.columns else None
-
 if COL_ANO is None:
     st.info("Não foi possível montar backlog: coluna de ano não encontrada.")
 else:
-    tmp = df.copy()
-    tmp["_ano"] = pd.to_numeric(tmp[COL_ANO], errors="coerce")
-    tmp = tmp.dropna(subset=["_ano"])
-    tmp["_ano"] = tmp["_ano"].astype(int)
-
-    # 2) Criar flags se necessário (ativo = 1 quando encerrado == 0)
-    if COL_ENC and "processo_ativo" not in tmp.columns:
-        tmp["processo_encerrado"] = pd.to_numeric(tmp[COL_ENC], errors="coerce").fillna(0).astype(int)
-        tmp["processo_ativo"] = (tmp["processo_encerrado"] == 0).astype(int)
-
-    # Se não tiver encerrado, pelo menos garante ativo (não ideal, mas não quebra)
-    if "processo_ativo" not in tmp.columns:
-        tmp["processo_ativo"] = 1
-
-    if "processo_encerrado" not in tmp.columns:
-        tmp["processo_encerrado"] = 0
-
-    # 3) Agregar por ano
-    backlog = (
-        tmp.groupby("_ano")
-           .agg(Ativos=("processo_ativo", "sum"),
-                Encerrados=("processo_encerrado", "sum"))
-           .reset_index()
-           .sort_values("_ano")
-    )
+    def _backlog():
+        if particoes is not None:  # somas por ano do manifesto, sem ler partições
+            return (
+                particoes.dropna(subset=["ano"])
+                .rename(columns={"ano": "_ano", "processo_ativo": "Ativos", "processo_encerrado": "Encerrados"})
+                .astype({"_ano": int})[["_ano", "Ativos", "Encerrados"]]
+                .sort_values("_ano")
+            )
+
+        col_ativo = "processo_ativo" if "processo_ativo" in df.columns else "_ativo"
+        tmp = df[[COL_ANO, "processo_encerrado", col_ativo]].dropna(subset=[COL_ANO])
+        tmp = tmp.assign(
+            _ano=tmp[COL_ANO].astype(int),
+            processo_encerrado=tmp["processo_encerrado"].astype(int),
+            processo_ativo=tmp[col_ativo],
+        )
 
-    # 4) Garantir colunas e tipos numéricos
-    for c in ["Ativos", "Encerrados"]:
-        if c not in backlog.columns:
-            backlog[c] = 0
-        backlog[c] = pd.to_numeric(backlog[c], errors="coerce").fillna(0)
+        # Agregar por ano
+        return (
+            tmp.groupby("_ano")
+               .agg(Ativos=("processo_ativo", "sum"),
+                    Encerrados=("processo_encerrado", "sum"))
+               .reset_index()
+               .sort_values("_ano")
+        )
 
-    # 5) Plot
+    # backlog usa a base inteira (não depende dos filtros)
+    backlog = _cached("backlog", _backlog, filters={})
+
+    # Plot
     st.subheader("📊 Backlog: Ativos vs Encerrados (por ano)")
     st.bar_chart(backlog, x="_ano", y=["Ativos", "Encerrados"])
+
+# ----------------------------
+# Backlog na data: processos em aberto no fim de cada mês
+# ----------------------------
+# em aberto em t = protocolados até t − encerrados até t, por searchsorted nos
+# vetores ordenados de entrada/saída (pipeline/backlog.py); o recorte só
+# mascara esses vetores. A situação atual não se aplica a uma série no tempo.
+st.subheader("📉 Processos em aberto ao longo do tempo (mensal)")
+
+filtros_mensal = {k: v for k, v in filtros.items() if k != "situacao"}
+rows_mensal = index.rows(filtros_mensal)
+backlog_index = load_backlog_index(
+    fato, fato_rows=len(fato), version=versao, columns=FATO_COLS, anos=anos_fato
+)
+mensal = _cached("backlog_mensal", lambda: backlog_index.monthly(rows_mensal), filters=filtros_mensal)
+
+if len(mensal):
+    st.line_chart(mensal, x="data", y="em_aberto")
+    st.caption(
+        "ℹ️ Entrada pela data de protocolo (ou 01/01 do ano); saída dos encerrados pela data do "
+        "último ato, da entrada na fase ou 31/12 do ano de encerramento."
+    )
+else:
+    st.info("Sem datas de protocolo para montar a série mensal.")
+
 # ----------------------------
 # Pressão regulatória: % Ativos por ano
 # ----------------------------
 st.subheader("📈 Pressão regulatória (% de ativos por ano)")
 
 if COL_ANO and total:
-    tmp = df_view.copy()
-    tmp["_ano"] = coerce_int(tmp[COL_ANO])
-    tmp = tmp.dropna(subset=["_ano"])
-    tmp["_ano"] = tmp["_ano"].astype(int)
-
-    pressao = (
-        tmp.groupby("_ano")["_ativo"]
-        .mean()
-        .mul(100)
-        .reset_index(name="pct_ativos")
-        .sort_values("_ano")
-    )
+    def _pressao():
+        tmp = _view(COL_ANO, "_ativo").dropna(subset=[COL_ANO])
+        tmp = tmp.assign(_ano=tmp[COL_ANO].astype(int))
+        return (
+            tmp.groupby("_ano")["_ativo"]
+            .mean()
+            .mul(100)
+            .reset_index(name="pct_ativos")
+            .sort_values("_ano")
+        )
+
+    pressao = _cached("pressao", _pressao)
     st.line_chart(pressao, x="_ano", y="pct_ativos")
 else:
     st.info("Sem dados suficientes para calcular pressão regulatória.")
@@ -240,7 +312,7 @@ colA, colB = st.columns(2)
 with colA:
     st.subheader("⛔ Gargalos por Fase Atual (top 15)")
     if COL_FASE:
-        tab_fase = safe_value_counts(df_view, COL_FASE, top=15, dropna=True)
+        tab_fase = _cached("gargalo_fase", lambda: safe_value_counts(_view(COL_FASE), COL_FASE, top=15, dropna=True))
         st.dataframe(tab_fase, use_container_width=True)
     else:
         st.info("Coluna FASE_ATUAL não encontrada.")
@@ -248,7 +320,7 @@ with colA:
 with colB:
     st.subheader("🏛️ Gargalos por Órgão (top 15)")
     if COL_ORGAO:
-        tab_org = safe_value_counts(df_view, COL_ORGAO, top=15, dropna=True)
+        tab_org = _cached("gargalo_orgao", lambda: safe_value_counts(_view(COL_ORGAO), COL_ORGAO, top=15, dropna=True))
         st.dataframe(tab_org, use_container_width=True)
     else:
         st.info("Coluna ORGAO/ÓRGÃO não encontrada.")
@@ -260,13 +332,17 @@ st.divider()
 # ----------------------------
 st.subheader("🧠 Distribuição do Score Regulatório")
 
-dist = (
-    df_view["risco_faixa"]
+dist = _cached("dist_faixa", lambda: (
+    _view("risco_faixa")["risco_faixa"]
     .value_counts(dropna=False)
+    .loc[lambda x: x > 0]
     .rename_axis("faixa")
     .reset_index(name="qtd")
-)
+))
 
 st.bar_chart(dist, x="faixa", y="qtd")
 
-st.caption("ℹ️ O score é derivado em Python a partir de tempo, divergências e criticidade do ato/fase.")
+st.caption(
+    f"ℹ️ Score {RISK_VERSION} gerado na build Gold a partir de tempo, divergências e criticidade "
+    "do ato/fase (pesos ajustáveis na barra lateral)."
+)
@@ -0,0 +1,8 @@
+# streamlit/utils/__init__.py
+# Disponibiliza o pacote `pipeline` (raiz do repo) para o app Streamlit.
+import sys
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.append(str(_REPO_ROOT))
@@ -0,0 +1,73 @@
+# streamlit/utils/background.py
+"""
+Carga em segundo plano dos dados do app.
+
+A primeira sessão após um restart/deploy dispara (uma vez por processo, via
+`st.cache_resource` em `utils.data.background_load`) uma thread que roda as
+etapas de carga em ordem: dimensões, cubo, fato... Cada etapa chama os
+loaders em cache (`load_dims`, `load_cube`, `load_model`), então o resultado
+fica no mesmo cache que as páginas usam depois.
+
+Enquanto isso a página já mostra o que não depende da fato (barra lateral
+pelo sidecar, KPIs gerais do `resumo_metricas.csv`) e espera só as etapas de
+que precisa, com uma barra de progresso (`wait_for`).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable
+
+import streamlit as st
+
+
+class BackgroundLoad:
+    """Etapas `(nome, fn)` rodadas em ordem numa thread; `fn(load)` pode usar `load.result(...)` das anteriores."""
+
+    def __init__(self, steps: list[tuple[str, Callable[["BackgroundLoad"], Any]]]):
+        self.steps = steps
+        self.current: str | None = None
+        self._results: dict[str, Any] = {}
+        self._errors: dict[str, BaseException] = {}
+        self._done = {name: threading.Event() for name, _ in steps}
+        self._thread = threading.Thread(target=self._run, name="carga-gold", daemon=True)
+
+    def start(self) -> "BackgroundLoad":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        for name, fn in self.steps:
+            self.current = name
+            try:
+                self._results[name] = fn(self)
+            except BaseException as e:  # noqa: BLE001 — repassada em `result`
+                self._errors[name] = e
+            finally:
+                self._done[name].set()
+        self.current = None
+
+    def ready(self, name: str) -> bool:
+        return self._done[name].is_set()
+
+    def progress(self) -> float:
+        """Fração das etapas concluídas (0..1)."""
+        return sum(e.is_set() for e in self._done.values()) / max(len(self._done), 1)
+
+    def result(self, name: str, timeout: float | None = None) -> Any:
+        """Resultado da etapa (espera terminar; erros da etapa são relançados)."""
+        self._done[name].wait(timeout)
+        if name in self._errors:
+            raise self._errors[name]
+        return self._results.get(name)
+
+
+def wait_for(load: BackgroundLoad, names: list[str], label: str = "Carregando dados") -> None:
+    """Espera as etapas `names` mostrando uma barra de progresso (nada se já estiverem prontas)."""
+    if all(load.ready(n) for n in names):
+        return
+    bar = st.progress(load.progress(), text=label)
+    while not all(load.ready(n) for n in names):
+        bar.progress(load.progress(), text=f"{label}: {load.current or '...'}")
+        time.sleep(0.1)
+    bar.empty()
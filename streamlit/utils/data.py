@@ -1,7 +1,22 @@
+import hashlib
 from pathlib import Path
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from pipeline.backlog import BacklogIndex, build_backlog_index
+from pipeline.cube import build_cube
+from pipeline.keys import FATO_ATRIBUTOS, decode
+from pipeline.metadata import read_metadata
+from pipeline.partitions import find_manifest, merge_partition_metrics, read_partitioned
+from pipeline.risk import risk_components, risk_score
+from pipeline.store import read_table
+from utils.background import BackgroundLoad
+from utils.filter_index import FilterIndex, build_filter_index
+from utils.result_cache import ResultCache, budget_bytes
+from utils.schema import DIM_SCHEMAS, FATO_SCHEMA, apply_schema
+
 # =====================================================
 # Paths
 # =====================================================
@@ -11,97 +26,221 @@ GOLD_OUTPUT_DIR = GOLD_DIR / "output"
 
 
 # =====================================================
-# Column normalization (semantic layer for Streamlit)
+# Versão dos dados Gold
+# =====================================================
+def data_version() -> str:
+    """
+    Versão dos dados Gold: hash de nome + tamanho + mtime das tabelas.
+    Muda quando a build regrava qualquer saída; entra na chave dos caches.
+    """
+    h = hashlib.sha1()
+    for folder in [GOLD_OUTPUT_DIR, GOLD_DIR]:
+        if not folder.exists():
+            continue
+        for path in sorted([*folder.glob("*"), *folder.glob("*/_manifest.json")]):
+            if path.suffix in {".parquet", ".csv", ".arrow", ".json"}:
+                stat = path.stat()
+                h.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return h.hexdigest()[:16]
+
+
+# =====================================================
+# Loaders
 # =====================================================
-# Ajuste este mapa conforme suas colunas reais do CSV da FATO.
-# A ideia é: "nome do arquivo" -> "nome canônico esperado no app.py"
-COLUMN_MAP_FATO = {
-    # Tempo / Local / Modalidade
-    "ANO_DO_PROTOCOLO": "AnoProtocolo",
-    "UF_PROCESSO": "UF",
-    "UF_CADASTRO": "UF",
-    "MODALIDADE": "Modalidade_norm",
+def load_table(name: str, mmap: bool = False, columns: list[str] | None = None) -> pd.DataFrame | None:
+    """
+    Carrega uma tabela Gold já tipada.
+    Prefere `name.parquet` (colunar); cai para `name.csv` quando não houver.
+    Com `mmap=True`, usa `name.arrow` por memory map quando existir.
+    Com `columns`, lê só essas colunas.
+    """
+    return read_table(name, [GOLD_OUTPUT_DIR, GOLD_DIR], columns=columns, mmap=mmap)
 
-    # Métricas / Flags (se existirem no seu fato)
-    "TEMPO_TRAMITACAO_DIAS": "tempo_tramitacao_dias",
-    "PROCESSO_ENCERRADO": "processo_encerrado",
-    "FLAG_RISCO_ALTO": "flag_risco_alto",
 
-    # Público/Privado (se você já criou isso no pipeline)
-    "PUBLICAPRIVADA": "PublicaPrivada",
-    "PUBLICA_PRIVADA": "PublicaPrivada",
-    "CATEGORIA_ADMINISTRATIVA": "PublicaPrivada",
-}
+# =====================================================
+# Projeções (colunas / dimensões que cada página usa)
+# =====================================================
+DIM_NAMES = ("dim_curso", "dim_ies", "dim_tempo", "dim_modalidade", "dim_local", "dim_atributo")
 
-COLUMN_MAP_DIM_TEMPO = {
-    "ANO_DO_PROTOCOLO": "AnoProtocolo",
-}
+# rótulo -> coluna de id que o resolve (ver pipeline/keys.py)
+LABEL_IDS = {"uf": "id_local", "municipio": "id_local", "modalidade_norm": "id_modalidade", **FATO_ATRIBUTOS}
 
-COLUMN_MAP_DIM_LOCAL = {
-    "UF_PROCESSO": "UF",
-    "UF_CADASTRO": "UF",
-}
 
-COLUMN_MAP_DIM_MODALIDADE = {
-    "MODALIDADE": "Modalidade_norm",
-}
+def fato_source_columns(columns: tuple[str, ...]) -> list[str]:
+    """
+    Colunas a ler do arquivo para as colunas canônicas pedidas: o próprio
+    nome, os apelidos do esquema e, para rótulos, o id correspondente.
+    """
+    fields = {f.name: f for f in FATO_SCHEMA}
+    out = []
+    for col in columns:
+        out += [col, *(fields[col].aliases if col in fields else ())]
+        if col in LABEL_IDS:
+            out.append(LABEL_IDS[col])
+    return list(dict.fromkeys(out))
 
 
-def normalize_columns(df: pd.DataFrame, col_map: dict) -> pd.DataFrame:
-    """Renomeia colunas conforme dicionário e padroniza trims básicos."""
-    if df is None or df.empty:
-        return df
+# =====================================================
+# Sidecar de metadados (ver pipeline/metadata.py) e resumo
+# =====================================================
+def _fato_files() -> list[Path]:
+    return [
+        d / f"fato_processo_regulatorio.{ext}"
+        for d in [GOLD_OUTPUT_DIR, GOLD_DIR]
+        for ext in ("parquet", "csv", "arrow")
+    ]
 
-    # Renomear somente as que existem
-    rename = {c: col_map[c] for c in df.columns if c in col_map}
-    df = df.rename(columns=rename)
 
-    # Pequena limpeza: remover espaços em nomes de colunas
-    df.columns = [c.strip() for c in df.columns]
+@st.cache_data
+def load_metadata(version: str | None = None) -> dict | None:
+    """
+    Sidecar `metadados_app.json` da build: valores distintos e contagens das
+    dimensões de filtro, total de linhas, min/max das datas. Ignorado (None)
+    se a fato tiver sido regravada depois dele. `version` entra só na chave.
+    """
+    return read_metadata([GOLD_OUTPUT_DIR, GOLD_DIR], newer_than=_fato_files())
 
-    return df
+
+@st.cache_data
+def load_resumo(version: str | None = None) -> dict | None:
+    """
+    KPIs da base inteira pré-calculados pela build (`resumo_metricas.csv`),
+    nas mesmas chaves de `cube_kpis`. Ignorado (None) se a fato for mais
+    nova que o resumo. `version` entra só na chave do cache.
+    """
+    path = next((d / "resumo_metricas.csv" for d in [GOLD_OUTPUT_DIR, GOLD_DIR]
+                 if (d / "resumo_metricas.csv").exists()), None)
+    if path is None or any(p.exists() and p.stat().st_mtime_ns > path.stat().st_mtime_ns for p in _fato_files()):
+        return None
+    row = pd.read_csv(path).iloc[0]
+
+    def num(col: str) -> float | None:
+        return float(row[col]) if col in row.index and pd.notna(row[col]) else None
+
+    return {
+        "total": int(num("linhas_total") or 0),
+        "pct_encerrados": num("pct_encerrado") or 0.0,
+        "tempo_mediano": num("tempo_mediana"),
+        "pct_risco_alto": num("pct_risco_alto") or 0.0,
+    }
+
+
+def sidebar_values(meta: dict | None, dim: str) -> list | None:
+    """Valores distintos de `dim` no sidecar (None = sem sidecar)."""
+    if meta is None or dim not in meta.get("dimensoes", {}):
+        return None
+    return list(meta["dimensoes"][dim]["valores"])
 
 
 # =====================================================
-# Loaders
+# Partições por ano (ver pipeline/partitions.py)
 # =====================================================
-def load_csv(filename: str) -> pd.DataFrame | None:
-    """Carrega CSV procurando em caminhos padrão (gold/output e gold/)."""
-    paths = [
-        GOLD_OUTPUT_DIR / filename,
-        GOLD_DIR / filename,
-    ]
+FATO_PARTITION_STATS = ["processo_ativo", "processo_encerrado"]
+
+
+@st.cache_data
+def load_partitions(version: str | None = None) -> pd.DataFrame | None:
+    """
+    Uma linha por partição da fato, lida só do manifesto: `ano` (NA = sem
+    ano), `linhas` e a soma das flags de FATO_PARTITION_STATS. None se a
+    fato não estiver particionada. `version` entra só na chave do cache.
+    """
+    found = find_manifest("fato_processo_regulatorio", [GOLD_OUTPUT_DIR, GOLD_DIR])
+    if found is None:
+        return None
+    parts = found[1]["particoes"]
+    return pd.DataFrame({
+        "ano": pd.array([p["valor"] for p in parts], dtype="Int64"),
+        "linhas": [p["linhas"] for p in parts],
+        **{c: [p["soma"].get(c, 0) for p in parts] for c in FATO_PARTITION_STATS},
+    })
 
-    for path in paths:
-        if path.exists():
-            return pd.read_csv(path, dtype=str, low_memory=False)
 
-    return None
+def partition_years(version: str | None = None) -> list[int]:
+    """Anos com partição da fato ([] = fato não particionada)."""
+    parts = load_partitions(version)
+    return [] if parts is None else [int(a) for a in parts["ano"].dropna()]
 
 
 @st.cache_data
-def load_model():
+def partition_kpis(version: str | None = None, anos: tuple[int, ...] | None = None) -> dict | None:
+    """
+    KPIs de `cube_kpis` para um recorte só de anos, combinando os
+    acumuladores por partição do manifesto (pipeline/accumulators.py), sem
+    ler fato nem cubo. `anos` None = todos. None se a fato não estiver
+    particionada ou o manifesto não tiver os acumuladores.
+    """
+    found = find_manifest("fato_processo_regulatorio", [GOLD_OUTPUT_DIR, GOLD_DIR])
+    if found is None:
+        return None
+    manifest = found[1]
+    accs = {
+        col: merge_partition_metrics(manifest, col, None if anos is None else list(anos))
+        for col in ["processo_encerrado", "flag_risco_alto", "tempo_tramitacao_dias"]
+    }
+    if any(acc is None for acc in accs.values()):
+        return None
+
+    def pct(col: str) -> float:
+        mean = accs[col].mean
+        return float(mean * 100) if mean is not None else 0.0
+
+    return {
+        "total": accs["processo_encerrado"].n + accs["processo_encerrado"].nulos,
+        "pct_encerrados": pct("processo_encerrado"),
+        "tempo_mediano": accs["tempo_tramitacao_dias"].median(),
+        "pct_risco_alto": pct("flag_risco_alto"),
+    }
+
+
+@st.cache_resource
+def load_dims(version: str | None = None, dim_names: tuple[str, ...] | None = None) -> dict:
+    """Dimensões pedidas (None = todas), com nomes canônicos e tipos aplicados."""
+    dims = {name: load_table(name) for name in (dim_names or DIM_NAMES)}
+
+    # Nomes canônicos e tipos (utils/schema.py) — uma vez, antes do cache
+    for name, schema in DIM_SCHEMAS.items():
+        if name in dims:
+            dims[name] = apply_schema(dims[name], schema)
+    return dims
+
+
+@st.cache_resource
+def load_model(
+    version: str | None = None,
+    columns: tuple[str, ...] | None = None,
+    dim_names: tuple[str, ...] | None = None,
+    anos: tuple[int, ...] | None = None,
+):
     """
     Carrega modelo dimensional.
     O fato pode não existir (intencional).
-    Retorna: (dims: dict[str, DataFrame], fato: DataFrame|None)
-    """
-    dims = {}
+    `version` (ver `data_version`) entra só na chave do cache.
 
-    dims["dim_curso"] = load_csv("dim_curso.csv")
-    dims["dim_ies"] = load_csv("dim_ies.csv")
-    dims["dim_tempo"] = load_csv("dim_tempo.csv")
-    dims["dim_modalidade"] = load_csv("dim_modalidade.csv")
-    dims["dim_local"] = load_csv("dim_local.csv")
+    `columns` (nomes canônicos do esquema, rótulos como `uf`/`FASE_ATUAL`
+    ou colunas cruas como `id_ies`) e `dim_names` limitam o que é lido:
+    cada página declara a sua projeção, e cada projeção fica em cache
+    separado. None = tudo.
 
-    # Normalizar dimensões (apenas se o app usar colunas diretas delas)
-    dims["dim_tempo"] = normalize_columns(dims["dim_tempo"], COLUMN_MAP_DIM_TEMPO)
-    dims["dim_local"] = normalize_columns(dims["dim_local"], COLUMN_MAP_DIM_LOCAL)
-    dims["dim_modalidade"] = normalize_columns(dims["dim_modalidade"], COLUMN_MAP_DIM_MODALIDADE)
+    `anos` lê só as partições desses anos (ver `load_partitions`); sem
+    partições, ou com `anos=None`, lê a fato inteira.
 
-    # Fato
-    fato = load_csv("fato_processo_regulatorio.csv")
-    fato = normalize_columns(fato, COLUMN_MAP_FATO)
+    Um único objeto por processo, compartilhado entre sessões (sem a cópia
+    por chamada do `st.cache_data`); a fato vem do Arrow por memory map.
+    Tudo aqui é somente leitura: páginas criam colunas derivadas em
+    `assign`/views, nunca alteram estes frames.
+    Retorna: (dims: dict[str, DataFrame], fato: DataFrame|None)
+    """
+    dims = load_dims(version, dim_names)
+
+    # Fato (só as colunas da projeção e, com `anos`, só as partições do recorte)
+    source = None if columns is None else fato_source_columns(columns)
+    fato = None
+    if anos:
+        fato = read_partitioned("fato_processo_regulatorio", [GOLD_OUTPUT_DIR, GOLD_DIR], list(anos), source)
+    if fato is None:
+        fato = load_table("fato_processo_regulatorio", mmap=True, columns=source)
+    fato = apply_schema(fato, FATO_SCHEMA if columns is None else [f for f in FATO_SCHEMA if f.name in columns])
 
     if fato is None:
         st.warning(
@@ -111,3 +250,170 @@ def load_model():
         )
 
     return dims, fato
+
+
+# =====================================================
+# Junção com as dimensões (rótulos sob demanda)
+# =====================================================
+# atributos textuais que a fato guarda como id (ver pipeline/keys.py)
+FATO_LABELS = ["uf", "municipio", "modalidade_norm", *FATO_ATRIBUTOS]
+
+
+def fato_labels(fato: pd.DataFrame, attrs: list[str], dims: dict) -> pd.DataFrame:
+    """
+    Devolve a fato com as colunas de rótulo pedidas (ex.: `uf`, `FASE_ATUAL`)
+    resolvidas a partir das dimensões. A fato guarda só ids inteiros; os
+    rótulos entram como `Categorical` e só quando forem exibidos/usados.
+    """
+    labels = {a: decode(fato, a, dims) for a in attrs}
+    return fato.assign(**{a: s for a, s in labels.items() if s is not None})
+
+
+@st.cache_data
+def load_cube(
+    _fato: pd.DataFrame | None = None,
+    _dims: dict | None = None,
+    fato_rows: int | None = None,
+    version: str | None = None,
+    columns: tuple[str, ...] | None = None,
+):
+    """
+    Carrega o cubo pré-agregado do dashboard (gerado pela build Gold).
+    Se não existir, ou se não bater com a fato carregada (`fato_rows`),
+    monta o cubo em memória a partir da fato. `version` e `columns`
+    (projeção da fato carregada) entram só na chave.
+    Retorna: (cubo: DataFrame|None, cubo_tempo: DataFrame|None)
+    """
+    cube = load_table("cubo_dashboard")
+    cube_tempo = load_table("cubo_tempo")
+
+    stale = cube is None or (fato_rows is not None and int(cube["qtd"].sum()) != fato_rows)
+    if stale and _fato is not None:
+        dims = _dims or {}
+        cube, cube_tempo = build_cube(fato_labels(_fato, ["uf", "modalidade_norm"], dims), dims.get("dim_ies"))
+
+    return cube, cube_tempo
+
+
+@st.cache_resource
+def load_filter_index(
+    _fato: pd.DataFrame,
+    _dims: dict | None = None,
+    fato_rows: int = 0,
+    version: str | None = None,
+    columns: tuple[str, ...] | None = None,
+    anos: tuple[int, ...] | None = None,
+) -> FilterIndex:
+    """
+    Índice de filtros (bitmaps por valor) da fato carregada, montado uma vez.
+    `fato_rows`, `version`, `columns` (projeção) e `anos` (partições) entram
+    só na chave do cache.
+    """
+    dims = _dims or {}
+    return build_filter_index(fato_labels(_fato, ["uf", "modalidade_norm"], dims), dims.get("dim_ies"))
+
+
+@st.cache_resource
+def load_risk_components(
+    _fato: pd.DataFrame,
+    _dims: dict | None = None,
+    fato_rows: int = 0,
+    version: str | None = None,
+    columns: tuple[str, ...] | None = None,
+    anos: tuple[int, ...] | None = None,
+) -> np.ndarray:
+    """
+    Matriz de componentes do score de risco (pipeline/risk.py), montada uma
+    vez por fato. O score de cada conjunto de pesos é só `matriz @ pesos`.
+    `fato_rows`, `version`, `columns` (projeção) e `anos` (partições) entram
+    só na chave do cache.
+    """
+    df = fato_labels(_fato, ["FASE_ATUAL", "ATO", "CATEGORIA_ATO"], _dims or {})
+    cols = {c: c if c in df.columns else None for c in [
+        "FASE_ATUAL", "ATO", "CATEGORIA_ATO",
+        "endereco_divergente_flag", "tem_divergencia_vagas", "is_sede_ead_flag",
+    ]}
+    return risk_components(
+        df,
+        tempo_tramit_col="tempo_tramitacao_dias",
+        tempo_aberto_col="tempo_em_aberto_dias",
+        fase_col=cols["FASE_ATUAL"],
+        ato_col=cols["ATO"],
+        cat_ato_col=cols["CATEGORIA_ATO"],
+        end_div_col=cols["endereco_divergente_flag"],
+        vagas_div_col=cols["tem_divergencia_vagas"],
+        sede_ead_col=cols["is_sede_ead_flag"],
+    )
+
+
+@st.cache_resource(max_entries=8)
+def load_risk_scores(
+    _fato: pd.DataFrame,
+    _dims: dict | None = None,
+    _index: FilterIndex | None = None,
+    fato_rows: int = 0,
+    version: str | None = None,
+    columns: tuple[str, ...] | None = None,
+    anos: tuple[int, ...] | None = None,
+    pesos: tuple[tuple[str, float], ...] = (),
+) -> tuple[np.ndarray, pd.Categorical, FilterIndex]:
+    """
+    (risco_score, risco_faixa, índice com a faixa) para um conjunto de pesos
+    do analista (ou para uma fato sem o score da versão atual). Os bitmaps
+    da faixa saem uma vez por vetor de pesos, não a cada rerun. `pesos`
+    entra na chave junto com `fato_rows`, `version`, `columns` e `anos`.
+    """
+    componentes = load_risk_components(
+        _fato, _dims, fato_rows=fato_rows, version=version, columns=columns, anos=anos
+    )
+    score, faixa = risk_score(componentes, dict(pesos))
+    return score, faixa, _index.with_column("risco_faixa", pd.Series(faixa))
+
+
+@st.cache_resource
+def load_backlog_index(
+    _fato: pd.DataFrame,
+    fato_rows: int = 0,
+    version: str | None = None,
+    columns: tuple[str, ...] | None = None,
+    anos: tuple[int, ...] | None = None,
+) -> BacklogIndex:
+    """
+    Vetores ordenados de entrada/saída (pipeline/backlog.py) para o backlog
+    "em aberto na data", montados uma vez por fato. `fato_rows`, `version`,
+    `columns` (projeção) e `anos` (partições) entram só na chave do cache.
+    """
+    return build_backlog_index(
+        len(_fato),
+        _fato.get("dt_protocolo_key"),
+        _fato.get("processo_encerrado"),
+        [_fato.get("dt_ultimo_ato_key"), _fato.get("dt_entrada_fase_key")],
+        ano_protocolo=_fato.get("AnoProtocolo"),
+        ano_encerramento=_fato.get("ano_encerramento"),
+    )
+
+
+# =====================================================
+# Carga em segundo plano (ver utils/background.py)
+# =====================================================
+@st.cache_resource(max_entries=8)
+def background_load(version: str | None, key: str, _steps: list) -> BackgroundLoad:
+    """
+    Dispara, uma vez por processo / versão dos dados / `key`, a thread que
+    roda `_steps`. Sessões seguintes recebem a mesma carga (já pronta).
+    """
+    return BackgroundLoad(_steps).start()
+
+
+# =====================================================
+# Cache de resultados (agregados por filtro)
+# =====================================================
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """Cache LRU de agregados, um por processo (compartilhado entre sessões)."""
+    return ResultCache(budget_bytes())
+
+
+def cached_result(page: str, aggregate: str, filters: dict | None, version: str, compute):
+    """Resultado de `compute()` para (página, agregado, filtros, versão dos dados)."""
+    return get_result_cache().get_or_compute(page, aggregate, filters, version, compute)
@@ -0,0 +1,87 @@
+# streamlit/utils/filter_index.py
+"""
+Índice de filtros da FATO (bitmaps por valor).
+
+Montado uma vez no carregamento: para cada dimensão filtrável guarda, por
+valor, um bitmap das linhas (1 bit por linha, `np.packbits`). Um filtro vira
+OR dos bitmaps dos valores selecionados e AND entre dimensões — sem `isin`
+em texto nem conversões a cada interação.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from pipeline.cube import cube_keys
+
+
+class FilterIndex:
+    def __init__(self, n_rows: int):
+        self.n_rows = n_rows
+        self._bitmaps: dict[str, dict] = {}
+
+    def add(self, dim: str, values: pd.Series) -> "FilterIndex":
+        """Indexa `dim` (valores alinhados às linhas da fato; nulos ficam fora)."""
+        codes, uniques = pd.factorize(values, sort=True)
+        self._bitmaps[dim] = {
+            v: np.packbits(codes == k) for k, v in enumerate(pd.Index(uniques).tolist())
+        }
+        return self
+
+    def with_column(self, dim: str, values: pd.Series) -> "FilterIndex":
+        """Cópia rasa do índice com mais uma dimensão (o original não muda)."""
+        out = FilterIndex(self.n_rows)
+        out._bitmaps = dict(self._bitmaps)
+        return out.add(dim, values)
+
+    def values(self, dim: str) -> list:
+        return list(self._bitmaps.get(dim, {}))
+
+    def bitmap(self, filters: dict[str, list]) -> np.ndarray | None:
+        """Bitmap compactado do filtro (None = nenhum filtro ativo)."""
+        acc = None
+        for dim, selected in filters.items():
+            if not selected or dim not in self._bitmaps:
+                continue
+            per_value = self._bitmaps[dim]
+            bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            for v in selected:
+                if v in per_value:
+                    bits |= per_value[v]
+            acc = bits if acc is None else acc & bits
+        return acc
+
+    def mask(self, filters: dict[str, list]) -> np.ndarray:
+        """Máscara booleana (tamanho = nº de linhas da fato)."""
+        bits = self.bitmap(filters)
+        if bits is None:
+            return np.ones(self.n_rows, dtype=bool)
+        return np.unpackbits(bits, count=self.n_rows).astype(bool)
+
+    def rows(self, filters: dict[str, list]) -> np.ndarray:
+        """Posições (ordenadas) das linhas que passam no filtro."""
+        return np.flatnonzero(self.mask(filters))
+
+
+def situacao(fato: pd.DataFrame, col_enc: str | None) -> pd.Series:
+    """'Ativos' / 'Encerrados' (sem a flag, tudo conta como ativo)."""
+    enc = pd.to_numeric(fato[col_enc], errors="coerce").fillna(0) if col_enc else pd.Series(0, index=fato.index)
+    return pd.Series(np.where(enc.to_numpy() == 0, "Ativos", "Encerrados"), index=fato.index)
+
+
+def build_filter_index(fato: pd.DataFrame, dim_ies: pd.DataFrame | None = None) -> FilterIndex:
+    """
+    Índice das dimensões comuns: ano, UF, modalidade, pública/privada e
+    situação — e a faixa de risco gravada pela build (`risco_faixa`), se a
+    fato carregada tiver a coluna.
+    """
+    index = FilterIndex(len(fato))
+    keys = cube_keys(fato, dim_ies)
+    for dim in keys.columns:
+        index.add(dim, keys[dim])
+
+    col_enc = next((c for c in ["processo_encerrado", "PROCESSO_ENCERRADO"] if c in fato.columns), None)
+    index.add("situacao", situacao(fato, col_enc))
+    if "risco_faixa" in fato.columns:
+        index.add("risco_faixa", fato["risco_faixa"])
+    return index
@@ -4,6 +4,9 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from pipeline.cleaning import date_key_to_datetime, parse_unique
+from pipeline.risk import risk_components, risk_score
+
 
 def resolve_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
     """Retorna o primeiro nome de coluna existente no df dentre os candidatos."""
@@ -16,24 +19,33 @@ def resolve_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
     return None
 
 
+def _br_text_to_numeric(x: pd.Series) -> pd.Series:
+    x = x.astype(str).str.strip()
+
+    # normaliza decimal BR -> EN quando fizer sentido
+    # (ex: "12,5" -> "12.5")
+    x = x.str.replace(".", "", regex=False).where(~x.str.contains(",", na=False), x)
+    x = x.str.replace(",", ".", regex=False)
+
+    # converte
+    return pd.to_numeric(x, errors="coerce").astype("float64")
+
+
 def coerce_numeric(s: pd.Series) -> pd.Series:
     """
     Converte para número de forma tolerante.
     - Aceita strings com vírgula decimal e valores como '135.0'
     - Remove espaços
+    - Texto: cada valor distinto é convertido uma vez (`parse_unique`)
     """
     if s is None:
         return pd.Series(dtype="float64")
 
-    x = s.astype(str).str.strip()
+    # já tipado (Parquet da Gold): sem reprocessar texto
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return s.astype("float64")
 
-    # normaliza decimal BR -> EN quando fizer sentido
-    # (ex: "12,5" -> "12.5")
-    x = x.str.replace(".", "", regex=False).where(~x.str.contains(",", na=False), x)
-    x = x.str.replace(",", ".", regex=False)
-
-    # converte
-    return pd.to_numeric(x, errors="coerce")
+    return parse_unique(s, _br_text_to_numeric).astype("float64")
 
 
 def coerce_int(s: pd.Series) -> pd.Series:
@@ -48,18 +60,14 @@ def parse_date_key_yyyymmdd(s: pd.Series) -> pd.Series:
     - int
     - float "20240131.0"
     - string "20240131"
+    Cada chave distinta é convertida uma vez; coluna já datetime volta como está.
     """
     if s is None:
         return pd.Series([pd.NaT] * 0)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
 
-    key = coerce_int(s)
-    key = key.dropna().astype(int).astype(str)
-
-    # recria série alinhada
-    out = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
-    parsed = pd.to_datetime(key, format="%Y%m%d", errors="coerce")
-    out.loc[key.index] = parsed
-    return out
+    return date_key_to_datetime(coerce_int(s)).astype("datetime64[ns]")
 
 
 def safe_value_counts(df: pd.DataFrame, col: str, top: int = 15, dropna: bool = True) -> pd.DataFrame:
@@ -127,90 +135,22 @@ def add_risk_score(
     end_div_col: str | None = None,
     vagas_div_col: str | None = None,
     sede_ead_col: str | None = None,
+    weights: dict[str, float] | None = None,
 ) -> pd.DataFrame:
     """
     Cria:
     - risco_score (0..100)
     - risco_faixa (Baixo/Médio/Alto)
 
-    Heurística prática (ajustável):
+    Heurística prática (ajustável via `weights`, ver pipeline/risk.py):
     + tempo (tramitação e/ou aberto)
     + divergências (endereço/vagas)
     + criticidade por ato/categoria (credenciamento/autorização)
     + fase sensível (gabinete, portaria etc)
     """
-    out = df.copy()
-
-    score = pd.Series(0.0, index=out.index)
-
-    # 1) tempo de tramitação (proxy)
-    if tempo_tramit_col in out.columns:
-        ttr = coerce_numeric(out[tempo_tramit_col])
-        score += np.select(
-            [
-                ttr.isna(),
-                ttr < 365,
-                (ttr >= 365) & (ttr < 730),
-                ttr >= 730,
-            ],
-            [0, 10, 25, 40],
-            default=0,
-        )
-
-    # 2) tempo em aberto (se existir)
-    if tempo_aberto_col in out.columns:
-        tea = coerce_numeric(out[tempo_aberto_col])
-        score += np.select(
-            [
-                tea.isna(),
-                tea < 365,
-                (tea >= 365) & (tea < 730),
-                tea >= 730,
-            ],
-            [0, 10, 25, 40],
-            default=0,
-        )
-
-    # 3) divergências
-    def _flag(colname: str | None, add_if_true: int):
-        nonlocal score
-        if colname and colname in out.columns:
-            f = coerce_int(out[colname]).fillna(0).astype(int)
-            score += np.where(f == 1, add_if_true, 0)
-
-    _flag(end_div_col, 12)
-    _flag(vagas_div_col, 12)
-    _flag(sede_ead_col, 6)
-
-    # 4) criticidade por ato/categoria
-    crit_words = ["CREDENCI", "AUTORIZ", "RECONHEC", "PORTARIA", "GABINETE", "MINISTRO"]
-    def _text_col(colname: str | None) -> pd.Series:
-        if colname and colname in out.columns:
-            return out[colname].astype(str).str.upper()
-        return pd.Series([""] * len(out), index=out.index)
-
-    ato_txt = _text_col(ato_col)
-    cat_txt = _text_col(cat_ato_col)
-    fase_txt = _text_col(fase_col)
-
-    crit = ato_txt
-    crit = crit + " " + cat_txt + " " + fase_txt
-
-    score += np.where(crit.str.contains("CREDENCI", na=False), 10, 0)
-    score += np.where(crit.str.contains("AUTORIZ", na=False), 10, 0)
-    score += np.where(crit.str.contains("PORTARIA", na=False), 8, 0)
-    score += np.where(crit.str.contains("GABINETE", na=False), 8, 0)
-    score += np.where(crit.str.contains("MINISTRO", na=False), 6, 0)
-
-    # cap 0..100
-    score = score.clip(0, 100)
-
-    out["risco_score"] = score
-
-    out["risco_faixa"] = pd.cut(
-        out["risco_score"],
-        bins=[-0.1, 33, 66, 100],
-        labels=["Baixo", "Médio", "Alto"],
-    ).astype(str)
-
-    return out
+    comp = risk_components(
+        df, tempo_tramit_col, tempo_aberto_col, fase_col, ato_col, cat_ato_col,
+        end_div_col, vagas_div_col, sede_ead_col,
+    )
+    score, faixa = risk_score(comp, weights)
+    return df.assign(risco_score=score, risco_faixa=np.asarray(faixa, dtype=object))
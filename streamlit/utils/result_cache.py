@@ -0,0 +1,125 @@
+# streamlit/utils/result_cache.py
+"""
+Cache de resultados dos agregados do app (KPIs, gráficos, tabelas top-N).
+
+Chave: (página, agregado, filtros normalizados, versão dos dados Gold).
+O cache é único por processo (compartilhado entre sessões via
+`st.cache_resource`), com orçamento em bytes e descarte LRU. Quando a versão
+dos dados muda, tudo o que foi calculado com a versão anterior é descartado.
+
+Os valores guardados são compartilhados entre sessões: quem chama não deve
+alterá-los (monte o resultado final dentro da função de cálculo).
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BUDGET_MB = 64
+
+
+def normalize_filters(filters: dict[str, Any] | None) -> tuple:
+    """Forma canônica da seleção: ordem dos widgets e dimensões vazias não importam."""
+    out = []
+    for dim, selected in sorted((filters or {}).items()):
+        if selected is None or (isinstance(selected, (list, tuple, set)) and not selected):
+            continue
+        if isinstance(selected, dict):
+            value = tuple(sorted(selected.items()))
+        elif isinstance(selected, (list, tuple, set)):
+            value = tuple(sorted(selected, key=str))
+        else:
+            value = selected
+        out.append((dim, value))
+    return tuple(out)
+
+
+def nbytes(obj: Any) -> int:
+    """Tamanho aproximado em memória de um resultado."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(nbytes(k) + nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(nbytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.version: str | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items: OrderedDict[tuple, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _set_version(self, version: str) -> None:
+        if version != self.version:
+            self._items.clear()
+            self._bytes = 0
+            self.version = version
+
+    def get_or_compute(
+        self,
+        page: str,
+        aggregate: str,
+        filters: dict[str, Any] | None,
+        version: str,
+        compute: Callable[[], Any],
+    ) -> Any:
+        key = (page, aggregate, normalize_filters(filters))
+        with self._lock:
+            self._set_version(version)
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key][0]
+            self.misses += 1
+
+        value = compute()  # fora do lock: sessões diferentes não se bloqueiam
+        size = nbytes(value)
+
+        with self._lock:
+            if version != self.version or size > self.max_bytes:
+                return value
+            if key in self._items:  # outra sessão calculou ao mesmo tempo
+                self._bytes -= self._items.pop(key)[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, old_size) = self._items.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "itens": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "versao": self.version,
+            }
+
+
+def budget_bytes() -> int:
+    """Orçamento do cache (`$RESULT_CACHE_MB`, padrão 64 MB)."""
+    return int(float(os.environ.get("RESULT_CACHE_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024)
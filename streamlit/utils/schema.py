@@ -0,0 +1,102 @@
+# streamlit/utils/schema.py
+"""
+Esquema declarativo da camada semântica do app.
+
+Cada campo define o nome canônico usado pelas páginas, os apelidos aceitos
+nos arquivos (CSV/Parquet antigos, maiúsculas...), o tipo e os tokens de
+nulo. `apply_schema` roda uma vez dentro de `load_model`: os frames em cache
+já saem renomeados e tipados, e as páginas não convertem texto em número.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from pipeline.store import NULL_TOKENS, cast_column
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    dtype: str | None = None             # "Int64", "int8", "float64", "category" (None = manter)
+    aliases: tuple[str, ...] = ()
+    null_tokens: tuple[str, ...] = tuple(NULL_TOKENS)
+    default: object = _MISSING           # se informado, cria a coluna quando ela não existir
+
+
+FATO_SCHEMA = [
+    Field("AnoProtocolo", "Int64", ("ANO_DO_PROTOCOLO", "ano_protocolo")),
+    Field("uf", "category", ("UF", "UF_PROCESSO", "UF_CADASTRO")),
+    Field("modalidade_norm", "category", ("Modalidade_norm", "MODALIDADE")),
+    Field("PublicaPrivada", "category", ("PUBLICA_PRIVADA", "PUBLICAPRIVADA", "publica_privada")),
+
+    # métricas / flags
+    Field("tempo_tramitacao_dias", "float64", ("TEMPO_TRAMITACAO_DIAS",), default=np.nan),
+    Field("tempo_em_aberto_dias", "float64", ("TEMPO_EM_ABERTO_DIAS",), default=np.nan),
+    Field("processo_encerrado", "int8", ("PROCESSO_ENCERRADO",), default=0),
+    Field("processo_ativo", "int8", ("PROCESSO_ATIVO",)),
+    Field("flag_risco_alto", "int8", ("FLAG_RISCO_ALTO",)),
+    Field("ato_sensivel_flag", "int8", ("ATO_SENSIVEL_FLAG",)),
+    Field("risco_score", "float64", ("RISCO_SCORE",)),
+    Field("risco_faixa", "category", ("RISCO_FAIXA",)),
+    Field("risco_versao", "category", ("RISCO_VERSAO",)),
+    Field("ano_encerramento", "Int64", ("ANO_ENCERRAMENTO",)),
+    Field("endereco_divergente_flag", "int8", ("ENDERECO_DIVERGENTE_FLAG",)),
+    Field("tem_divergencia_vagas", "int8", ("TEM_DIVERGENCIA_VAGAS",)),
+    Field("is_sede_ead_flag", "int8", ("IS_SEDE_EAD_FLAG",)),
+    Field("VAGAS_SOLICITADAS_PROCESSO", "float64"),
+    Field("VAGAS_AUTORIZADAS_CADASTRO", "float64"),
+    Field("dif_vagas_processo_cadastro", "float64"),
+
+    # chaves de data (YYYYMMDD)
+    Field("dt_protocolo_key", "Int64", ("DT_PROTOCOLO_KEY",)),
+    Field("dt_entrada_fase_key", "Int64", ("DT_ENTRADA_FASE_KEY",)),
+    Field("dt_ultimo_ato_key", "Int64", ("DT_ULTIMO_ATO_KEY",)),
+
+    # atributos textuais (fatos antigas; na atual vêm como ids -> utils.data.fato_labels)
+    Field("FASE_ATUAL", "category", ("fase_atual",)),
+    Field("ORGAO", "category", ("ORGÃO", "ORGAO_PROCESSO", "ÓRGÃO")),
+    Field("ATO", "category", ("ato",)),
+    Field("CATEGORIA_ATO", "category", ("categoria_ato",)),
+    Field("SITUACAO_DO_PROCESSO", "category", ("situacao_do_processo",)),
+    Field("cine_area_geral", "category", ("AREA_GERAL_CINE",)),
+]
+
+DIM_SCHEMAS = {
+    "dim_tempo": [Field("AnoProtocolo", "Int64", ("ANO_DO_PROTOCOLO",))],
+    "dim_local": [Field("uf", "category", ("UF", "UF_PROCESSO", "UF_CADASTRO"))],
+    "dim_modalidade": [Field("modalidade_norm", "category", ("Modalidade_norm", "MODALIDADE"))],
+    "dim_ies": [Field("PublicaPrivada", "category", ("PUBLICA_PRIVADA", "publica_privada"))],
+}
+
+
+def apply_schema(df: pd.DataFrame | None, schema: list[Field]) -> pd.DataFrame | None:
+    """Renomeia apelidos para o nome canônico, aplica tipos e cria colunas com default."""
+    if df is None:
+        return df
+
+    df = df.rename(columns=lambda c: str(c).strip())
+
+    rename = {}
+    for f in schema:
+        if f.name in df.columns:
+            continue
+        alias = next((a for a in f.aliases if a in df.columns and a not in rename), None)
+        if alias:
+            rename[alias] = f.name
+    df = df.rename(columns=rename)
+
+    typed = {}
+    for f in schema:
+        if f.name in df.columns:
+            if f.dtype:
+                typed[f.name] = cast_column(df[f.name], f.dtype, f.null_tokens)
+        elif f.default is not _MISSING:
+            s = pd.Series(f.default, index=df.index)
+            typed[f.name] = s.astype(f.dtype) if f.dtype else s
+
+    return df.assign(**typed) if typed else df
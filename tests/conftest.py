@@ -0,0 +1,52 @@
+# tests/conftest.py
+"""
+Fixtures comuns: Silver sintética pequena (pipeline/synthetic.py) e a fato
+montada com os builders reais. Os testes comparam cada caminho otimizado com
+a forma direta em pandas sobre os mesmos dados.
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# `pipeline` na raiz; `utils` do app dentro de streamlit/ (como no `streamlit run`)
+for p in (ROOT, ROOT / "streamlit"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from pipeline.gold import build_dim_ies, build_fato, build_metricas, prepare_base  # noqa: E402
+from pipeline.synthetic import generate_silver  # noqa: E402
+
+N_ROWS = 3000
+SEED = 7
+TODAY = pd.Timestamp("2026-01-01")
+
+
+@pytest.fixture(scope="session")
+def silver() -> pd.DataFrame:
+    return generate_silver(N_ROWS, seed=SEED)
+
+
+@pytest.fixture(scope="session")
+def today() -> pd.Timestamp:
+    """Data de referência fixa (métricas de tempo em aberto reprodutíveis)."""
+    return TODAY
+
+
+@pytest.fixture(scope="session")
+def base(silver) -> pd.DataFrame:
+    return prepare_base(silver)
+
+
+@pytest.fixture(scope="session")
+def fato(base, today) -> pd.DataFrame:
+    return build_fato(base, build_metricas(base, today=today))
+
+
+@pytest.fixture(scope="session")
+def dim_ies(base) -> pd.DataFrame:
+    return build_dim_ies(base)
@@ -0,0 +1,50 @@
+# tests/test_accumulators.py
+"""Acumuladores combináveis x pandas sobre a coluna inteira (`resumo_metricas.csv`)."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.accumulators import NumericAccumulator, QuantileSketch
+from pipeline.gold import build_metricas, build_resumo
+
+
+@pytest.fixture(scope="module")
+def metricas(base, today) -> pd.DataFrame:
+    return build_metricas(base, today=today)
+
+
+def test_sketch_exato_igual_pandas():
+    x = np.random.default_rng(0).integers(0, 3000, 5000).astype(float)
+    sk = QuantileSketch().update(x[:2500]).merge(QuantileSketch().update(x[2500:]))
+    for q in (0.1, 0.5, 0.9):
+        assert sk.quantile(q) == pd.Series(x).quantile(q)
+
+
+def test_numeric_em_blocos_igual_pandas():
+    x = pd.Series(np.random.default_rng(1).normal(500, 120, 10_000)).where(lambda s: s > 300)
+    acc = NumericAccumulator()
+    for i in range(0, len(x), 777):
+        acc.merge(NumericAccumulator().update(x[i:i + 777]))
+    assert (acc.n, acc.nulos) == (x.notna().sum(), x.isna().sum())
+    assert acc.mean == pytest.approx(x.mean())
+    assert acc.std(ddof=1) == pytest.approx(x.std())
+
+
+def test_resumo_em_blocos_igual_tabela_inteira(metricas):
+    inteiro = build_resumo(metricas)
+    em_blocos = build_resumo(metricas.iloc[i:i + 250] for i in range(0, len(metricas), 250))
+    pd.testing.assert_frame_equal(em_blocos, inteiro)
+
+    tempo = pd.to_numeric(metricas["tempo_tramitacao_dias"], errors="coerce")
+    assert inteiro.loc[0, "linhas_total"] == len(metricas)
+    assert inteiro.loc[0, "pct_encerrado"] == round(metricas["processo_encerrado"].mean() * 100, 2)
+    assert inteiro.loc[0, "tempo_mediana"] == tempo.median()
+    assert inteiro.loc[0, "tempo_media"] == pytest.approx(tempo.mean())
+
+
+def test_resumo_sem_colunas_sai_nan(metricas):
+    resumo = build_resumo(metricas[["processo_encerrado"]])
+    assert resumo.loc[0, "linhas_total"] == len(metricas)
+    assert resumo.loc[0, ["pct_risco_alto", "tempo_mediana", "pct_cine_nao_informado"]].isna().all()
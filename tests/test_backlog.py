@@ -0,0 +1,67 @@
+# tests/test_backlog.py
+"""`BacklogIndex` (searchsorted em vetores ordenados) x contagem direta em pandas."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.backlog import build_backlog_index
+
+
+def _dates(keys: pd.Series) -> pd.Series:
+    return pd.to_datetime(pd.to_numeric(keys, errors="coerce").astype("Int64").astype(str),
+                          format="%Y%m%d", errors="coerce")
+
+
+def backlog_pandas(fato: pd.DataFrame, datas: pd.DatetimeIndex) -> pd.DataFrame:
+    """Contagem direta por data: entradas até t, saídas até t e a diferença."""
+    ano = pd.to_numeric(fato["ANO_DO_PROTOCOLO"], errors="coerce")
+    entrada = _dates(fato["dt_protocolo_key"]).fillna(pd.to_datetime(ano.astype("Int64").astype(str) + "-01-01",
+                                                                     errors="coerce"))
+    ano_enc = pd.to_numeric(fato["ano_encerramento"], errors="coerce")
+    saida = (_dates(fato["dt_ultimo_ato_key"])
+             .fillna(_dates(fato["dt_entrada_fase_key"]))
+             .fillna(pd.to_datetime(ano_enc.astype("Int64").astype(str) + "-12-31", errors="coerce")))
+    saida = saida.where(pd.to_numeric(fato["processo_encerrado"], errors="coerce") == 1)
+    # sai só quem entrou, e nunca antes de entrar
+    saida = saida.where(saida.isna() | (saida >= entrada), entrada).where(entrada.notna())
+
+    rows = []
+    for t in datas:
+        entradas = int((entrada <= t).sum())
+        saidas = int((saida <= t).sum())
+        rows.append((t, entradas, saidas, entradas - saidas))
+    return pd.DataFrame(rows, columns=["data", "protocolados", "encerrados", "em_aberto"])
+
+
+@pytest.fixture(scope="module")
+def index(fato):
+    return build_backlog_index(
+        len(fato),
+        fato["dt_protocolo_key"],
+        fato["processo_encerrado"],
+        [fato["dt_ultimo_ato_key"], fato["dt_entrada_fase_key"]],
+        ano_protocolo=fato["ANO_DO_PROTOCOLO"],
+        ano_encerramento=fato["ano_encerramento"],
+    )
+
+
+@pytest.mark.parametrize("seed", [None, 0, 1])
+def test_counts_igual_pandas(fato, index, seed):
+    rows = None
+    sub = fato
+    if seed is not None:
+        rows = np.sort(np.random.default_rng(seed).choice(len(fato), size=len(fato) // 3, replace=False))
+        sub = fato.iloc[rows]
+    datas = pd.date_range("2012-01-01", "2026-01-01", freq="QE")
+
+    got = index.counts(datas, rows)
+    pd.testing.assert_frame_equal(got, backlog_pandas(sub, datas), check_dtype=False)
+
+
+def test_monthly_cobre_o_recorte(index):
+    serie = index.monthly()
+    assert serie["data"].is_monotonic_increasing
+    assert (serie["em_aberto"] >= 0).all()
+    assert serie["protocolados"].iloc[-1] == index.n_rows
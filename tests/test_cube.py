@@ -0,0 +1,55 @@
+# tests/test_cube.py
+"""Cubo do dashboard x agregação direta na fato; sketches por célula x um `QuantileSketch` por grupo."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.accumulators import QuantileSketch, compact_histograms
+from pipeline.cube import TEMPO_COL, build_cube, cube_keys, cube_kpis, cube_mask
+
+
+@pytest.mark.parametrize("max_bins", [8, 32, 4096])
+def test_compact_histograms_igual_sketch_por_grupo(max_bins):
+    rng = np.random.default_rng(max_bins)
+    n = 20_000
+    groups = rng.integers(0, 40, n)
+    # mistura de grupos pequenos (exatos) e grandes/contínuos (compactados)
+    values = np.where(groups % 2, rng.integers(0, 20, n), rng.gamma(2.0, 300.0, n))
+    hist = pd.DataFrame({"g": groups, "v": values}).groupby(["g", "v"]).size().reset_index(name="qtd")
+
+    g, v, c, bits = compact_histograms(hist["g"], hist["v"], hist["qtd"], max_bins)
+    for k in np.unique(groups):
+        sk = QuantileSketch(max_bins).update(values[groups == k])
+        sel = g == k
+        np.testing.assert_array_equal(v[sel], sk.values)
+        np.testing.assert_array_equal(c[sel], sk.counts)
+        assert (None if bits[k] < 0 else bits[k]) == sk.bits
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_cube_kpis_igual_fato(fato, dim_ies, seed):
+    rng = np.random.default_rng(seed)
+    cube, cube_tempo = build_cube(fato, dim_ies)
+    keys = cube_keys(fato, dim_ies)
+
+    filters = {}
+    for dim in keys.columns:
+        values = keys[dim].dropna().unique()
+        k = rng.integers(0, min(len(values), 3) + 1)
+        filters[dim] = list(rng.choice(values, size=k, replace=False)) if k else []
+
+    rows = fato[cube_mask(keys, filters)]
+    kpis = cube_kpis(cube, cube_tempo, filters)
+    assert kpis["total"] == len(rows)
+    if not len(rows):
+        return
+    assert kpis["pct_encerrados"] == pytest.approx(rows["processo_encerrado"].mean() * 100)
+    assert kpis["pct_risco_alto"] == pytest.approx(rows["flag_risco_alto"].mean() * 100)
+
+    # células com mais de CUBE_TEMPO_BINS valores ficam arredondadas (erro <= 2^-bits)
+    bits = pd.to_numeric(cube_tempo.loc[cube_mask(cube_tempo, filters), "bits"]).min()
+    expected = pd.to_numeric(rows[TEMPO_COL], errors="coerce").median()
+    rel = 0 if pd.isna(bits) else 2.0 ** -int(bits)
+    assert kpis["tempo_mediano"] == pytest.approx(expected, rel=rel, abs=0)
@@ -0,0 +1,66 @@
+# tests/test_dag.py
+"""Estado do DAG: nó que não terminou bem continua sujo na execução seguinte."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from pipeline.dag import Node, run_dag
+
+
+def _base(ctx: dict) -> dict:
+    versao = Path(ctx["entrada"]).read_text(encoding="utf-8")
+    (Path(ctx["dir"]) / "base.out").write_text(versao, encoding="utf-8")
+    return {}
+
+
+def _filho(ctx: dict) -> dict:
+    if ctx.get("falhar"):
+        raise ValueError("falha simulada")
+    versao = (Path(ctx["dir"]) / "base.out").read_text(encoding="utf-8")
+    (Path(ctx["dir"]) / "filho.out").write_text(versao, encoding="utf-8")
+    return {}
+
+
+def _nodes(tmp_path: Path) -> list[Node]:
+    return [
+        Node("base", _base, inputs=[tmp_path / "entrada.txt"], outputs=[tmp_path / "base.out"]),
+        Node("filho", _filho, deps=["base"], outputs=[tmp_path / "filho.out"]),
+    ]
+
+
+def _status(report: list[dict]) -> dict[str, str]:
+    return {r["node"]: r["status"] for r in report}
+
+
+def test_pai_refeito_filho_falhou(tmp_path):
+    entrada, state = tmp_path / "entrada.txt", tmp_path / "_state.json"
+    ctx = {"entrada": str(entrada), "dir": str(tmp_path)}
+
+    entrada.write_text("v1", encoding="utf-8")
+    run_dag(_nodes(tmp_path), ctx, state, max_workers=1)
+    assert _status(run_dag(_nodes(tmp_path), ctx, state, max_workers=1)) == {"base": "em dia", "filho": "em dia"}
+
+    # entrada muda: a base roda de novo e o filho falha
+    entrada.write_text("v2 (alterada)", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        run_dag(_nodes(tmp_path), {**ctx, "falhar": True}, state, max_workers=1)
+
+    # próxima execução: o filho não pode aparecer "em dia" com a saída velha
+    status = _status(run_dag(_nodes(tmp_path), ctx, state, max_workers=1))
+    assert status == {"base": "em dia", "filho": "ok"}
+    assert (tmp_path / "filho.out").read_text(encoding="utf-8") == "v2 (alterada)"
+
+
+def test_filho_nao_executado_continua_sujo(tmp_path):
+    entrada, state = tmp_path / "entrada.txt", tmp_path / "_state.json"
+    ctx = {"entrada": str(tmp_path / "nao_existe.txt"), "dir": str(tmp_path)}
+    entrada.write_text("v1", encoding="utf-8")
+
+    # a base falha (entrada inexistente): o filho nem roda
+    with pytest.raises(RuntimeError):
+        run_dag(_nodes(tmp_path), ctx, state, max_workers=1)
+
+    status = _status(run_dag(_nodes(tmp_path), {**ctx, "entrada": str(entrada)}, state, max_workers=1))
+    assert status == {"base": "ok", "filho": "ok"}
@@ -0,0 +1,31 @@
+# tests/test_dedup.py
+"""`dedup_most_complete` x a versão antiga dos notebooks (sort + drop_duplicates)."""
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from pipeline.cleaning import norm_missing_frame
+from pipeline.dedup import dedup_most_complete
+
+IES_COLS = [
+    "IES_ID_FAKE", "IES_NOME_FAKE", "ORGANIZACAO_ACADEMICA", "SISTEMA_DE_ENSINO",
+    "CATEGORIA_ADMINISTRATIVA", "SITUACAO_DA_IES", "UF_CADASTRO", "MUNICIPIO_CADASTRO",
+]
+CURSO_COLS = ["CODIGO_DO_CURSO", "NOME_CURSO_REGULACAO", "GRAU", "CARGA_HORARIA_CADASTRO", "AREA_GERAL_CINE"]
+
+
+def dedup_sort(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Versão antiga: conta preenchidos, ordena por (chave, completude) e fica com a 1ª."""
+    tmp = df.assign(_n=df.notna().sum(axis=1))
+    tmp = tmp.sort_values([key, "_n"], ascending=[True, False], kind="stable")
+    return tmp.drop_duplicates(subset=[key], keep="first").drop(columns="_n")
+
+
+@pytest.mark.parametrize("cols", [IES_COLS, CURSO_COLS], ids=["ies", "curso"])
+@pytest.mark.parametrize("chunk_rows", [None, 257])
+def test_dedup_igual_sort_drop_duplicates(silver, cols, chunk_rows):
+    df = norm_missing_frame(silver[cols])
+    key = cols[0]
+    got = dedup_most_complete(df, key, chunk_rows=chunk_rows)
+    pd.testing.assert_frame_equal(got, dedup_sort(df, key))
@@ -0,0 +1,36 @@
+# tests/test_filter_index.py
+"""Linhas do `FilterIndex` (bitmaps, com a faixa de risco da fato) x máscara `isin` de `cube_mask`."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from pipeline.cube import cube_keys, cube_mask
+from utils.filter_index import build_filter_index, situacao
+
+
+def _random_filters(index, keys, rng) -> dict[str, list]:
+    filters = {}
+    for dim in keys.columns:
+        values = index.values(dim)
+        k = rng.integers(0, min(len(values), 4) + 1)
+        filters[dim] = list(rng.choice(np.array(values, dtype=object), size=k, replace=False)) if k else []
+    return filters
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_rows_igual_mascara(fato, dim_ies, seed):
+    rng = np.random.default_rng(seed)
+    index = build_filter_index(fato, dim_ies)
+    keys = cube_keys(fato, dim_ies).assign(
+        situacao=situacao(fato, "processo_encerrado"), risco_faixa=fato["risco_faixa"].to_numpy()
+    )
+
+    filters = _random_filters(index, keys, rng)
+    np.testing.assert_array_equal(index.rows(filters), np.flatnonzero(cube_mask(keys, filters)))
+
+
+def test_sem_filtro_todas_as_linhas(fato, dim_ies):
+    index = build_filter_index(fato, dim_ies)
+    np.testing.assert_array_equal(index.rows({}), np.arange(len(fato)))
+    np.testing.assert_array_equal(index.rows({"uf": ["XX"]}), np.empty(0, dtype=np.int64))
@@ -0,0 +1,76 @@
+# tests/test_incremental.py
+"""`refresh_fato` (só processos alterados) x `build_all` sobre a mesma Silver."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.gold import build_all
+from pipeline.incremental import refresh_fato
+from pipeline.store import read_table
+
+pytest.importorskip("openpyxl")
+
+TABLES = [
+    "dim_curso", "dim_ies", "dim_tempo", "dim_atributo",
+    "fato_processo_regulatorio", "fato_processo_regulatorio_com_metricas",
+    "cubo_dashboard", "cubo_tempo",
+]
+TEMPO = "TEMPO_TRAMITACAO_DIAS"
+
+
+def _write_silver(df: pd.DataFrame, folder: Path) -> list[Path]:
+    folder.mkdir(parents=True, exist_ok=True)
+    files = []
+    for name, part in df.groupby("fonte_arquivo", sort=True):
+        files.append(folder / name)
+        part.drop(columns="fonte_arquivo").to_excel(files[-1], index=False)
+    return files
+
+
+def _next_silver(silver: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    """Remove, altera e acrescenta processos (inclusive de uma IES nova)."""
+    df = silver.drop(index=rng.choice(silver.index, size=len(silver) // 20, replace=False))
+
+    changed = rng.choice(df.index, size=len(df) // 20, replace=False)
+    df.loc[changed, "SITUACAO_DO_PROCESSO"] = "Arquivado"
+    df.loc[changed, "DATA_DO_ULTIMO_ATO"] = "2025-06-30 00:00:00"
+    new = silver.sample(n=len(silver) // 20, random_state=1).copy()
+    new["NO_DO_PROCESSO"] = "9" + new["NO_DO_PROCESSO"].astype(str)
+    new.loc[new.index[: len(new) // 2], ["IES_ID_FAKE", "IES_NOME_FAKE"]] = ["IES_99999", "IES 99999"]
+    if TEMPO in df.columns:
+        # subconjunto recalculado sem tempo, base inteira com tempo
+        df.loc[changed, TEMPO] = np.nan
+        new[TEMPO] = np.nan
+    return pd.concat([df, new], ignore_index=True)
+
+
+def _assert_same_tables(a: Path, b: Path) -> None:
+    for name in TABLES:
+        left, right = read_table(name, [a]), read_table(name, [b])
+        assert left is not None and right is not None, name
+        pd.testing.assert_frame_equal(left, right, check_exact=False, rtol=1e-9, obj=name)
+    pd.testing.assert_frame_equal(pd.read_csv(a / "resumo_metricas.csv"), pd.read_csv(b / "resumo_metricas.csv"),
+                                  check_exact=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize("tempo", ["das_datas", "coluna_parcial"])
+def test_incremental_igual_build_completa(silver, today, tmp_path, tempo):
+    rng = np.random.default_rng(3)
+    v1 = silver.iloc[:600].copy()
+    if tempo == "coluna_parcial":
+        filled = rng.random(len(v1)) < 0.5
+        v1[TEMPO] = pd.Series(rng.integers(1, 2000, len(v1)).astype(str), index=v1.index).where(filled)
+    v2 = _next_silver(v1, rng)
+
+    inc = tmp_path / "incremental"
+    refresh_fato(_write_silver(v1, tmp_path / "v1"), inc, today=today)
+    stats = refresh_fato(files_v2 := _write_silver(v2, tmp_path / "v2"), inc, today=today)
+    assert 0 < stats["linhas_recalculadas"] < len(v2)
+
+    full = tmp_path / "completa"
+    build_all(files_v2, full, today=today)
+    _assert_same_tables(inc, full)
@@ -0,0 +1,43 @@
+# tests/test_partitions.py
+"""Acumuladores do manifesto combinados (`merge_partition_metrics`) x recálculo na fato."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.partitions import ACCUMULATOR_COLS, merge_partition_metrics, write_partitioned
+
+pytest.importorskip("pyarrow")
+
+BY = "ANO_DO_PROTOCOLO"
+
+
+@pytest.fixture(scope="module")
+def manifest(fato, tmp_path_factory):
+    return write_partitioned(fato, "fato", tmp_path_factory.mktemp("part"), by=BY)
+
+
+@pytest.mark.parametrize("col", list(ACCUMULATOR_COLS))
+@pytest.mark.parametrize("anos", [None, [2019], [2016, 2020, 2024], [1990]])
+def test_merge_igual_recalculo(fato, manifest, col, anos):
+    acc = merge_partition_metrics(manifest, col, anos)
+    rows = fato if anos is None else fato[pd.to_numeric(fato[BY], errors="coerce").isin(anos)]
+    x = pd.to_numeric(rows[col], errors="coerce")
+
+    assert acc.n == x.notna().sum()
+    assert acc.nulos == x.isna().sum()
+    if not acc.n:
+        assert acc.mean is None
+        return
+    assert acc.mean == pytest.approx(x.mean())
+    assert acc.std() == pytest.approx(x.std(ddof=0))
+    assert (acc.min, acc.max) == (x.min(), x.max())
+    if ACCUMULATOR_COLS[col]:
+        assert acc.median() == x.median()
+        assert acc.quantile(0.9) == pytest.approx(x.quantile(0.9))
+
+
+def test_todas_as_particoes(fato, manifest):
+    assert sum(p["linhas"] for p in manifest["particoes"]) == len(fato)
+    assert manifest["linhas"] == len(fato)
@@ -0,0 +1,57 @@
+# tests/test_result_cache.py
+"""Descarte LRU por orçamento e invalidação por versão do `ResultCache`."""
+from __future__ import annotations
+
+import numpy as np
+
+from utils.result_cache import ResultCache, nbytes
+
+ITEM = np.zeros(1000, dtype=np.int8)  # 1000 bytes
+SIZE = nbytes(ITEM)
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return ITEM.copy()
+
+
+def test_lru_descarta_o_menos_usado():
+    cache, compute = ResultCache(max_bytes=2 * SIZE), Counter()
+    get = lambda name: cache.get_or_compute("p", name, {}, "v1", compute)  # noqa: E731
+
+    get("a"), get("b")
+    get("a")            # a passa a ser o mais recente
+    get("c")            # estoura o orçamento: sai b
+    assert compute.calls == 3 and cache.evictions == 1
+
+    get("a"), get("c")
+    assert compute.calls == 3
+    get("b")
+    assert compute.calls == 4
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_filtros_normalizados_compartilham_a_entrada():
+    cache, compute = ResultCache(max_bytes=10 * SIZE), Counter()
+    cache.get_or_compute("p", "kpis", {"uf": ["SP", "RJ"], "ano": []}, "v1", compute)
+    cache.get_or_compute("p", "kpis", {"uf": ["RJ", "SP"]}, "v1", compute)
+    assert compute.calls == 1 and cache.hits == 1
+
+
+def test_nova_versao_invalida_tudo():
+    cache, compute = ResultCache(max_bytes=10 * SIZE), Counter()
+    cache.get_or_compute("p", "a", {}, "v1", compute)
+    cache.get_or_compute("p", "a", {}, "v2", compute)
+    assert compute.calls == 2
+    assert cache.stats()["itens"] == 1 and cache.version == "v2"
+
+
+def test_resultado_maior_que_o_orcamento_nao_fica():
+    cache, compute = ResultCache(max_bytes=SIZE // 2), Counter()
+    cache.get_or_compute("p", "a", {}, "v1", compute)
+    cache.get_or_compute("p", "a", {}, "v1", compute)
+    assert compute.calls == 2 and cache.stats()["itens"] == 0